@@ -0,0 +1,78 @@
+import argparse
+import time
+import tracemalloc
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, KeyValueType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.value import Value
+
+
+PROGRAM = """
+bool kept(Pair<int, int> entry)
+{
+    return entry.value() > -1;
+}
+
+int byValue(Pair<int, int> entry)
+{
+    return entry.value();
+}
+
+void visit(Pair<int, int> entry)
+{
+    entry.key();
+}
+
+Dict<int, int> filtered(Dict<int, int> numbers)
+{
+    return numbers.where(kept());
+}
+
+Dict<int, int> sorted(Dict<int, int> numbers)
+{
+    return numbers.orderBy(byValue());
+}
+
+int visited(Dict<int, int> numbers)
+{
+    numbers.forEach(visit());
+    return 0;
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+
+def run(function: str, size: int) -> tuple[float, int]:
+    program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+    interpreter = Interpreter(program, memoize=False)
+    numbers = Value(KeyValueType(Type.DICT, Type.INT, Type.INT), {index: size - index for index in range(size)})
+    tracemalloc.start()
+    start = time.perf_counter()
+    interpreter.call_function(function, [numbers])
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of LINQ queries over a large Dict, beyond the Dict itself.")
+    parser.add_argument('--size', type=int, default=5000000, help='Number of entries in the queried Dict')
+    args = parser.parse_args()
+
+    for function in ("filtered", "sorted", "visited"):
+        elapsed, peak = run(function, args.size)
+        print(f"{function}: peak {peak / 2 ** 20:.1f} MiB ({peak / args.size:.1f} B per entry), time: {elapsed:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
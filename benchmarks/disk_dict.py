@@ -0,0 +1,96 @@
+import argparse
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, ElementType, KeyValueType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.disk_map import DiskStorage
+from src.interpreter.value import Value
+
+
+PROGRAM = """
+int lookups(Dict<string, int> table, List<string> probes)
+{
+    int found = 0;
+    int i = 0;
+    while (i < probes.length())
+    {
+        if (table.isKey(probes[i]))
+        {
+            found = found + table[probes[i]];
+        }
+        i = i + 1;
+    }
+    return found;
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+
+def build(mode: str, size: int, cache_size: int, path: str):
+    entries = ((f"key{index}", index) for index in range(size))
+    if mode == "memory":
+        return dict(entries), None
+    storage = DiskStorage(path, cache_size=cache_size, batch_size=100000)
+    table = storage.open("lookup")
+    table.update(entries)
+    table.flush()
+    return table, storage
+
+
+def run(mode: str, size: int, probes: int, cache_size: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        table, storage = build(mode, size, cache_size, f"{directory}/dicts.db")
+        build_time = time.perf_counter() - start
+
+        generator = random.Random(0)
+        keys = [f"key{generator.randrange(size)}" for _ in range(probes)] + [f"other{index}" for index in range(probes)]
+        generator.shuffle(keys)
+        program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+        interpreter = Interpreter(program, memoize=False)
+        arguments = [Value(KeyValueType(Type.DICT, Type.STRING, Type.INT), table),
+                     Value(ElementType(Type.LIST, Type.STRING), keys)]
+        start = time.perf_counter()
+        interpreter.call_function("lookups", arguments)
+        lookup_time = time.perf_counter() - start
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        details = f", {table.statistics()}" if storage is not None else ""
+        print(f"{mode}: build {build_time:.1f} s, {2 * probes} lookups {lookup_time:.3f} s, "
+              f"peak memory {peak:.0f} MiB{details}")
+        if storage is not None:
+            storage.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dict<string, int> lookups with entries in memory and on disk.")
+    parser.add_argument('--size', type=int, default=10000000, help='Number of entries')
+    parser.add_argument('--probes', type=int, default=5000, help='Number of present and of missing keys looked up')
+    parser.add_argument('--cache-size', type=int, default=100000, help='Entries cached in memory by the disk Dict')
+    parser.add_argument('--mode', choices=['memory', 'disk'], help='Run only one mode in this process')
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        run(args.mode, args.size, args.probes, args.cache_size)
+        return
+    # each mode runs in its own process, so the peak memory of one doesn't hide the other
+    for mode in ('memory', 'disk'):
+        subprocess.run([sys.executable, '-m', 'benchmarks.disk_dict', '--mode', mode, '--size', str(args.size),
+                        '--probes', str(args.probes), '--cache-size', str(args.cache_size)], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import time
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, ElementType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.value import Value
+
+
+PROGRAM = """
+int bucket(int n)
+{
+    int tens = (int) (n / 10);
+    return n - tens * 10;
+}
+
+int self(int n)
+{
+    return n;
+}
+
+int sum(int left, int right)
+{
+    return left + right;
+}
+
+Dict<int, List<int>> grouped(List<int> numbers)
+{
+    return numbers.groupBy(bucket());
+}
+
+Dict<int, List<int>> groupedByHand(List<int> numbers)
+{
+    Dict<int, List<int>> groups = new Dict<int, List<int>>();
+    int i = 0;
+    while (i < numbers.length())
+    {
+        int n = numbers[i];
+        int k = bucket(n);
+        if (!groups.isKey(k))
+        {
+            groups.add(new Pair<int, List<int>>(k, new List<int>()));
+        }
+        List<int> members = groups[k];
+        members.push(n);
+        groups[k] = members;
+        i = i + 1;
+    }
+    return groups;
+}
+
+List<int> joined(List<int> left, List<int> right)
+{
+    return left.join(right, bucket(), self(), sum());
+}
+
+List<int> joinedByHand(List<int> left, List<int> right)
+{
+    List<int> result = new List<int>();
+    int i = 0;
+    while (i < left.length())
+    {
+        int n = left[i];
+        int k = bucket(n);
+        int j = 0;
+        while (j < right.length())
+        {
+            int m = right[j];
+            if (k == self(m))
+            {
+                result.push(sum(n, m));
+            }
+            j = j + 1;
+        }
+        i = i + 1;
+    }
+    return result;
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+
+def run(function: str, arguments: list[Value]) -> tuple[float, Value]:
+    program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+    interpreter = Interpreter(program, memoize=False, max_loop_iterations=100000000)
+    start = time.perf_counter()
+    result = interpreter.call_function(function, arguments)
+    return time.perf_counter() - start, result
+
+
+def compare(name: str, native: str, by_hand: str, arguments: list[Value]) -> None:
+    native_time, native_result = run(native, arguments)
+    by_hand_time, by_hand_result = run(by_hand, arguments)
+    assert native_result.value == by_hand_result.value
+    print(f"{name}: native {native_time:.3f} s, hand-written {by_hand_time:.3f} s,"
+          f" speedup: {by_hand_time / native_time:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="groupBy and join against the equivalent hand-written while loops.")
+    parser.add_argument('--size', type=int, default=500, help='Number of elements in the grouped and joined lists')
+    args = parser.parse_args()
+
+    numbers = Value(ElementType(Type.LIST, Type.INT), list(range(args.size)))
+    compare("groupBy", "grouped", "groupedByHand", [numbers])
+    compare("join", "joined", "joinedByHand", [numbers, numbers])
+
+
+if __name__ == "__main__":
+    main()
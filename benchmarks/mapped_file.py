@@ -0,0 +1,82 @@
+import argparse
+import array
+import os
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, BaseType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.value import Value
+
+
+PROGRAM = """
+float mapped(string path)
+{
+    List<float> xs = mapFile(path);
+    return xs.sum() + xs[xs.length() - 1];
+}
+
+float pushed(int count)
+{
+    List<float> xs = new List<float>();
+    int i = 0;
+    while (i < count)
+    {
+        xs.push(0.5);
+        i = i + 1;
+    }
+    return xs.sum() + xs[xs.length() - 1];
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+
+def call(function: str, argument: Value) -> float:
+    program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+    interpreter = Interpreter(program, memoize=False, max_loop_iterations=10 ** 9)
+    start = time.perf_counter()
+    interpreter.call_function(function, [argument])
+    return time.perf_counter() - start
+
+
+# time of a plain run, then peak Python allocations of a second run with tracemalloc on
+def measure(function: str, argument: Value) -> tuple[float, float]:
+    elapsed = call(function, argument)
+    tracemalloc.start()
+    call(function, argument)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List<float> read from a float64 file with mapFile and built with push.")
+    parser.add_argument('--size', type=int, default=10000000, help='Number of float64 values in the file')
+    parser.add_argument('--push-size', type=int, default=50000, help='Number of values added with push')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "data.f64")
+        with open(path, 'wb') as file:
+            for start in range(0, args.size, 1 << 20):
+                array.array('d', [0.5] * min(1 << 20, args.size - start)).tofile(file)
+        mapped_time, mapped_peak = measure("mapped", Value(BaseType(Type.STRING), path))
+    pushed_time, pushed_peak = measure("pushed", Value(BaseType(Type.INT), args.push_size))
+    print(f"mapFile: {args.size} values in {mapped_time:.2f} s ({args.size / mapped_time / 1e6:.2f} M/s), "
+          f"peak Python memory {mapped_peak / 2 ** 20:.1f} MiB")
+    print(f"push: {args.push_size} values in {pushed_time:.2f} s ({args.push_size / pushed_time / 1e6:.3f} M/s), "
+          f"peak Python memory {pushed_peak / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import time
+import tracemalloc
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, BaseType, KeyValueType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.value import Value
+
+
+PROGRAM = """
+List<Pair<int, int>> pairs(int count)
+{
+    List<Pair<int, int>> result = new List<Pair<int, int>>();
+    int i = 0;
+    while (i < count)
+    {
+        result.push(new Pair<int, int>(i, i));
+        i = i + 1;
+    }
+    return result;
+}
+
+int keys(Pair<int, int> pair, int count)
+{
+    int total = 0;
+    int i = 0;
+    while (i < count)
+    {
+        total = total + pair.key();
+        i = i + 1;
+    }
+    return total;
+}
+
+int loop(Pair<int, int> pair, int count)
+{
+    int total = 0;
+    int i = 0;
+    while (i < count)
+    {
+        total = total + 1;
+        i = i + 1;
+    }
+    return total;
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+
+def create_interpreter() -> Interpreter:
+    program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+    return Interpreter(program, memoize=False, max_loop_iterations=100000000)
+
+
+def memory_per_pair(count: int) -> float:
+    interpreter = create_interpreter()
+    tracemalloc.start()
+    result = interpreter.call_function("pairs", [Value(BaseType(Type.INT), count)])
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(result.value) == count
+    return memory / count
+
+
+def time_per_loop(function: str, count: int) -> float:
+    interpreter = create_interpreter()
+    pair = interpreter.call_function("pairs", [Value(BaseType(Type.INT), 1)]).value[0]
+    arguments = [Value(KeyValueType(Type.PAIR, Type.INT, Type.INT), pair), Value(BaseType(Type.INT), count)]
+    start = time.perf_counter()
+    interpreter.call_function(function, arguments)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per Pair and time of a .key() call.")
+    parser.add_argument('--count', type=int, default=100000, help='Number of pairs built and of .key() calls')
+    args = parser.parse_args()
+
+    print(f"memory: {memory_per_pair(args.count):.1f} B per pair in a List")
+    with_key, without_key = time_per_loop("keys", args.count), time_per_loop("loop", args.count)
+    print(f"time: {(with_key - without_key) * 1e6:.2f} us per .key() call"
+          f" (loop iteration {with_key * 1e6:.2f} us with the call, {without_key * 1e6:.2f} us without)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import os
+import time
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, ElementType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.value import Value
+
+
+PROGRAM = """
+int collatz(int start)
+{
+    int n = start;
+    int steps = 0;
+    while (n > 1)
+    {
+        int half = (int) (n / 2);
+        if (half * 2 == n)
+        {
+            n = half;
+        }
+        else
+        {
+            n = 3 * n + 1;
+        }
+        steps = steps + 1;
+    }
+    return steps;
+}
+
+bool long(int steps)
+{
+    return steps > 50;
+}
+
+int byLength(int steps)
+{
+    return -steps;
+}
+
+List<int> query(List<int> numbers)
+{
+    return numbers.select(collatz()).where(long()).orderBy(byLength());
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+
+def run(size: int, workers: int) -> float:
+    program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+    interpreter = Interpreter(program, memoize=False, parallel_workers=workers, parallel_threshold=1)
+    numbers = Value(ElementType(Type.LIST, Type.INT), list(range(1, size + 1)))
+    start = time.perf_counter()
+    try:
+        interpreter.call_function("query", [numbers])
+    finally:
+        interpreter.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling of parallel LINQ execution with the number of workers.")
+    parser.add_argument('--size', type=int, default=2000, help='Number of elements in the queried list')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count(), help='Largest number of workers to try')
+    args = parser.parse_args()
+
+    baseline = run(args.size, 1)
+    print(f"workers: 1, time: {baseline:.3f} s, speedup: 1.00")
+    for workers in range(2, args.max_workers + 1):
+        elapsed = run(args.size, workers)
+        print(f"workers: {workers}, time: {elapsed:.3f} s, speedup: {baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
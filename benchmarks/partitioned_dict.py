@@ -0,0 +1,92 @@
+import argparse
+import os
+import time
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, KeyValueType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.partitioned_map import PartitionedStorage, ProcessTransport
+from src.interpreter.value import Value
+
+
+PROGRAM = """
+int collatz(Pair<int, int> entry)
+{
+    int n = entry.value();
+    int steps = 0;
+    while (n > 1)
+    {
+        int half = (int) (n / 2);
+        if (half * 2 == n)
+        {
+            n = half;
+        }
+        else
+        {
+            n = 3 * n + 1;
+        }
+        steps = steps + 1;
+    }
+    return steps;
+}
+
+bool odd(Pair<int, int> entry)
+{
+    int half = (int) (entry.key() / 2);
+    return half * 2 != entry.key();
+}
+
+int query(Dict<int, int> numbers)
+{
+    return numbers.where(odd()).select(collatz()).sum();
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+
+def run(program, size: int, shards: int) -> tuple[float, int]:
+    interpreter = Interpreter(program, memoize=False)
+    storage = PartitionedStorage(ProcessTransport(shards, program)) if shards else None
+    entries = storage.create() if storage else {}
+    entries.update((index, index + 1) for index in range(size))
+    numbers = Value(KeyValueType(Type.DICT, Type.INT, Type.INT), entries)
+    start = time.perf_counter()
+    try:
+        result = interpreter.call_function("query", [numbers]).value
+    finally:
+        interpreter.close()
+        if storage:
+            storage.close()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of map tasks on a Dict partitioned across worker "
+                                                 "processes, compared with the same query on an in-memory Dict.")
+    parser.add_argument('--size', type=int, default=2000, help='Number of Dict entries')
+    parser.add_argument('--max-shards', type=int, default=max(2, min(os.cpu_count(), 8)),
+                        help='Largest number of shards to try; every power of two up to it is measured')
+    args = parser.parse_args()
+
+    program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+    baseline, expected = run(program, args.size, 0)
+    print(f"in memory: {baseline:.3f} s, {args.size / baseline:.0f} entries/s")
+    shards = 1
+    while shards <= args.max_shards:
+        elapsed, result = run(program, args.size, shards)
+        assert result == expected
+        print(f"shards: {shards}, time: {elapsed:.3f} s, {args.size / elapsed:.0f} entries/s, "
+              f"speedup: {baseline / elapsed:.2f}")
+        shards *= 2
+
+
+if __name__ == "__main__":
+    main()
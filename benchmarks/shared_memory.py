@@ -0,0 +1,61 @@
+import argparse
+import os
+import pickle
+import time
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, BaseType, ElementType, KeyValueType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.typed_list import typed_list
+from src.interpreter.value import Value
+
+
+PROGRAM = """
+float score(List<float> weights, Dict<int, float> bias, int worker)
+{
+    return weights[worker] + bias[worker];
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+
+def run(arguments: list[Value], interpreter: Interpreter, calls: int) -> float:
+    argument_lists = [arguments + [Value(BaseType(Type.INT), index)] for index in range(calls)]
+    start = time.perf_counter()
+    interpreter.call_function_parallel("score", argument_lists)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calls fanned out to worker processes with List and Dict arguments "
+                                                 "copied to every call and placed in shared memory.")
+    parser.add_argument('--size', type=int, default=1000000, help='Number of List elements and Dict entries')
+    parser.add_argument('--calls', type=int, default=16, help='Number of calls')
+    parser.add_argument('--workers', type=int, default=max(2, min(os.cpu_count(), 4)), help='Number of worker processes')
+    args = parser.parse_args()
+
+    program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+    interpreter = Interpreter(program, memoize=False, parallel_workers=args.workers)
+    try:
+        weights = Value(ElementType(Type.LIST, Type.FLOAT), typed_list(Type.FLOAT, (0.5 for _ in range(args.size))))
+        bias = Value(KeyValueType(Type.DICT, Type.INT, Type.FLOAT), {index: 0.25 for index in range(args.size)})
+        interpreter.call_function_parallel("score", [[weights, bias, Value(BaseType(Type.INT), 0)]])
+        for mode in ("copied", "shared"):
+            arguments = [weights, bias] if mode == "copied" else [interpreter.share(weights), interpreter.share(bias)]
+            size = len(pickle.dumps(arguments))
+            elapsed = run(arguments, interpreter, args.calls)
+            print(f"{mode}: {args.calls} calls in {elapsed:.2f} s, {size / 2 ** 20:.1f} MiB sent per call")
+    finally:
+        interpreter.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import random
+import time
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, BaseType, KeyValueType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.sorted_map import SortedMap
+from src.interpreter.value import Value
+
+
+PROGRAM = """
+int byKey(Pair<int, int> entry)
+{
+    return entry.key();
+}
+
+bool inWindow(Pair<int, int> entry)
+{
+    return entry.key() >= 1000 && entry.key() < 1100;
+}
+
+int ordered(Dict<int, int> numbers, int count)
+{
+    int total = 0;
+    int i = 0;
+    while (i < count)
+    {
+        numbers[-i] = i;
+        total = total + numbers.orderBy(byKey()).take(10).keys().length();
+        total = total + numbers.where(inWindow()).keys().length();
+        i = i + 1;
+    }
+    return total;
+}
+
+int sorted(SortedDict<int, int> numbers, int count)
+{
+    int total = 0;
+    int i = 0;
+    while (i < count)
+    {
+        numbers[-i] = i;
+        total = total + numbers.orderBy(byKey()).take(10).keys().length();
+        total = total + numbers.range(1000, 1100).keys().length();
+        i = i + 1;
+    }
+    return total;
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+
+def run(function: str, numbers: Value, count: int) -> tuple[float, Value]:
+    program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+    interpreter = Interpreter(program, memoize=False)
+    start = time.perf_counter()
+    result = interpreter.call_function(function, [numbers, Value(BaseType(Type.INT), count)])
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ordered reads and key ranges on a Dict and on a SortedDict.")
+    parser.add_argument('--size', type=int, default=5000, help='Number of entries')
+    parser.add_argument('--queries', type=int, default=20, help='Number of loop iterations, each adding one entry')
+    args = parser.parse_args()
+
+    keys = random.Random(0).sample(range(args.size * 10), args.size)
+    entries = [(key, key % 1000) for key in keys]
+    dict_time, dict_result = run("ordered", Value(KeyValueType(Type.DICT, Type.INT, Type.INT), dict(entries)),
+                                 args.queries)
+    sorted_time, sorted_result = run("sorted", Value(KeyValueType(Type.SORTED_DICT, Type.INT, Type.INT),
+                                                     SortedMap(entries)), args.queries)
+    assert dict_result == sorted_result
+    print(f"Dict: {dict_time:.3f} s, SortedDict: {sorted_time:.3f} s, speedup: {dict_time / sorted_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
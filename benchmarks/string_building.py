@@ -0,0 +1,81 @@
+import argparse
+import time
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, BaseType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.value import Value
+
+
+PROGRAM = """
+int concatenated(int count, string piece)
+{
+    string result = "";
+    int i = 0;
+    while (i < count)
+    {
+        result = result + piece;
+        i = i + 1;
+    }
+    return 0;
+}
+
+int built(int count, string piece)
+{
+    StringBuilder result = new StringBuilder();
+    int i = 0;
+    while (i < count)
+    {
+        result.append(piece);
+        i = i + 1;
+    }
+    string text = result.toString();
+    return 0;
+}
+
+int chain(int count, string piece)
+{
+    int i = 0;
+    while (i < count)
+    {
+        string line = "Klucz: " + piece + ", wartość: " + piece + ", " + piece + ", " + piece + ";";
+        i = i + 1;
+    }
+    return 0;
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+
+def run(name: str, count: int, piece: str) -> float:
+    program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+    interpreter = Interpreter(program, memoize=False, max_loop_iterations=100000000)
+    start = time.perf_counter()
+    interpreter.call_function(name, [Value(BaseType(Type.INT), count), Value(BaseType(Type.STRING), piece)])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Building a long string with + in a loop and with StringBuilder, "
+                                                 "and evaluating a chain of string additions.")
+    parser.add_argument('--counts', type=int, nargs='+', default=[5000, 10000, 20000],
+                        help='Numbers of appended pieces')
+    parser.add_argument('--piece-size', type=int, default=100, help='Length of every appended piece')
+    args = parser.parse_args()
+
+    piece = "x" * args.piece_size
+    for count in args.counts:
+        times = {name: run(name, count, piece) for name in ("concatenated", "built", "chain")}
+        print(f"pieces: {count}, " + ", ".join(f"{name}: {elapsed:.3f} s" for name, elapsed in times.items()))
+
+
+if __name__ == "__main__":
+    main()
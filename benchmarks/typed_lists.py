@@ -0,0 +1,89 @@
+import argparse
+import time
+import tracemalloc
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, ElementType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.value import Value
+from src.interpreter.typed_list import typed_list
+
+
+PROGRAM = """
+int intTotal(List<int> numbers)
+{
+    return numbers.sum();
+}
+
+int intLargest(List<int> numbers)
+{
+    return numbers.max();
+}
+
+float floatTotal(List<float> numbers)
+{
+    return numbers.sum();
+}
+
+float floatLargest(List<float> numbers)
+{
+    return numbers.max();
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+ELEMENTS = {
+    Type.INT: lambda size: (index * 7 for index in range(size)),
+    Type.FLOAT: lambda size: (index * 0.5 for index in range(size)),
+    Type.BOOL: lambda size: (index % 3 == 0 for index in range(size)),
+}
+
+
+def build(element_type: Type, size: int, typed: bool) -> tuple[Value, int]:
+    tracemalloc.start()
+    elements = ELEMENTS[element_type](size)
+    values = typed_list(element_type, elements) if typed else list(elements)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Value(ElementType(Type.LIST, element_type), values), memory
+
+
+def run(function: str, numbers: Value) -> float:
+    program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+    interpreter = Interpreter(program, memoize=False)
+    start = time.perf_counter()
+    interpreter.call_function(function, [numbers])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and iteration time of array-backed List<int/float/bool> against plain lists.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000000, 10000000], help='Numbers of list elements')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        for element_type in ELEMENTS:
+            name = element_type.name.lower()
+            plain, plain_memory = build(element_type, size, typed=False)
+            typed, typed_memory = build(element_type, size, typed=True)
+            assert plain.value == typed.value
+            print(f"List<{name}> x {size}: memory plain {plain_memory / size:.1f} B, typed {typed_memory / size:.1f} B"
+                  f" per element ({plain_memory / typed_memory:.1f}x less)")
+            if element_type == Type.BOOL:
+                continue
+            for function in (f"{name}Total", f"{name}Largest"):
+                plain_time, typed_time = run(function, plain), run(function, typed)
+                print(f"  {function}: plain {plain_time:.3f} s, typed {typed_time:.3f} s,"
+                      f" speedup: {plain_time / typed_time:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import time
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, BaseType, KeyValueType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.value import Value
+
+
+PROGRAM = """
+bool isSeven(Pair<int, int> entry)
+{
+    return entry.value() == 7;
+}
+
+bool inRange(Pair<int, int> entry)
+{
+    return entry.value() >= 100 && entry.value() < 110;
+}
+
+int lookups(Dict<int, int> numbers, int count)
+{
+    int found = 0;
+    int i = 0;
+    while (i < count)
+    {
+        numbers[i] = i;
+        found = found + numbers.where(isSeven()).keys().length() + numbers.where(inRange()).keys().length();
+        i = i + 1;
+    }
+    return found;
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+
+def run(numbers: dict, count: int, index: bool) -> tuple[float, Value, Interpreter]:
+    program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+    interpreter = Interpreter(program, memoize=False, index_dict_values=index)
+    arguments = [Value(KeyValueType(Type.DICT, Type.INT, Type.INT), dict(numbers)), Value(BaseType(Type.INT), count)]
+    start = time.perf_counter()
+    result = interpreter.call_function("lookups", arguments)
+    return time.perf_counter() - start, result, interpreter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repeated where lookups on Dict values with and without a value index.")
+    parser.add_argument('--size', type=int, default=10000, help='Number of entries in the Dict')
+    parser.add_argument('--lookups', type=int, default=20, help='Number of loop iterations, each changing one entry')
+    args = parser.parse_args()
+
+    numbers = {key: key % 1000 for key in range(args.size)}
+    scan_time, scan_result, _ = run(numbers, args.lookups, index=False)
+    index_time, index_result, interpreter = run(numbers, args.lookups, index=True)
+    assert scan_result == index_result
+    hits, misses = interpreter.value_index_statistics()
+    print(f"scan: {scan_time:.3f} s, index: {index_time:.3f} s, speedup: {scan_time / index_time:.1f}"
+          f" ({hits} index hits, {misses} misses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import time
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, ElementType
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.value import Value
+from src.interpreter.typed_list import typed_list
+
+
+PROGRAM = """
+int multiply(int number)
+{
+    return number * 4;
+}
+
+bool greater(int number)
+{
+    return number > 12;
+}
+
+int descending(int number)
+{
+    return -number;
+}
+
+List<int> query(List<int> numbers)
+{
+    return numbers.select(multiply()).where(greater()).orderBy(descending());
+}
+
+int main()
+{
+    return 0;
+}
+"""
+
+
+def run(numbers: Value, vectorize: bool) -> tuple[float, Value]:
+    program = Parser(Filter(Lexer(Scanner(StringIO(PROGRAM))))).parse_program()
+    interpreter = Interpreter(program, memoize=False, vectorize=vectorize)
+    start = time.perf_counter()
+    result = interpreter.call_function("query", [numbers])
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="select/where/orderBy with NumPy-vectorized callbacks against per-element calls.")
+    parser.add_argument('--size', type=int, default=200000, help='Number of elements in the queried list')
+    args = parser.parse_args()
+
+    numbers = Value(ElementType(Type.LIST, Type.INT), typed_list(Type.INT, range(args.size)))
+    element_time, element_result = run(numbers, vectorize=False)
+    vector_time, vector_result = run(numbers, vectorize=True)
+    assert element_result == vector_result
+    print(f"per element: {element_time:.3f} s, vectorized: {vector_time:.4f} s, speedup: {element_time / vector_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
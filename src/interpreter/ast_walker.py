@@ -0,0 +1,263 @@
+from typing import TYPE_CHECKING
+
+from src.interpreter.visitor import Visitor
+
+if TYPE_CHECKING:
+    from src.parser.classes.function_definition import FunctionDefinition
+    from src.parser.classes.program import Program
+    from src.parser.classes.block import Block
+    from src.parser.classes.statement import (ReturnStatement, DeclarationStatement, InitializationStatement,
+                                              ExpressionStatement, AssignmentStatement, IfStatement, WhileStatement)
+    from src.parser.classes.expression import (CastingExpression, IndexingExpression, LiteralExpression,
+                                               IdOrCallExpression, IdExpression, FunctionCallExpression,
+                                               FieldAccessExpression, MethodCallExpression,
+                                               MethodCallAndFieldAccessExpression, IndexAccessExpression,
+                                               FunctionCallAndIndexExpression, ClassInitializationExpression,
+                                               BinaryExpression, UnaryExpression)
+
+
+# Visitor walking the whole AST without evaluating it.
+# Static analyses override only the nodes they are interested in.
+class AstWalker(Visitor):
+    def walk(self, element) -> None:
+        if element is not None:
+            element.accept(self)
+
+    def walk_all(self, elements) -> None:
+        for element in elements or []:
+            self.walk(element)
+
+    def _walk_binary(self, element: 'BinaryExpression') -> None:
+        self.walk(element.left)
+        self.walk(element.right)
+
+    def _walk_unary(self, element: 'UnaryExpression') -> None:
+        self.walk(element.expression)
+
+    def visit_program(self, element: 'Program'):
+        for function in element.functions.values():
+            self.walk(function)
+
+    def visit_function_definition(self, element: 'FunctionDefinition'):
+        self.walk(element.block)
+
+    def visit_block(self, element: 'Block'):
+        self.walk_all(element.statements)
+
+    def visit_return_statement(self, element: 'ReturnStatement'):
+        self.walk(element.expression)
+
+    def visit_declaration_statement(self, element: 'DeclarationStatement'):
+        pass
+
+    def visit_initialization_statement(self, element: 'InitializationStatement'):
+        self.walk(element.expression)
+
+    def visit_expression_statement(self, element: 'ExpressionStatement'):
+        self.walk(element.expression)
+
+    def visit_assignment_statement(self, element: 'AssignmentStatement'):
+        self.walk(element.expression)
+        self.walk(element.assign_expression)
+
+    def visit_if_statement(self, element: 'IfStatement'):
+        self.walk(element.if_part.expression)
+        self.walk(element.if_part.block)
+        for part in element.else_if_parts or []:
+            self.walk(part.expression)
+            self.walk(part.block)
+        if element.else_part is not None:
+            self.walk(element.else_part.block)
+
+    def visit_while_statement(self, element: 'WhileStatement'):
+        self.walk(element.expression)
+        self.walk(element.block)
+
+    def visit_casting_expression(self, element: 'CastingExpression'):
+        self._walk_unary(element)
+
+    def visit_indexing_expression(self, element: 'IndexingExpression'):
+        self._walk_unary(element)
+        self.walk(element.index)
+
+    def visit_literal_expression(self, element: 'LiteralExpression'):
+        pass
+
+    def visit_id_or_call_expression(self, element: 'IdOrCallExpression'):
+        self._walk_binary(element)
+
+    def visit_id_expression(self, element: 'IdExpression'):
+        pass
+
+    def visit_function_call_expression(self, element: 'FunctionCallExpression'):
+        self.walk_all(element.arguments)
+
+    def visit_field_access_expression(self, element: 'FieldAccessExpression'):
+        pass
+
+    def visit_method_call_expression(self, element: 'MethodCallExpression'):
+        self.walk_all(element.arguments)
+
+    def visit_method_call_and_field_access_expression(self, element: 'MethodCallAndFieldAccessExpression'):
+        self.walk_all(element.arguments)
+        self.walk(element.index)
+
+    def visit_index_access_expression(self, element: 'IndexAccessExpression'):
+        self.walk(element.index)
+
+    def visit_function_call_and_index_expression(self, element: 'FunctionCallAndIndexExpression'):
+        self.walk_all(element.arguments)
+        self.walk(element.index)
+
+    def visit_class_initialization_expression(self, element: 'ClassInitializationExpression'):
+        self.walk_all(element.arguments)
+
+    def visit_or_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_and_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_greater_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_less_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_greater_equal_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_less_equal_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_equal_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_not_equal_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_multiplication_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_division_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_addition_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_subtraction_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_dot_call_expression(self, element):
+        self._walk_binary(element)
+
+    def visit_negation_expression(self, element):
+        self._walk_unary(element)
+
+    def visit_unary_subtraction_expression(self, element):
+        self._walk_unary(element)
+
+    def visit_term_expression(self, element):
+        self._walk_unary(element)
+
+    def visit_print_function(self, element):
+        pass
+
+    def visit_value_function(self, element):
+        pass
+
+    def visit_key_function(self, element):
+        pass
+
+    def visit_keys_function(self, element):
+        pass
+
+    def visit_values_function(self, element):
+        pass
+
+    def visit_add_function(self, element):
+        pass
+
+    def visit_is_key_function(self, element):
+        pass
+
+    def visit_length_function(self, element):
+        pass
+
+    def visit_push_function(self, element):
+        pass
+
+    def visit_pop_function(self, element):
+        pass
+
+    def visit_remove_function(self, element):
+        pass
+
+    def visit_for_each_function(self, element):
+        pass
+
+    def visit_where_function(self, element):
+        pass
+
+    def visit_select_function(self, element):
+        pass
+
+    def visit_orderby_function(self, element):
+        pass
+
+    def visit_take_function(self, element):
+        pass
+
+    def visit_group_by_function(self, element):
+        pass
+
+    def visit_join_function(self, element):
+        pass
+
+    def visit_sum_function(self, element):
+        pass
+
+    def visit_min_function(self, element):
+        pass
+
+    def visit_max_function(self, element):
+        pass
+
+    def visit_count_function(self, element):
+        pass
+
+    def visit_any_function(self, element):
+        pass
+
+    def visit_all_function(self, element):
+        pass
+
+    def visit_first_function(self, element):
+        pass
+
+    def visit_range_function(self, element):
+        pass
+
+    def visit_contains_function(self, element):
+        pass
+
+    def visit_union_function(self, element):
+        pass
+
+    def visit_intersect_function(self, element):
+        pass
+
+    def visit_except_function(self, element):
+        pass
+
+    def visit_distinct_function(self, element):
+        pass
+
+    def visit_map_file_function(self, element):
+        pass
+
+    def visit_append_function(self, element):
+        pass
+
+    def visit_to_string_function(self, element):
+        pass
@@ -0,0 +1,39 @@
+from collections.abc import Sequence
+from typing import Iterator, Optional
+
+
+# Read-only List over the keys or values of a Dict, returned by keys() and values() instead of a copy.
+# Positional access builds an index once per view; the owning Value materializes the view before any change.
+class DictView(Sequence):
+    def __init__(self, entries: dict, keys: bool):
+        self._entries = entries
+        self._keys = keys
+        self._index: Optional[list] = None
+
+    @property
+    def entries(self) -> dict:
+        return self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._entries.keys() if self._keys else self._entries.values())
+
+    def __getitem__(self, index):
+        if self._index is None:
+            self._index = list(self)
+        return self._index[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, DictView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
@@ -0,0 +1,238 @@
+import copy
+import itertools
+import pickle
+import re
+import sqlite3
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping, ItemsView, ValuesView
+from typing import Any, Iterator
+
+from src.interpreter.bloom_filter import BloomFilter
+from src.interpreter.interpreter_error import InterpreterError
+
+
+_DELETED = object()
+_MISSING = object()
+
+# values sqlite stores and returns unchanged; anything else is pickled into a BLOB
+_INT_RANGE = range(-2 ** 63, 2 ** 63)
+_TABLE_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_FETCH_SIZE = 4096
+# the Bloom filter is rebuilt from the table with this many times more capacity once it is full
+_BLOOM_GROWTH = 4
+
+
+def _encode(value) -> Any:
+    if type(value) is str or (type(value) is int and value in _INT_RANGE) or (type(value) is float and value == value):
+        return value
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(value) -> Any:
+    return pickle.loads(value) if isinstance(value, bytes) else value
+
+
+# One SQLite database holding the Dicts of an interpreter run. Dicts created by the program live in
+# TEMP tables, dropped with their value or when the connection closes; named tables opened by the host persist.
+class DiskStorage:
+    def __init__(self, path: str = "", cache_size: int = 100000, batch_size: int = 10000):
+        if cache_size < 0 or batch_size < 1:
+            raise InterpreterError(message="Disk Dict cache size can't be negative and batch size must be positive")
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA temp_store = FILE")
+        if path:
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._cache_size = cache_size
+        self._batch_size = batch_size
+        self._maps: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._counter = itertools.count()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self._connection
+
+    def create(self) -> 'DiskMap':
+        table = f"temp.dict_{next(self._counter)}"
+        self._create_table(table)
+        disk_map = DiskMap(self, table, self._cache_size, self._batch_size)
+        weakref.finalize(disk_map, self._drop_table, table)
+        return disk_map
+
+    def open(self, name: str) -> 'DiskMap':
+        if not _TABLE_NAME.fullmatch(name):
+            raise InterpreterError(message=f"Invalid Dict table name: {name}")
+        self._create_table(f"main.{name}")
+        return DiskMap(self, f"main.{name}", self._cache_size, self._batch_size)
+
+    def register(self, disk_map: 'DiskMap') -> None:
+        self._maps[disk_map.table] = disk_map
+
+    def flush(self) -> None:
+        for disk_map in list(self._maps.values()):
+            disk_map.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
+
+    def _create_table(self, table: str) -> None:
+        self._connection.execute(f"CREATE TABLE IF NOT EXISTS {table} "
+                                 f"(id INTEGER PRIMARY KEY, key UNIQUE NOT NULL, value)")
+        self._connection.commit()
+
+    def _drop_table(self, table: str) -> None:
+        try:
+            self._connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self._connection.commit()
+        except sqlite3.ProgrammingError:
+            pass
+
+
+# Dict entries kept in an SQLite table in insertion order, with the same mapping interface as dict.
+# Recently read entries stay in a bounded LRU cache, writes are buffered and stored in batches by flush(),
+# and a Bloom filter over the keys answers most lookups of missing keys without reading the table.
+class DiskMap(MutableMapping):
+    def __init__(self, storage: DiskStorage, table: str, cache_size: int, batch_size: int):
+        self._storage = storage
+        self._connection = storage.connection
+        self._table = table
+        self._cache_size = cache_size
+        self._batch_size = batch_size
+        self._cache: OrderedDict = OrderedDict()
+        # key -> value or _DELETED, in the order of the changes
+        self._pending: dict = {}
+        # pending keys deleted from the table before being added again, which moves them to the end
+        self._reinserted: set = set()
+        self._length = self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        self._bloom = self._build_bloom(max(self._length * 2, 1024))
+        self._cache_hits = 0
+        self._bloom_skips = 0
+        self._table_reads = 0
+        storage.register(self)
+
+    @property
+    def table(self) -> str:
+        return self._table
+
+    def statistics(self) -> dict[str, int]:
+        return {"cache_hits": self._cache_hits, "bloom_skips": self._bloom_skips, "table_reads": self._table_reads}
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, key) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def __getitem__(self, key):
+        if (value := self._lookup(key)) is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        if self._lookup(key) is _MISSING:
+            self._length += 1
+            if self._length > self._bloom.capacity:
+                self._bloom = self._build_bloom(self._bloom.capacity * _BLOOM_GROWTH)
+            self._bloom.add(key)
+            if self._pending.pop(key, None) is _DELETED:
+                self._reinserted.add(key)
+        self._pending[key] = value
+        self._remember(key, value)
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def __delitem__(self, key) -> None:
+        if self._lookup(key) is _MISSING:
+            raise KeyError(key)
+        self._length -= 1
+        self._cache.pop(key, None)
+        self._pending.pop(key, None)
+        self._reinserted.discard(key)
+        self._pending[key] = _DELETED
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def __iter__(self) -> Iterator:
+        return (key for key, in self._rows("key"))
+
+    def items(self) -> ItemsView:
+        return _DiskItemsView(self)
+
+    def values(self) -> ValuesView:
+        return _DiskValuesView(self)
+
+    def __copy__(self) -> 'DiskMap':
+        self.flush()
+        result = self._storage.create()
+        self._connection.execute(f"INSERT INTO {result.table} (key, value) SELECT key, value FROM {self._table} ORDER BY id")
+        self._connection.commit()
+        result._length = self._length
+        result._bloom = copy.copy(self._bloom)
+        return result
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        deleted = [(_encode(key),) for key, value in self._pending.items()
+                   if value is _DELETED or key in self._reinserted]
+        if deleted:
+            self._connection.executemany(f"DELETE FROM {self._table} WHERE key = ?", deleted)
+        self._connection.executemany(
+            f"INSERT INTO {self._table} (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            ((_encode(key), _encode(value)) for key, value in self._pending.items() if value is not _DELETED))
+        self._connection.commit()
+        self._pending.clear()
+        self._reinserted.clear()
+
+    def _lookup(self, key) -> Any:
+        if (value := self._pending.get(key, _MISSING)) is not _MISSING:
+            return _MISSING if value is _DELETED else value
+        if (value := self._cache.get(key, _MISSING)) is not _MISSING:
+            self._cache_hits += 1
+            self._cache.move_to_end(key)
+            return value
+        if key not in self._bloom:
+            self._bloom_skips += 1
+            return _MISSING
+        self._table_reads += 1
+        row = self._connection.execute(f"SELECT value FROM {self._table} WHERE key = ?", (_encode(key),)).fetchone()
+        if row is None:
+            return _MISSING
+        value = _decode(row[0])
+        self._remember(key, value)
+        return value
+
+    def _remember(self, key, value) -> None:
+        if self._cache_size == 0:
+            return
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def _rows(self, columns: str) -> Iterator[tuple]:
+        self.flush()
+        cursor = self._connection.execute(f"SELECT {columns} FROM {self._table} ORDER BY id")
+        while rows := cursor.fetchmany(_FETCH_SIZE):
+            for row in rows:
+                yield tuple(_decode(column) for column in row)
+
+    def _build_bloom(self, capacity: int) -> BloomFilter:
+        bloom = BloomFilter(capacity)
+        bloom.update(self)
+        return bloom
+
+
+class _DiskItemsView(ItemsView):
+    def __iter__(self) -> Iterator[tuple]:
+        return self._mapping._rows("key, value")
+
+
+class _DiskValuesView(ValuesView):
+    def __iter__(self) -> Iterator:
+        return (value for value, in self._mapping._rows("value"))
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from src.parser.classes.parameter import Parameter, ThisParameter, FunctionParameter
+from src.parser.classes.parameter import Parameter, ThisParameter, FunctionParameter, OptionalFunctionParameter
 from src.parser.classes.type import BaseType, Type, KeyValueType, ElementType
 
 from src.interpreter.base_function_definition import BaseFunctonDefinition
@@ -51,7 +51,7 @@ class ValuesFunctionDefinition(BaseFunctonDefinition, Component):
 
 
 class AddFunctionDefinition(BaseFunctonDefinition, Component):
-    def __init__(self, parameters=[Parameter(KeyValueType(Type.PAIR, Type.UNKNOWN, Type.UNKNOWN), '_add'),
+    def __init__(self, parameters=[Parameter(Type.UNKNOWN, '_add'),
                                    ThisParameter(KeyValueType(Type.DICT, Type.UNKNOWN, Type.UNKNOWN), '_add_this')]):
         super().__init__(parameters)
 
@@ -130,3 +130,162 @@ class OrderByFunctionDefinition(BaseFunctonDefinition, Component):
 
     def accept(self, visitor: 'Visitor') -> None:
         visitor.visit_orderby_function(self)
+
+
+class TakeFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[Parameter(BaseType(Type.INT), '_take'), ThisParameter(KeyValueType(Type.DICT, Type.UNKNOWN, Type.UNKNOWN), '_take_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_take_function(self)
+
+
+class GroupByFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[FunctionParameter(Type.UNKNOWN, '_group_by'), ThisParameter(KeyValueType(Type.DICT, Type.UNKNOWN, Type.UNKNOWN), '_group_by_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_group_by_function(self)
+
+
+class JoinFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[Parameter(Type.UNKNOWN, '_join'), FunctionParameter(Type.UNKNOWN, '_join_left_key'),
+                                   FunctionParameter(Type.UNKNOWN, '_join_right_key'), FunctionParameter(Type.UNKNOWN, '_join_result'),
+                                   ThisParameter(KeyValueType(Type.DICT, Type.UNKNOWN, Type.UNKNOWN), '_join_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_join_function(self)
+
+
+class SumFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[OptionalFunctionParameter(Type.UNKNOWN, '_sum'), ThisParameter(KeyValueType(Type.DICT, Type.UNKNOWN, Type.UNKNOWN), '_sum_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_sum_function(self)
+
+
+class MinFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[OptionalFunctionParameter(Type.UNKNOWN, '_min'), ThisParameter(KeyValueType(Type.DICT, Type.UNKNOWN, Type.UNKNOWN), '_min_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_min_function(self)
+
+
+class MaxFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[OptionalFunctionParameter(Type.UNKNOWN, '_max'), ThisParameter(KeyValueType(Type.DICT, Type.UNKNOWN, Type.UNKNOWN), '_max_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_max_function(self)
+
+
+class CountFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[FunctionParameter(Type.UNKNOWN, '_count'), ThisParameter(KeyValueType(Type.DICT, Type.UNKNOWN, Type.UNKNOWN), '_count_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_count_function(self)
+
+
+class AnyFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[FunctionParameter(Type.UNKNOWN, '_any'), ThisParameter(KeyValueType(Type.DICT, Type.UNKNOWN, Type.UNKNOWN), '_any_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_any_function(self)
+
+
+class AllFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[FunctionParameter(Type.UNKNOWN, '_all'), ThisParameter(KeyValueType(Type.DICT, Type.UNKNOWN, Type.UNKNOWN), '_all_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_all_function(self)
+
+
+class FirstFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[FunctionParameter(Type.UNKNOWN, '_first'), ThisParameter(KeyValueType(Type.DICT, Type.UNKNOWN, Type.UNKNOWN), '_first_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_first_function(self)
+
+
+class RangeFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[Parameter(Type.UNKNOWN, '_range_low'), Parameter(Type.UNKNOWN, '_range_high'),
+                                   ThisParameter(KeyValueType(Type.SORTED_DICT, Type.UNKNOWN, Type.UNKNOWN), '_range_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_range_function(self)
+
+
+class ContainsFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[Parameter(Type.UNKNOWN, '_contains'), ThisParameter(ElementType(Type.SET, Type.UNKNOWN), '_contains_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_contains_function(self)
+
+
+class UnionFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[Parameter(ElementType(Type.SET, Type.UNKNOWN), '_union'),
+                                   ThisParameter(ElementType(Type.SET, Type.UNKNOWN), '_union_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_union_function(self)
+
+
+class IntersectFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[Parameter(ElementType(Type.SET, Type.UNKNOWN), '_intersect'),
+                                   ThisParameter(ElementType(Type.SET, Type.UNKNOWN), '_intersect_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_intersect_function(self)
+
+
+class ExceptFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[Parameter(ElementType(Type.SET, Type.UNKNOWN), '_except'),
+                                   ThisParameter(ElementType(Type.SET, Type.UNKNOWN), '_except_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_except_function(self)
+
+
+class DistinctFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[ThisParameter(ElementType(Type.LIST, Type.UNKNOWN), '_distinct_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_distinct_function(self)
+
+
+class MapFileFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[Parameter(BaseType(Type.STRING), '_map_file')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_map_file_function(self)
+
+
+class AppendFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[Parameter(BaseType(Type.STRING), '_append'),
+                                   ThisParameter(BaseType(Type.STRING_BUILDER), '_append_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_append_function(self)
+
+
+class ToStringFunctionDefinition(BaseFunctonDefinition, Component):
+    def __init__(self, parameters=[ThisParameter(BaseType(Type.STRING_BUILDER), '_to_string_this')]):
+        super().__init__(parameters)
+
+    def accept(self, visitor: 'Visitor') -> None:
+        visitor.visit_to_string_function(self)
@@ -0,0 +1,106 @@
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from src.parser.classes.expression import (IdExpression, FunctionCallExpression, MethodCallExpression,
+                                           MethodCallAndFieldAccessExpression)
+from src.parser.classes.function_definition import FunctionDefinition
+
+from src.interpreter.ast_walker import AstWalker
+from src.interpreter.purity_analysis import MUTATING_METHODS, root_id, method_chain
+
+if TYPE_CHECKING:
+    from src.parser.classes.program import Program
+    from src.parser.classes.expression import Expression
+    from src.parser.classes.statement import AssignmentStatement
+
+
+class ParameterSummary:
+    def __init__(self, definition: FunctionDefinition):
+        self.definition = definition
+        self.parameters = [parameter.id for parameter in definition.parameters]
+        self.mutated: set[str] = set()
+        # (parameter, callee, argument index) for every parameter passed on unchanged
+        self.passed_on: list[tuple[str, str, int]] = []
+
+
+# Finds parameters that a function never mutates: no push/pop/add/remove or (index) assignment on them,
+# and passed on only to parameters of other functions that don't mutate them either.
+# Such arguments can be bound by reference instead of being copied.
+class EscapeAnalyzer(AstWalker):
+    def __init__(self, program: 'Program', system_functions: Iterable[str] = ()):
+        self._program = program
+        self._system_functions = set(system_functions)
+        self._summaries: dict[str, ParameterSummary] = {}
+        self._current: Optional[ParameterSummary] = None
+        self._read_only: Optional[dict[str, set[str]]] = None
+
+    def read_only_parameters(self) -> dict[str, set[str]]:
+        if self._read_only is None:
+            self._program.accept(self)
+            self._read_only = self._solve()
+        return self._read_only
+
+    def _solve(self) -> dict[str, set[str]]:
+        mutating = {(name, parameter) for name, summary in self._summaries.items() for parameter in summary.mutated}
+        changed = True
+        while changed:
+            changed = False
+            for name, summary in self._summaries.items():
+                for parameter, callee, index in summary.passed_on:
+                    if (name, parameter) in mutating:
+                        continue
+                    if self._mutates_argument(callee, index, mutating):
+                        mutating.add((name, parameter))
+                        changed = True
+        return {name: {parameter for parameter in summary.parameters if (name, parameter) not in mutating}
+                for name, summary in self._summaries.items()}
+
+    def _mutates_argument(self, callee: str, index: int, mutating: set[tuple[str, str]]) -> bool:
+        if callee in self._summaries:
+            parameters = self._summaries[callee].parameters
+            return index < len(parameters) and (callee, parameters[index]) in mutating
+        return callee not in self._system_functions
+
+    def _record_arguments(self, callee: str, arguments: list['Expression']) -> None:
+        for index, argument in enumerate(arguments or []):
+            if isinstance(argument, IdExpression) and argument.id in self._current.parameters:
+                self._current.passed_on.append((argument.id, callee, index))
+        self.walk_all(arguments)
+
+    def _walk_method_chain(self, receiver: 'Expression', chain: 'Expression') -> None:
+        self.walk(receiver)
+        receiver_id = root_id(receiver)
+        for method in method_chain(chain):
+            if isinstance(method, (MethodCallExpression, MethodCallAndFieldAccessExpression, FunctionCallExpression)):
+                if method.id in MUTATING_METHODS and receiver_id in self._current.parameters:
+                    self._current.mutated.add(receiver_id)
+                self._record_arguments(method.id, method.arguments)
+                if isinstance(method, MethodCallAndFieldAccessExpression):
+                    self.walk(method.index)
+            else:
+                self.walk(method)
+
+    def visit_program(self, element: 'Program'):
+        for function in element.functions.values():
+            if isinstance(function, FunctionDefinition):
+                self.walk(function)
+
+    def visit_function_definition(self, element: FunctionDefinition):
+        self._current = ParameterSummary(element)
+        self._summaries[element.name] = self._current
+        self.walk(element.block)
+        self._current = None
+
+    def visit_assignment_statement(self, element: 'AssignmentStatement'):
+        if (target_id := root_id(element.expression)) in self._current.parameters:
+            self._current.mutated.add(target_id)
+        self.walk(element.expression)
+        self.walk(element.assign_expression)
+
+    def visit_function_call_expression(self, element: FunctionCallExpression):
+        self._record_arguments(element.id, element.arguments)
+
+    def visit_id_or_call_expression(self, element):
+        self._walk_method_chain(element.left, element.right)
+
+    def visit_dot_call_expression(self, element):
+        self._walk_method_chain(element.left, element.right)
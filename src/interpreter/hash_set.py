@@ -0,0 +1,47 @@
+from collections.abc import MutableSet
+from typing import Iterable, Iterator
+
+
+# Value of a Set: a hash table of elements that remembers insertion order, so forEach and queries
+# visit the elements in the same order on every run.
+class HashSet(MutableSet):
+    def __init__(self, values: Iterable = ()):
+        self._elements: dict = dict.fromkeys(values)
+
+    @classmethod
+    def _from_iterable(cls, values: Iterable) -> 'HashSet':
+        return cls(values)
+
+    def __len__(self) -> int:
+        return len(self._elements)
+
+    def __contains__(self, value) -> bool:
+        return value in self._elements
+
+    def __iter__(self) -> Iterator:
+        return iter(self._elements)
+
+    def __copy__(self) -> 'HashSet':
+        result = HashSet()
+        result._elements = dict(self._elements)
+        return result
+
+    def __repr__(self) -> str:
+        return f"{{{', '.join(map(repr, self._elements))}}}"
+
+    def add(self, value) -> None:
+        self._elements[value] = None
+
+    def discard(self, value) -> None:
+        self._elements.pop(value, None)
+
+    def union(self, other: Iterable) -> 'HashSet':
+        result = self.__copy__()
+        result._elements.update(dict.fromkeys(other))
+        return result
+
+    def intersection(self, other: 'HashSet') -> 'HashSet':
+        return HashSet(value for value in self if value in other)
+
+    def difference(self, other: 'HashSet') -> 'HashSet':
+        return HashSet(value for value in self if value not in other)
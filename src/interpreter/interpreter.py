@@ -1,12 +1,18 @@
 import argparse
-from typing import TYPE_CHECKING, Union, Optional
+import collections
+import contextlib
+import heapq
+import itertools
+import weakref
+from collections.abc import MutableMapping, Sized
+from typing import TYPE_CHECKING, Callable, Union, Optional, Iterable, Iterator
 
 from src.scanner.position import Position
 
-from src.parser.classes.statement import ReturnStatement
+from src.parser.classes.statement import ReturnStatement, DeclarationStatement, InitializationStatement
 from src.parser.classes.type import BaseType, KeyValueType, ElementType, Type
-from src.parser.classes.expression import FunctionCallExpression, LiteralExpression
-from src.parser.classes.parameter import Parameter, ThisParameter, FunctionParameter
+from src.parser.classes.expression import FunctionCallExpression, IndexAccessExpression, AdditionExpression
+from src.parser.classes.parameter import Parameter, ThisParameter, FunctionParameter, OptionalFunctionParameter
 from src.parser.classes.function_definition import FunctionDefinition
 
 
@@ -15,13 +21,39 @@ from src.interpreter.interpreter_error import (InterpreterError, DivisionError,
                                                ExpressionTypeError, InitializationError, AssignmentError)
 from src.interpreter.variable import Variable
 from src.interpreter.value import Value, BaseValue, KeyValueValue, ElementValue
-from src.interpreter.stack import ExecutionStack, FunctionContext, BlockVariables
+from src.interpreter.stack import ExecutionStack, BlockVariables
 from src.interpreter.embedded_functions import (PrintFunctionDefinition, ValueFunctionDefinition, KeyFunctionDefinition,
                                                 KeysFunctionDefinition, ValuesFunctionDefinition, AddFunctionDefinition,
                                                 IsKeyFunctionDefinition, LengthFunctionDefinition, PushFunctionDefinition,
                                                 PopFunctionDefinition, RemoveFunctionDefinition, ForEachFunctionDefinition,
-                                                WhereFunctionDefinition, SelectFunctionDefinition, OrderByFunctionDefinition)
+                                                WhereFunctionDefinition, SelectFunctionDefinition, OrderByFunctionDefinition,
+                                                TakeFunctionDefinition, GroupByFunctionDefinition, JoinFunctionDefinition,
+                                                SumFunctionDefinition, MinFunctionDefinition, MaxFunctionDefinition,
+                                                CountFunctionDefinition, AnyFunctionDefinition, AllFunctionDefinition,
+                                                FirstFunctionDefinition, RangeFunctionDefinition, ContainsFunctionDefinition,
+                                                UnionFunctionDefinition, IntersectFunctionDefinition, ExceptFunctionDefinition,
+                                                DistinctFunctionDefinition, MapFileFunctionDefinition, AppendFunctionDefinition,
+                                                ToStringFunctionDefinition)
 from src.interpreter.base_function_definition import BaseFunctonDefinition
+from src.interpreter.memo_cache import MemoCache
+from src.interpreter.purity_analysis import PurityAnalyzer, memoizable_functions
+from src.interpreter.tail_call_analysis import find_tail_calls
+from src.interpreter.escape_analysis import EscapeAnalyzer
+from src.interpreter.query import (QueryValue, QueryStage, WHERE, SELECT, ORDER_BY, TAKE, TOP_K, FOR_EACH, GROUP_BY, JOIN,
+                                   DISTINCT, ELEMENT_STAGES)
+from src.interpreter.query_profile import QueryProfile
+from src.interpreter.parallel import ParallelExecutor
+from src.interpreter.typed_list import TypedList, typed_list
+from src.interpreter.vectorize import Vectorizer, numpy
+from src.interpreter.value_index import value_predicate
+from src.interpreter.sorted_map import SortedMap
+from src.interpreter.hash_set import HashSet
+from src.interpreter.string_builder import StringBuilder
+from src.interpreter.disk_map import DiskStorage
+from src.interpreter.mapped_list import map_file
+from src.interpreter.shared_collections import SharedList, SharedDict, SharedSegment
+from src.interpreter.partitioned_map import PartitionedStorage, PartitionedMap, ProcessTransport, Transport
+from src.interpreter.query_planner import QueryPlanner
 
 if TYPE_CHECKING:
     from src.parser.classes.block import Block
@@ -45,18 +77,76 @@ if TYPE_CHECKING:
     from src.parser.classes.if_parts import Part, ExpressionPart
 
 
+_FILTERED = object()
+_EMPTY = object()
+_NOT_PARTITIONED = object()
+
+DICT_TYPES = {Type.DICT, Type.SORTED_DICT}
+
+
 class Interpreter(Visitor):
-    def __init__(self, program: 'Program'):
+    def __init__(self, program: 'Program', memoize: bool = True, memo_size: int = 1024,
+                 memo_exclude: tuple[str, ...] = (), tail_call_elimination: bool = True,
+                 escape_analysis: bool = True, max_loop_iterations: int = 1000000, lazy_linq: bool = True,
+                 optimize_queries: bool = True, explain_queries: bool = False, analyze_queries: bool = False,
+                 parallel_workers: int = 0, parallel_threshold: int = 10000, vectorize: bool = True,
+                 vector_threshold: int = 32, index_dict_values: bool = False, disk_dicts: bool = False,
+                 dict_cache_size: int = 100000, dict_partitions: int = 0, dict_transport: Optional[Transport] = None):
         self._program = program
         program_functions = program.get_functions()
-        self._functions_definition = {**program_functions, **self.system_methods}
+        self._functions_definition = {**self.system_methods, **program_functions}
+        self._memo_caches: dict[str, MemoCache] = {}
+        if memoize:
+            for name in memoizable_functions(program, self.system_methods.keys()):
+                if name not in memo_exclude:
+                    self._memo_caches[name] = MemoCache(memo_size)
         self._execution_stack = ExecutionStack()
         self._last_result: Optional[Value] = None
         self._was_return = False
         self._was_linq = False
         self._max_recursion = 100
-        self._current_recursion = 1
-        self._last_function_call: Optional[FunctionCallExpression] = None
+        self._max_loop_iterations = max_loop_iterations
+        self._loop_iterations = 0
+        self._scoped_blocks: dict[int, bool] = {}
+        self._lazy_linq = lazy_linq
+        self._query_planner: Optional[QueryPlanner] = None
+        self._parallel: Optional[ParallelExecutor] = None
+        self._pure_functions: Optional[set[str]] = None
+        partitioned = dict_partitions > 1 or dict_transport is not None
+        if optimize_queries or parallel_workers > 1 or partitioned:
+            pure_functions = PurityAnalyzer(program, self.system_methods.keys()).pure_functions()
+            self._pure_functions = pure_functions
+            if optimize_queries:
+                self._query_planner = QueryPlanner(pure_functions)
+            if parallel_workers > 1:
+                self._parallel = ParallelExecutor(program, pure_functions, parallel_workers, parallel_threshold)
+        self._vectorizer = Vectorizer(vector_threshold) if vectorize and numpy is not None else None
+        self._index_dict_values = index_dict_values
+        if disk_dicts and partitioned:
+            raise InterpreterError(message="Dicts can't be both kept on disk and partitioned")
+        self._dict_storage = DiskStorage(cache_size=dict_cache_size) if disk_dicts else None
+        self._partitions: Optional[PartitionedStorage] = None
+        if partitioned:
+            self._partitions = PartitionedStorage(dict_transport or ProcessTransport(dict_partitions, program))
+        self._shared_segments: weakref.WeakSet[SharedSegment] = weakref.WeakSet()
+        self._index_hits = 0
+        self._index_misses = 0
+        self._explain_queries = explain_queries or analyze_queries
+        self._analyze_queries = analyze_queries
+        self._query_profiles: dict[tuple, QueryProfile] = {}
+        self._query_location = (1, 1)
+        self._callback_calls = 0
+        self._function_calls: list[FunctionCallExpression] = []
+        self._tail_call_elimination = tail_call_elimination
+        self._tail_calls = find_tail_calls(program)
+        self._pending_tail_call: Optional[list[Variable]] = None
+        self._copy_count = 0
+        self._read_only_parameters: dict[str, set[str]] = {}
+        if escape_analysis:
+            self._read_only_parameters = EscapeAnalyzer(program, self.system_methods.keys()).read_only_parameters()
+            for name, definition in self.system_methods.items():
+                if name not in program_functions:
+                    self._read_only_parameters[name] = {param.id for param in definition.parameters}
 
     system_methods = {
         'keys': KeysFunctionDefinition(),
@@ -73,11 +163,90 @@ class Interpreter(Visitor):
         'print': PrintFunctionDefinition(),
         'orderBy': OrderByFunctionDefinition(),
         'where': WhereFunctionDefinition(),
-        'select': SelectFunctionDefinition()
+        'select': SelectFunctionDefinition(),
+        'take': TakeFunctionDefinition(),
+        'groupBy': GroupByFunctionDefinition(),
+        'join': JoinFunctionDefinition(),
+        'sum': SumFunctionDefinition(),
+        'min': MinFunctionDefinition(),
+        'max': MaxFunctionDefinition(),
+        'count': CountFunctionDefinition(),
+        'any': AnyFunctionDefinition(),
+        'all': AllFunctionDefinition(),
+        'first': FirstFunctionDefinition(),
+        'range': RangeFunctionDefinition(),
+        'contains': ContainsFunctionDefinition(),
+        'union': UnionFunctionDefinition(),
+        'intersect': IntersectFunctionDefinition(),
+        'except': ExceptFunctionDefinition(),
+        'distinct': DistinctFunctionDefinition(),
+        'mapFile': MapFileFunctionDefinition(),
+        'append': AppendFunctionDefinition(),
+        'toString': ToStringFunctionDefinition()
     }
 
+    aggregate_methods = {'sum', 'min', 'max', 'count', 'any', 'all', 'first'}
+    lazy_methods = {WHERE, SELECT, ORDER_BY, TAKE, FOR_EACH, GROUP_BY, JOIN, DISTINCT} | aggregate_methods
+
     def interpret(self):
-        self.visit_program(self._program)
+        try:
+            self.visit_program(self._program)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._parallel is not None:
+            self._parallel.shutdown()
+        if self._dict_storage is not None:
+            self._dict_storage.flush()
+        for segment in list(self._shared_segments):
+            segment.release()
+
+    @property
+    def parallel_runs(self) -> int:
+        return self._parallel.parallel_runs if self._parallel is not None else 0
+
+    @property
+    def map_tasks(self) -> int:
+        return self._partitions.map_tasks if self._partitions is not None else 0
+
+    @property
+    def vectorized_stages(self) -> int:
+        return self._vectorizer.vectorized_stages if self._vectorizer is not None else 0
+
+    def call_function(self, name: str, arguments: list[Value]) -> Value:
+        if not (function_definition := self.find_function_definition(name)):
+            raise InterpreterError(message=f"There is no function with id: {name}")
+        params = function_definition.parameters
+        if len(arguments) != len(params):
+            raise InterpreterError(message=f"Number of arguments and parameters doesn't match")
+        for param, argument in zip(params, arguments):
+            if argument.type != self._define_types(param.type, argument.type):
+                raise ExpressionTypeError(message=f"Param: {param.id} takes value type {param.type}, not {argument.type}")
+        return self._materialize(self._invoke_function(name, function_definition, arguments))
+
+    # runs the function once for every list of arguments, on the worker processes if there are any
+    def call_function_parallel(self, name: str, argument_lists: list[list[Value]]) -> list[Value]:
+        if self._parallel is None:
+            return [self.call_function(name, arguments) for arguments in argument_lists]
+        return self._parallel.call_functions(name, argument_lists)
+
+    # copy of a List<int>, List<float> or Dict in shared memory; worker processes get only its handle and
+    # read it without copying. The segment is removed by close() or when the value is garbage collected
+    def share(self, value: Value) -> Value:
+        if isinstance(value.value, (SharedList, SharedDict)):
+            return value
+        if self._is_dict(value):
+            shared = SharedDict.create(value.value)
+        elif isinstance(value.type, ElementType) and value.type.type == Type.LIST:
+            elements = value.value if isinstance(value.value, TypedList) else typed_list(value.type.element_type, value.value)
+            if not isinstance(elements, TypedList):
+                raise InterpreterError(message=f"Only List<int> and List<float> can be shared, not {value.type}")
+            shared = SharedList.create(elements)
+        else:
+            raise InterpreterError(message=f"Value of type {value.type} can't be shared")
+        self._shared_segments.add(shared.segment)
+        return Value(value.type, shared)
 
     @property
     def program(self) -> 'Program':
@@ -95,14 +264,59 @@ class Interpreter(Visitor):
     def last_result(self) -> Value:
         return self._last_result
 
+    @property
+    def copy_count(self) -> int:
+        return self._copy_count
+
+    @property
+    def memo_caches(self) -> dict[str, MemoCache]:
+        return self._memo_caches
+
+    def memo_statistics(self) -> dict[str, tuple[int, int]]:
+        return {name: (cache.hits, cache.misses) for name, cache in self._memo_caches.items()}
+
+    def value_index_statistics(self) -> tuple[int, int]:
+        return self._index_hits, self._index_misses
+
+    @property
+    def read_only_parameters(self) -> dict[str, set[str]]:
+        return self._read_only_parameters
+
+    def frame_statistics(self) -> dict[str, int]:
+        pool = self._execution_stack.pool
+        return {"calls": pool.acquired_contexts, "scopes": pool.acquired_blocks,
+                "allocated_contexts": pool.allocated_contexts, "allocated_blocks": pool.allocated_blocks,
+                "loop_iterations": self._loop_iterations}
+
+    @property
+    def query_profiles(self) -> list[QueryProfile]:
+        return list(self._query_profiles.values())
+
+    def explain(self) -> str:
+        return "\n\n".join(profile.format(self._analyze_queries) for profile in self._query_profiles.values())
+
+    def dump_analysis(self) -> str:
+        lines = []
+        for name, function in self._program.get_functions().items():
+            tail_calls = sum(1 for definition in self._tail_calls.values() if definition is function)
+            read_only = [param.id for param in function.parameters
+                         if param.id in self._read_only_parameters.get(name, set())]
+            lines.append(f"{name}: memoized: {'yes' if name in self._memo_caches else 'no'}, "
+                         f"tail calls: {tail_calls}, "
+                         f"read-only parameters: {', '.join(read_only) if read_only else '-'}")
+        return "\n".join(lines)
+
     def find_function_definition(self, key: str) -> Optional['BaseFunctonDefinition']:
         if key in self._functions_definition.keys():
             return self._functions_definition[key]
         return None
 
+    def _find_method_definition(self, key: str) -> Optional['BaseFunctonDefinition']:
+        return self.system_methods.get(key) or self.find_function_definition(key)
+
     def _stop_program_execution(self):
         fun_stack_length = len(self._execution_stack.function_contexts)
-        if self._current_recursion > self._max_recursion or fun_stack_length > self._max_recursion:
+        if fun_stack_length > self._max_recursion:
             raise InterpreterError(message=f"Maximum recursion. Program stopped")
 
     def _get_left_and_right_element(self, element: 'BinaryExpression') -> tuple[Value, Value]:
@@ -117,18 +331,6 @@ class Interpreter(Visitor):
         expression = self._last_result
         return expression
 
-    def _push_function_context(self, function_context: FunctionContext) -> None:
-        self._execution_stack.push_function_context(function_context)
-
-    def _pop_function_context(self) -> Optional[FunctionContext]:
-        return self._execution_stack.pop_function_context()
-
-    def _push_block_variables(self, block_variable: BlockVariables) -> None:
-        self._execution_stack.push_block_variables(block_variable)
-
-    def _pop_block_variables(self) -> Optional[BlockVariables]:
-        return self._execution_stack.pop_block_variables()
-
     def _add_variable(self, variable: Variable) -> None:
         self._execution_stack.add_variable(variable)
 
@@ -139,42 +341,58 @@ class Interpreter(Visitor):
         variable = self._find_variable("_print")
         print(f"{variable.value.value}")
 
+    def visit_map_file_function(self, element: 'MapFileFunctionDefinition'):
+        path = self._find_variable("_map_file").value.value
+        element_type, elements = map_file(path)
+        self._last_result = Value(ElementType(Type.LIST, element_type), elements)
+
     def visit_value_function(self, element: 'ValueFunctionDefinition'):
         value = self._last_result
         if value.type.type != Type.PAIR:
             raise ExpressionTypeError(message=f"can't evaluate value on {value.type.type} object")
-        self._last_result = Value(BaseType(value.type.value_type), list(value.value.values())[0])
+        self._last_result = Value(self._value_type(value.type.value_type), value.value[1]).contained()
 
     def visit_key_function(self, element: 'KeyFunctionDefinition'):
         value = self._last_result
         if value.type.type != Type.PAIR:
             raise ExpressionTypeError(message=f"can't evaluate key on {value.type.type} object")
-        self._last_result = Value(BaseType(value.type.key_type), list(value.value.keys())[0])
+        self._last_result = Value(self._value_type(value.type.key_type), value.value[0]).contained()
 
     def visit_keys_function(self, element: 'KeysFunctionDefinition'):
-        value = self._last_result
-        if value.type.type != Type.DICT:
+        value = self._materialize(self._last_result)
+        if value.type.type not in DICT_TYPES:
             raise ExpressionTypeError(message=f"can't evaluate key on {value.type.type} object")
-        self._last_result = Value(ElementType(Type.LIST, value.type.key_type), list(value.value.keys()))
+        self._last_result = Value(ElementType(Type.LIST, value.type.key_type), value.dict_view(keys=True))
 
     def visit_values_function(self, element: 'ValuesFunctionDefinition'):
-        value = self._last_result
-        if value.type.type != Type.DICT:
+        value = self._materialize(self._last_result)
+        if value.type.type not in DICT_TYPES:
             raise ExpressionTypeError(message=f"can't evaluate key on {value.type.type} object")
-        self._last_result = Value(ElementType(Type.LIST, value.type.value_type), list(value.value.values()))
+        value.share_elements()
+        self._last_result = Value(ElementType(Type.LIST, value.type.value_type), value.dict_view(keys=False))
 
     def visit_add_function(self, element: 'AddFunctionDefinition'):
         variable = self._find_variable("_add")
         this = self._find_variable("_add_this")
+        if self._is_set(this.type):
+            if self._value_type(this.type.element_type) != variable.type:
+                raise InterpreterError(message=f"Types of object and add-element doesn't match")
+            self._make_writable(this.value)
+            this.value.value.add(variable.value.value)
+            self._write_back(this.value)
+            return
         if not (isinstance(this.type, KeyValueType) and isinstance(variable.type, KeyValueType)):
             raise InterpreterError(message=f"Can't evaluate add with non-key-value type object")
         if not (variable.type.key_type == this.type.key_type and variable.type.value_type == this.type.value_type):
             raise InterpreterError(message=f"Can't evaluate add with different type objects ("
                                            f" {variable.type.key_type} : {variable.type.value_type} ) !="
                                            f"  {this.type.key_type} : {this.type.value_type} )")
-        new_value = this.value.value
-        new_value[list(variable.value.value.keys())[0]] = list(variable.value.value.values())[0]
-        this.value.change_value(Value(this.type, new_value))
+        self._make_writable(this.value)
+        key, value = variable.value.value
+        this.value.forget(key)
+        this.value.value[key] = value
+        this.value.entry_changed(key)
+        self._write_back(this.value)
 
     def visit_is_key_function(self, element: 'IsKeyFunctionDefinition'):
         variable = self._find_variable("_is_key")
@@ -187,194 +405,626 @@ class Interpreter(Visitor):
 
     def visit_length_function(self, element: 'LengthFunctionDefinition'):
         this = self._find_variable("_length_this")
-        if not isinstance(this.type, ElementType):
+        if not isinstance(this.type, ElementType) and this.type != BaseType(Type.STRING_BUILDER):
             raise InterpreterError(message=f"Can't evaluate \"length\" on non-element object")
         self._last_result = Value(BaseType(Type.INT), len(this.value.value))
 
+    def visit_append_function(self, element: 'AppendFunctionDefinition'):
+        variable = self._find_variable("_append")
+        this = self._find_variable("_append_this")
+        if this.type != BaseType(Type.STRING_BUILDER):
+            raise InterpreterError(message=f"Can't evaluate \"append\" on non-string-builder object")
+        self._make_writable(this.value)
+        this.value.value.append(variable.value.value)
+        self._write_back(this.value)
+
+    def visit_to_string_function(self, element: 'ToStringFunctionDefinition'):
+        this = self._find_variable("_to_string_this")
+        if this.type != BaseType(Type.STRING_BUILDER):
+            raise InterpreterError(message=f"Can't evaluate \"toString\" on non-string-builder object")
+        self._last_result = Value(BaseType(Type.STRING), str(this.value.value))
+
     def visit_push_function(self, element: 'PushFunctionDefinition'):
         variable = self._find_variable("_push")
         this = self._find_variable("_push_this")
-        if not isinstance(this.type, ElementType):
+        if not isinstance(this.type, ElementType) or this.type.type != Type.LIST:
             raise InterpreterError(message=f"Can't evaluate \"push\" on non-element object")
-        if this.type.element_type != variable.type.type:
+        if self._value_type(this.type.element_type) != variable.type:
             raise InterpreterError(message=f"Types of object and push-element doesn't match")
-        new_value = this.value.value
-        new_value.append(variable.value.value)
-        this.value.change_value(Value(this.type, new_value))
+        self._make_writable(this.value)
+        try:
+            this.value.value.append(variable.value.value)
+        except OverflowError:
+            this.value.change_value(Value(this.type, [*this.value.value, variable.value.value]))
+        self._write_back(this.value)
 
     def visit_pop_function(self, element: 'PopFunctionDefinition'):
         this = self._find_variable("_pop_this")
-        if not isinstance(this.type, ElementType):
+        if not isinstance(this.type, ElementType) or this.type.type != Type.LIST:
             raise InterpreterError(message=f"Can't evaluate \"pop\" on non-element object")
+        self._make_writable(this.value)
+        this.value.forget(len(this.value.value) - 1)
         value = this.value.value.pop()
-        self._last_result = Value(BaseType(this.type.element_type), value)
+        self._write_back(this.value)
+        self._last_result = Value(self._value_type(this.type.element_type), value).contained()
 
     def visit_remove_function(self, element: 'RemoveFunctionDefinition'):
         this = self._find_variable("_remove_this")
         variable = self._find_variable("_remove")
+        if self._is_set(this.type):
+            if self._value_type(this.type.element_type) != variable.type:
+                raise InterpreterError(message=f"Types of object and remove-element doesn't match")
+            if variable.value.value not in this.value.value:
+                raise InterpreterError(message=f"There is no element: {variable.value.value}")
+            self._make_writable(this.value)
+            this.value.value.remove(variable.value.value)
+            self._write_back(this.value)
+            return
         if not isinstance(this.type, KeyValueType):
             raise InterpreterError(message=f"Can't evaluate \"remove\" on non-key-value object")
         if variable.type.type != this.type.key_type:
             raise InterpreterError(message=f"Key type and object-key type doesn't match")
         if variable.value.value not in this.value.value.keys():
             raise InterpreterError(message=f"There is no object with key: {variable.value.value}")
+        self._make_writable(this.value)
+        this.value.forget(variable.value.value)
         del this.value.value[variable.value.value]
+        this.value.entry_changed(variable.value.value)
+        self._write_back(this.value)
 
     def visit_for_each_function(self, element: 'ForEachFunctionDefinition'):
         this = self._find_variable("_for_each_this")
-        this_values = None
-        this_type = None
-        if isinstance(this.type, ElementType):
-            this_values = this.value.value
-            this_type = this.type.element_type
-            if isinstance(this_type, Type):
-                this_type = BaseType(this_type)
-        elif isinstance(this.type, KeyValueType):
-            this_values = [{key: value} for key, value in this.value.value.items()]
-            this_type = KeyValueType(Type.PAIR, this.type.key_type, this.type.value_type)
-        else:
-            raise InterpreterError(message=f"For each function doesn't work with type: {this.type}")
-        callback_function = self._last_function_call
-
-        for value in this_values:
-            argument_expression = LiteralExpression(this_type, value)
-            callback_function.arguments = [argument_expression]
-            callback_function.accept(self)
-
-        self._last_function_call = None
+        argument_type = self._element_type(this.type, element)
+        callback = self._resolve_callback(element, argument_type)
+        self._add_query_stage(this.value, this.type, QueryStage(FOR_EACH, argument_type, [callback]))
+        self._materialize(self._last_result)
+        self._last_result = Value(BaseType(Type.VOID), None)
 
     def visit_where_function(self, element: 'WhereFunctionDefinition'):
-        this_values, this_type, callback_function = self._get_callback_data(element, "_where_this")
-
-        result_values = list()
-
-        for value in this_values:
-            if isinstance(this_type, ElementType):
-                argument_expression = LiteralExpression(this_type.element_type, value, Position(1, 1))
-            elif this_type.type == Type.DICT:
-                argument_expression = LiteralExpression(KeyValueType(Type.PAIR, this_type.key_type, this_type.value_type), value, Position(1, 1))
-            callback_function.arguments = [argument_expression]
-            callback_function.accept(self)
-            result = self._last_result
-            if result.type != BaseType(Type.BOOL):
-                raise InterpreterError(f"{element.__class__.__name__} callback function must return bool")
-            if result.value:
-                result_values.append(value)
-
-        if isinstance(this_type, KeyValueType):
-            result_values = dict(result_values)
-
-        self._last_result = Value(this_type, result_values)
-        self._last_function_call = None
+        this = self._find_variable("_where_this")
+        argument_type = self._element_type(this.type, element)
+        callback = self._resolve_callback(element, argument_type)
+        self._add_query_stage(this.value, this.type, QueryStage(WHERE, argument_type, [callback]))
 
     def visit_select_function(self, element: 'SelectFunctionDefinition'):
-        this_values, this_type, callback_function = self._get_callback_data(element, "_select_this")
+        this = self._find_variable("_select_this")
+        argument_type = self._element_type(this.type, element)
+        name, function = self._resolve_callback(element, argument_type)
 
-        result_values = list()
+        if not isinstance(function, FunctionDefinition):
+            raise InterpreterError(message=f"Can't execute function")
 
-        type = None
+        function_type = function.type
+        if isinstance(function_type, KeyValueType):
+            type = KeyValueType(Type.DICT, function_type.key_type, function_type.value_type)
+        else:
+            type = ElementType(Type.LIST, self._type_argument(function_type))
+        self._add_query_stage(this.value, type, QueryStage(SELECT, argument_type, [(name, function)]))
 
-        function = self.find_function_definition(callback_function.id)
+    def visit_orderby_function(self, element: 'OrderByFunctionDefinition'):
+        this = self._find_variable("_orderby_this")
+        argument_type = self._element_type(this.type, element)
+        callback = self._resolve_callback(element, argument_type)
+        type = this.type
+        if isinstance(type, KeyValueType) and type.type == Type.SORTED_DICT:
+            type = KeyValueType(Type.DICT, type.key_type, type.value_type)
+        self._add_query_stage(this.value, type, QueryStage(ORDER_BY, argument_type, [callback]))
+
+    def visit_take_function(self, element: 'TakeFunctionDefinition'):
+        this = self._find_variable("_take_this")
+        count = self._find_variable("_take").value.value
+        if count < 0:
+            raise InterpreterError(message=f"Can't take {count} elements")
+        argument_type = self._element_type(this.type, element)
+        self._add_query_stage(this.value, this.type, QueryStage(TAKE, argument_type, count=count))
+
+    def visit_group_by_function(self, element: 'GroupByFunctionDefinition'):
+        this = self._find_variable("_group_by_this")
+        argument_type = self._element_type(this.type, element)
+        name, function = self._resolve_key_callback(element, argument_type)
+        type = KeyValueType(Type.DICT, function.type.type, ElementType(Type.LIST, self._type_argument(argument_type)))
+        self._add_query_stage(this.value, type, QueryStage(GROUP_BY, argument_type, [(name, function)]))
+
+    def visit_join_function(self, element: 'JoinFunctionDefinition'):
+        this = self._find_variable("_join_this")
+        other = self._find_variable("_join")
+        argument_type = self._element_type(this.type, element)
+        other_type = self._element_type(other.type, element)
+        left_key = self._resolve_key_callback(element, argument_type)
+        right_key = self._resolve_key_callback(element, other_type)
+        if left_key[1].type != right_key[1].type:
+            raise ExpressionTypeError(message=f"Key functions {left_key[0]} and {right_key[0]} return different types")
+        name, function = self._resolve_callback(element, argument_type, other_type)
+
+        if not isinstance(function, FunctionDefinition):
+            raise InterpreterError(message=f"Can't execute function")
 
-        for value in this_values:
-            if isinstance(this_type, ElementType):
-                argument_expression = LiteralExpression(this_type.element_type, value, Position(1, 1))
-            elif this_type.type == Type.DICT:
-                argument_expression = LiteralExpression(
-                    KeyValueType(Type.PAIR, this_type.key_type, this_type.value_type), value, Position(1, 1))
-            callback_function.arguments = [argument_expression]
-            callback_function.accept(self)
-            result = self._last_result
-            result_values.append(result.value)
-
-        if isinstance(function, FunctionDefinition):
-            function_type = function.type
-            if isinstance(function_type, KeyValueType):
-                type = KeyValueType(Type.DICT, function_type.key_type, function_type.value_type)
-                temp_result = dict()
-                for pair in result_values:
-                    key, value = pair
-                    if key in temp_result:
-                        raise InterpreterError(message=f"Key {key} already exists")
-                    temp_result[key] = value
-                result_values = temp_result
-            else:
-                type = ElementType(Type.LIST, function_type.type)
+        function_type = function.type
+        if isinstance(function_type, KeyValueType):
+            type = KeyValueType(Type.DICT, function_type.key_type, function_type.value_type)
         else:
-            raise InterpreterError(message=f"Can't execute function")
+            type = ElementType(Type.LIST, self._type_argument(function_type))
+        stage = QueryStage(JOIN, argument_type, [left_key, right_key, (name, function)], other=other.value.copy())
+        self._add_query_stage(this.value, type, stage)
+
+    def visit_sum_function(self, element: 'SumFunctionDefinition'):
+        this = self._find_variable("_sum_this")
+        type, selector = self._aggregated(this, element)
+        if type not in (BaseType(Type.INT), BaseType(Type.FLOAT)):
+            raise InterpreterError(message=f"Can't evaluate \"sum\" on elements of type: {type}")
+        start = 0.0 if type.type == Type.FLOAT else 0
+        if (result := self._partitioned_aggregate(this.value, 'sum', start, selector)) is _NOT_PARTITIONED:
+            result = sum(self._selected(this.value, selector), start)
+        self._last_result = Value(type, result)
+
+    def visit_min_function(self, element: 'MinFunctionDefinition'):
+        self._last_result = self._extreme(min, self._find_variable("_min_this"), element)
+
+    def visit_max_function(self, element: 'MaxFunctionDefinition'):
+        self._last_result = self._extreme(max, self._find_variable("_max_this"), element)
+
+    def _extreme(self, function, this: Variable, element) -> Value:
+        type, selector = self._aggregated(this, element)
+        if selector is None and isinstance(this.type, KeyValueType) and this.type.type == Type.SORTED_DICT:
+            entries = self._materialize(this.value).value
+            if not entries:
+                raise InterpreterError(message=f"Can't evaluate \"{function.__name__}\" on empty collection")
+            return Value(BaseType(this.type.key_type), entries.min_key() if function is min else entries.max_key())
+        if type not in (BaseType(Type.INT), BaseType(Type.FLOAT), BaseType(Type.STRING)):
+            raise InterpreterError(message=f"Can't evaluate \"{function.__name__}\" on elements of type: {type}")
+        if (value := self._partitioned_aggregate(this.value, function.__name__, _EMPTY, selector)) is _NOT_PARTITIONED:
+            value = function(self._selected(this.value, selector), default=_EMPTY)
+        if value is _EMPTY:
+            raise InterpreterError(message=f"Can't evaluate \"{function.__name__}\" on empty collection")
+        return Value(type, value)
 
-        self._last_result = Value(type, result_values)
-        self._last_function_call = None
+    def visit_count_function(self, element: 'CountFunctionDefinition'):
+        this = self._find_variable("_count_this")
+        stage = self._predicate_stage(this, element)
+        if (count := self._partitioned_aggregate(this.value, 'count', 0, stage)) is _NOT_PARTITIONED:
+            predicate = self._stage_function(stage)
+            count = sum(1 for value in self._stream(this.value) if predicate(value))
+        self._last_result = Value(BaseType(Type.INT), count)
+
+    def visit_any_function(self, element: 'AnyFunctionDefinition'):
+        this = self._find_variable("_any_this")
+        predicate = self._predicate(this, element)
+        with contextlib.closing(self._stream(this.value)) as values:
+            self._last_result = Value(BaseType(Type.BOOL), any(predicate(value) for value in values))
+
+    def visit_all_function(self, element: 'AllFunctionDefinition'):
+        this = self._find_variable("_all_this")
+        predicate = self._predicate(this, element)
+        with contextlib.closing(self._stream(this.value)) as values:
+            self._last_result = Value(BaseType(Type.BOOL), all(predicate(value) for value in values))
+
+    def visit_first_function(self, element: 'FirstFunctionDefinition'):
+        this = self._find_variable("_first_this")
+        predicate = self._predicate(this, element)
+        with contextlib.closing(self._stream(this.value)) as values:
+            value = next((value for value in values if predicate(value)), _EMPTY)
+        if value is _EMPTY:
+            raise InterpreterError(message=f"No element matches the \"first\" condition")
+        this.value.share_elements()
+        self._last_result = Value(self._element_type(this.type, element), value).contained()
+
+    def visit_range_function(self, element: 'RangeFunctionDefinition'):
+        this = self._find_variable("_range_this")
+        low, high = self._find_variable("_range_low"), self._find_variable("_range_high")
+        if not (isinstance(this.type, KeyValueType) and this.type.type == Type.SORTED_DICT):
+            raise InterpreterError(message=f"Can't evaluate \"range\" on {this.type} object")
+        if low.type != BaseType(this.type.key_type) or high.type != BaseType(this.type.key_type):
+            raise InterpreterError(message=f"Range bounds should be type {this.type.key_type}, not {low.type} and {high.type}")
+        this.value.share_elements()
+        entries = self._materialize(this.value).value
+        self._last_result = Value(this.type, entries.range(low.value.value, high.value.value))
+
+    def visit_contains_function(self, element: 'ContainsFunctionDefinition'):
+        variable = self._find_variable("_contains")
+        this = self._find_variable("_contains_this")
+        if not self._is_set(this.type):
+            raise InterpreterError(message=f"Can't evaluate \"contains\" on non-set object")
+        if self._value_type(this.type.element_type) != variable.type:
+            raise InterpreterError(message=f"Given element type is different from set element type")
+        self._last_result = Value(BaseType(Type.BOOL), variable.value.value in this.value.value)
+
+    def visit_union_function(self, element: 'UnionFunctionDefinition'):
+        self._last_result = self._set_operation(HashSet.union, "_union")
+
+    def visit_intersect_function(self, element: 'IntersectFunctionDefinition'):
+        self._last_result = self._set_operation(HashSet.intersection, "_intersect")
+
+    def visit_except_function(self, element: 'ExceptFunctionDefinition'):
+        self._last_result = self._set_operation(HashSet.difference, "_except")
+
+    def _set_operation(self, operation: Callable[[HashSet, HashSet], HashSet], name: str) -> Value:
+        other = self._find_variable(name)
+        this = self._find_variable(f"{name}_this")
+        if not self._is_set(this.type):
+            raise InterpreterError(message=f"Can't evaluate \"{name[1:]}\" on non-set object")
+        if this.type != other.type:
+            raise InterpreterError(message=f"Can't evaluate \"{name[1:]}\" on sets of types {this.type} and {other.type}")
+        return Value(this.type, operation(this.value.value, other.value.value))
+
+    def visit_distinct_function(self, element: 'DistinctFunctionDefinition'):
+        this = self._find_variable("_distinct_this")
+        if not isinstance(this.type, ElementType):
+            raise InterpreterError(message=f"Can't evaluate \"distinct\" on non-element object")
+        if not self._hashable(this.type.element_type):
+            raise InterpreterError(message=f"Can't evaluate \"distinct\" on elements of type: {this.type.element_type}")
+        argument_type = self._element_type(this.type, element)
+        self._add_query_stage(this.value, this.type, QueryStage(DISTINCT, argument_type))
+
+    def _predicate(self, this: Variable, element) -> Callable[[object], bool]:
+        return self._stage_function(self._predicate_stage(this, element))
+
+    def _predicate_stage(self, this: Variable, element) -> QueryStage:
+        argument_type = self._element_type(this.type, element)
+        name, function = self._resolve_callback(element, argument_type)
+        if not isinstance(function, FunctionDefinition) or function.type != BaseType(Type.BOOL):
+            raise InterpreterError(message=f"Callback function {name} of {element.__class__.__name__} must return bool")
+        return QueryStage(WHERE, argument_type, [(name, function)])
+
+    def _stage_function(self, stage: QueryStage) -> Callable[[object], object]:
+        callback, = stage.callbacks
+        return lambda value: self._call_callback(callback, [Value(stage.argument_type, value)])
+
+    # type of the aggregated values and the select stage of an optional selector callback (sum, min and max)
+    def _aggregated(self, this: Variable, element) -> tuple['BaseType', Optional[QueryStage]]:
+        argument_type = self._element_type(this.type, element)
+        if not self._function_calls:
+            return argument_type, None
+        name, function = self._resolve_callback(element, argument_type)
+        if not isinstance(function, FunctionDefinition):
+            raise InterpreterError(message=f"Can't execute function")
+        return function.type, QueryStage(SELECT, argument_type, [(name, function)])
+
+    # values of a collection mapped by the selector in the same pass, or the elements as they are
+    def _selected(self, value: Value, selector: Optional[QueryStage]) -> Iterator:
+        if selector is None:
+            return self._stream(value)
+        return map(self._stage_function(selector), self._stream(value))
+
+    # aggregate of a partitioned Dict or of a query over one, computed by the shards when every stage can run there
+    def _partitioned_aggregate(self, value: Value, kind: str, default, stage: Optional[QueryStage] = None):
+        query = isinstance(value, QueryValue) and not value.materialized
+        source, stages = (value.source.value, value.stages) if query else (value.value, [])
+        stages = stages + ([stage] if stage is not None else [])
+        if not isinstance(source, PartitionedMap) or self._explain_queries or self._map_stages(stages) < len(stages):
+            return _NOT_PARTITIONED
+        if not query:
+            return source.aggregate(stages, kind, default)
+        with contextlib.closing(value.stream(lambda _: iter([source.aggregate(stages, kind, default)]))) as results:
+            return next(results)
+
+    # number of leading stages that can run as map tasks on the shards of a partitioned Dict
+    def _map_stages(self, stages: list[QueryStage]) -> int:
+        if self._pure_functions is None:
+            return 0
+        count = 0
+        for stage in stages:
+            if stage.kind not in ELEMENT_STAGES or not all(name in self._pure_functions for name in stage.function_names):
+                break
+            count += 1
+        return count
+
+    def _stream(self, value: Value) -> Iterator:
+        if isinstance(value, QueryValue) and not value.materialized:
+            yield from value.stream(self._stream_query)
+        else:
+            yield from self._elements(value)
 
-    def visit_orderby_function(self, element: 'OrderByFunctionDefinition'):
-        this_values, this_type, callback_function = self._get_callback_data(element, "_orderby_this")
+    def _add_query_stage(self, this: Value, type: Union[ElementType, KeyValueType], stage: QueryStage) -> None:
+        if isinstance(this, QueryValue):
+            query = this.extend(type, stage)
+        else:
+            if self._index_dict_values and self._is_dict(this):
+                this.value_index()
+            query = QueryValue(type, this.copy(), [stage], self._run_query, self._query_location)
+        self._last_result = query if self._lazy_linq else query.materialize()
+
+    def _run_query(self, query: QueryValue) -> Union[list, dict]:
+        values = self._stream_query(query)
+        if query.stages and query.stages[-1].kind == FOR_EACH:
+            collections.deque(values, maxlen=0)
+            return list()
+        if self._is_set(query.type):
+            return HashSet(values)
+        if not isinstance(query.type, KeyValueType):
+            return typed_list(query.type.element_type, values)
+        result_values = self._new_entries(query.type)
+        for key, value in values:
+            if key in result_values:
+                raise InterpreterError(message=f"Key {key} already exists")
+            result_values[key] = value
+        return result_values
+
+    def _stream_query(self, query: QueryValue) -> Iterator:
+        values = self._elements(query.source)
+        key_ordered = isinstance(query.source.type, KeyValueType) and query.source.type.type == Type.SORTED_DICT
+        stages = self._query_planner.optimize(query.stages, key_ordered) if self._query_planner else query.stages
+
+        profile = self._query_profile(query, stages) if self._explain_queries else None
+        if profile is not None and self._analyze_queries:
+            execution = profile.start()
+            values = profile.read_source(execution, values)
+            for index, stage in enumerate(stages):
+                values = profile.measure(execution, index, self._run_stages(values, [stage]),
+                                         lambda: self._callback_calls)
+        else:
+            execution = None
+            if isinstance(query.source.value, PartitionedMap) and (count := self._map_stages(stages)):
+                values, stages = query.source.value.run(stages[:count]), stages[count:]
+            elif self._index_dict_values and stages and stages[0].kind == WHERE and self._is_dict(query.source):
+                values, stages = self._indexed_where(query.source, stages)
+            if self._vectorizer is not None:
+                values, stages = self._vectorizer.run(values, stages)
+            for group in self._fuse_stages(stages):
+                # sources that know their size are copied to a list only when the group really runs in parallel
+                if self._parallel is not None and isinstance(values, Sized) and self._parallel.can_run(group, len(values)):
+                    if not isinstance(values, (list, TypedList, SharedList)):
+                        values = list(values)
+                    values = self._run_parallel_stages(values, group)
+                else:
+                    values = self._run_stages(values, group)
+
+        try:
+            yield from values
+        finally:
+            if execution is not None:
+                profile.finish(execution)
+
+    def _indexed_where(self, source: Value, stages: list[QueryStage]) -> tuple[Iterable, list[QueryStage]]:
+        stage = stages[0]
+        (_, function), *callbacks = stage.callbacks
+        predicate = value_predicate(function, stage.argument_type)
+        keys = source.value_index().lookup(source.value, predicate) if predicate is not None else None
+        if keys is None:
+            self._index_misses += 1
+            return self._elements(source), stages
+        self._index_hits += 1
+        entries = source.value
+        rest = [QueryStage(WHERE, stage.argument_type, callbacks)] if callbacks else []
+        return [(key, entries[key]) for key in keys], rest + stages[1:]
+
+    def _is_dict(self, value: Value) -> bool:
+        return isinstance(value.type, KeyValueType) and value.type.type == Type.DICT
+
+    def _new_entries(self, type: 'KeyValueType') -> MutableMapping:
+        if type.type == Type.SORTED_DICT:
+            return SortedMap()
+        if self._partitions is not None:
+            return self._partitions.create()
+        return self._dict_storage.create() if self._dict_storage is not None else dict()
+
+    def _is_set(self, type: 'BaseType') -> bool:
+        return isinstance(type, ElementType) and type.type == Type.SET
+
+    # Set elements are hashed, so they can be simple values or pairs of simple values
+    def _hashable(self, type: Union[Type, 'BaseType']) -> bool:
+        if isinstance(type, KeyValueType):
+            return type.type == Type.PAIR and isinstance(type.key_type, Type) and isinstance(type.value_type, Type)
+        return isinstance(type, Type)
+
+    def _fuse_stages(self, stages: list[QueryStage]) -> list[list[QueryStage]]:
+        groups = []
+        for stage in stages:
+            if stage.kind in ELEMENT_STAGES and groups and groups[-1][-1].kind in ELEMENT_STAGES:
+                groups[-1].append(stage)
+            else:
+                groups.append([stage])
+        return groups
+
+    def _run_stages(self, values: Iterable, stages: list[QueryStage]) -> Iterable:
+        stage = stages[0]
+        if stage.kind in (ORDER_BY, TOP_K):
+            return self._sort_values(values, stage)
+        if stage.kind == TAKE:
+            return itertools.islice(values, stage.count)
+        if stage.kind == GROUP_BY:
+            return self._group_values(values, stage)
+        if stage.kind == JOIN:
+            return self._join_values(values, stage)
+        if stage.kind == DISTINCT:
+            return self._distinct_values(values)
+        return (result for value in values if (result := self._apply_stages(value, stages)) is not _FILTERED)
+
+    def _apply_stages(self, value, stages: list[QueryStage]):
+        for stage in stages:
+            for name, function in stage.callbacks:
+                self._callback_calls += 1
+                result = self._invoke_function(name, function, [Value(stage.argument_type, value).contained()])
+                if stage.kind == WHERE:
+                    if result.type != BaseType(Type.BOOL):
+                        raise InterpreterError(message=f"WhereFunctionDefinition callback function must return bool")
+                    if not result.value:
+                        return _FILTERED
+                elif stage.kind == SELECT:
+                    value = result.value
+        return value
+
+    def _run_parallel_stages(self, values: list, stages: list[QueryStage]) -> list:
+        stage = stages[0]
+        if stage.kind in (ORDER_BY, TOP_K):
+            keys = self._parallel.sort_keys(stage, values)
+            return list(self._sort_decorated(zip(keys, itertools.count(), values), stage))
+        return self._parallel.run_stages(stages, values)
+
+    def _sort_values(self, values: Iterable, stage: QueryStage) -> Iterator:
+        decorated = ((self._sort_key(stage, value), index, value) for index, value in enumerate(values))
+        yield from self._sort_decorated(decorated, stage)
+
+    def _sort_decorated(self, decorated: Iterable[tuple], stage: QueryStage) -> Iterator:
+        if stage.kind == TOP_K:
+            return (value for _, _, value in heapq.nsmallest(stage.count, decorated))
+        return (value for _, _, value in sorted(decorated))
+
+    def _sort_key(self, stage: QueryStage, value):
+        callback, = stage.callbacks
+        return self._call_callback(callback, [Value(stage.argument_type, value)])
+
+    def _group_values(self, values: Iterable, stage: QueryStage) -> Iterator:
+        callback, = stage.callbacks
+        groups = {}
+        for value in values:
+            element = Value(stage.argument_type, value)
+            groups.setdefault(self._call_callback(callback, [element]), []).append(element.value)
+        for key, group in groups.items():
+            yield key, typed_list(stage.argument_type, group)
+
+    def _distinct_values(self, values: Iterable) -> Iterator:
+        seen = set()
+        for value in values:
+            if value not in seen:
+                seen.add(value)
+                yield value
+
+    def _join_values(self, values: Iterable, stage: QueryStage) -> Iterator:
+        left_key, right_key, result = stage.callbacks
+        other_type = self._element_type(stage.other.type, stage)
+        table = {}
+        for other in self._elements(stage.other):
+            table.setdefault(self._call_callback(right_key, [Value(other_type, other)]), []).append(other)
+        for value in values:
+            element = Value(stage.argument_type, value)
+            for other in table.get(self._call_callback(left_key, [element]), ()):
+                yield self._call_callback(result, [element, Value(other_type, other)])
+
+    def _call_callback(self, callback: tuple[str, 'BaseFunctonDefinition'], arguments: list[Value]):
+        name, function = callback
+        self._callback_calls += 1
+        arguments = [argument.contained() for argument in arguments]
+        return self._invoke_function(name, function, arguments).value
+
+    def _query_profile(self, query: QueryValue, stages: list[QueryStage]) -> QueryProfile:
+        key = (query.location, tuple(str(stage) for stage in query.stages))
+        if (profile := self._query_profiles.get(key)) is None:
+            profile = QueryProfile(query.location, query.stages, stages)
+            self._query_profiles[key] = profile
+        return profile
+
+    def _materialize(self, value: Value) -> Value:
+        return value.materialize() if isinstance(value, QueryValue) else value
+
+    def _element_type(self, type: 'BaseType', element) -> Union[BaseType, KeyValueType]:
+        if isinstance(type, ElementType):
+            return self._value_type(type.element_type)
+        if isinstance(type, KeyValueType) and type.type in DICT_TYPES:
+            return KeyValueType(Type.PAIR, type.key_type, type.value_type)
+        raise InterpreterError(message=f"{element.__class__.__name__} doesn't work with type: {type}")
 
-        result_values = list()
+    # Pairs are (key, value) tuples, so Dict entries go through queries as the items of the dict itself.
+    def _elements(self, value: Value) -> Iterable:
+        if isinstance(value.type, KeyValueType):
+            return value.value.items()
+        return value.value
 
-        type = None
+    def _value_type(self, type: Union[Type, 'BaseType']) -> 'BaseType':
+        return BaseType(type) if isinstance(type, Type) else type
 
-        for value in this_values:
-            if isinstance(this_type, ElementType):
-                argument_expression = LiteralExpression(this_type.element_type, value, Position(1, 1))
-            elif this_type.type == Type.DICT:
-                argument_expression = LiteralExpression(
-                    KeyValueType(Type.PAIR, this_type.key_type, this_type.value_type), value, Position(1, 1))
-            callback_function.arguments = [argument_expression]
-            callback_function.accept(self)
-            result = self._last_result
-            result_values.append({result.value: value})
-
-        sorted_values = self._sort_dicts_by_key(result_values)
-
-        def get_values_from_sorted_dicts(sorted_dicts):
-            return [list(d.values())[0] for d in sorted_dicts]
-
-        sorted_values = get_values_from_sorted_dicts(sorted_values)
-
-        self._last_result = Value(this_type, sorted_values)
-        self._last_function_call = None
-
-    def _sort_dicts_by_key(self, dicts_list):
-        def get_key(d):
-            return next(iter(d.keys()))
-        sorted_list = sorted(dicts_list, key=lambda d: (str(type(get_key(d))), get_key(d)))
-        return sorted_list
-
-    def _get_callback_data(self, element, variable_name: str):
-        this = self._find_variable(variable_name)
-        this_values = None
-        this_type = None
-        if isinstance(this.type, ElementType):
-            this_values = this.value.value
-            this_type = this.type
-            if isinstance(this_type, Type):
-                this_type = BaseType(this_type)
-        elif isinstance(this.type, KeyValueType):
-            this_values = [{key: value} for key, value in this.value.value.items()]
-            this_type = this.type
-        else:
-            raise InterpreterError(message=f"For each function doesn't work with type: {this.type}")
+    def _type_argument(self, type: 'BaseType') -> Union[Type, 'BaseType']:
+        return type if isinstance(type, (ElementType, KeyValueType)) else type.type
 
-        if self._last_function_call is not None:
-            callback_function = self._last_function_call
-        else:
+    def _resolve_callback(self, element, *argument_types: 'BaseType') -> tuple[str, 'BaseFunctonDefinition']:
+        if not self._function_calls:
             raise InterpreterError(message=f"{element.__class__.__name__} needs callback function")
-
-        return this_values, this_type, callback_function
+        callback_function = self._function_calls.pop(0)
+        if not (function := self.find_function_definition(callback_function.id)):
+            raise InterpreterError(message=f"There is no function with id: {callback_function.id}")
+        params = function.parameters
+        if (len(params) != len(argument_types)
+                or any(isinstance(param, (ThisParameter, FunctionParameter)) for param in params)):
+            count = "one parameter" if len(argument_types) == 1 else f"{len(argument_types)} parameters"
+            raise InterpreterError(message=f"Callback function {callback_function.id} must take exactly {count}")
+        for param, argument_type in zip(params, argument_types):
+            param_type = self._define_types(param.type, argument_type)
+            if argument_type != param_type:
+                raise ExpressionTypeError(message=f"Param: {param.id} takes value type {param_type}, not {argument_type}")
+        return callback_function.id, function
+
+    def _resolve_key_callback(self, element, argument_type: 'BaseType') -> tuple[str, 'BaseFunctonDefinition']:
+        name, function = self._resolve_callback(element, argument_type)
+        if not isinstance(function, FunctionDefinition) or isinstance(function.type, (ElementType, KeyValueType)):
+            raise InterpreterError(message=f"Key function {name} of {element.__class__.__name__} must return a simple type")
+        return name, function
 
     def visit_expression_statement(self, element: 'ExpressionStatement'):
         element.expression.accept(self)
+        self._last_result = self._materialize(self._last_result)
 
     def visit_assignment_statement(self, element: 'AssignmentStatement'):
+        if isinstance(element.expression, IndexAccessExpression):
+            self._assign_index(element)
+            return
         element.expression.accept(self)
         current_value = self._last_result
         element.assign_expression.accept(self)
-        assign_value = self._last_result
+        assign_value = self._materialize(self._last_result)
         if isinstance(assign_value, Value) and assign_value.value is not None:
             current_value.change_value(assign_value)
         else:
             raise AssignmentError(message=f"Can't assign value to variable - it has null value")
 
+    def _assign_index(self, element: 'AssignmentStatement'):
+        target = element.expression
+        if not (variable := self._find_variable(target.id)):
+            raise InterpreterError(message=f"Can't find variable with id: {target.id}", position=element.position)
+        target.index.accept(self)
+        index = self._last_result
+        element.assign_expression.accept(self)
+        assign_value = self._materialize(self._last_result)
+        if not isinstance(assign_value, Value) or assign_value.value is None:
+            raise AssignmentError(message=f"Can't assign value to variable - it has null value", position=element.position)
+        container, type = variable.value, variable.type
+        if isinstance(type, ElementType) and type.type == Type.LIST:
+            if index.type != BaseType(Type.INT):
+                raise AssignmentError(message=f"Index for element-type object must be int type", position=element.position)
+            if assign_value.type != self._value_type(type.element_type):
+                raise AssignmentError(message=f"Can't assign value type: {assign_value.type} to element type: "
+                                              f"{type.element_type}", position=element.position)
+            if not 0 <= index.value < len(container.value):
+                raise AssignmentError(message=f"Index out of range", position=element.position)
+            self._make_writable(container)
+            container.forget(index.value)
+            try:
+                container.value[index.value] = assign_value.stored()
+            except OverflowError:
+                values = list(container.value)
+                values[index.value] = assign_value.value
+                container.change_value(Value(type, values))
+        elif isinstance(type, KeyValueType) and type.type in DICT_TYPES:
+            if index.type.type != type.key_type:
+                raise AssignmentError(message=f"Key should be type {type.key_type}, not {index.type}", position=element.position)
+            if assign_value.type != self._value_type(type.value_type):
+                raise AssignmentError(message=f"Can't assign value type: {assign_value.type} to value type: "
+                                              f"{type.value_type}", position=element.position)
+            self._make_writable(container)
+            container.forget(index.value)
+            container.value[index.value] = assign_value.stored()
+            container.entry_changed(index.value)
+        else:
+            raise AssignmentError(message=f"Can't assign by index to object type: {type}", position=element.position)
+
+    # an element of a List or Dict changes through its path: every container from the variable down is made
+    # writable first, then the element is copied unless its container already holds its own copy of it
+    def _make_writable(self, value: Value) -> None:
+        if value.source is None:
+            if value.detach():
+                self._copy_count += 1
+            return
+        container, key = value.source
+        self._make_writable(container)
+        if value.detach(force=not container.holds(key, value)):
+            self._copy_count += 1
+        container.keep(key, value)
+
+    # stores an element changed in place under its key again, for Dicts on disk or in shard processes
+    def _write_back(self, value: Value) -> None:
+        if value.source is not None:
+            container, key = value.source
+            container.value[key] = value.value
+            container.entry_changed(key)
+
     def visit_if_statement(self, element: 'IfStatement') -> None:
         if self._execute_condition_expression_and_block(element.if_part):
             return
@@ -390,24 +1040,35 @@ class Interpreter(Visitor):
         if result.type != BaseType(Type.BOOL):
             raise InterpreterError(message=f"Expression placed as condition must evaluate to bool")
         if result.value:
-            block_variables = BlockVariables()
-            self._execution_stack.push_block_variables(block_variables)
-            element.block.accept(self)
-            self._execution_stack.pop_block_variables()
+            if self._needs_scope(element.block):
+                self._execution_stack.enter_block()
+                element.block.accept(self)
+                self._execution_stack.leave_block()
+            else:
+                element.block.accept(self)
             return True
         return False
 
+    def _needs_scope(self, block: 'Block') -> bool:
+        key = id(block)
+        if (needs_scope := self._scoped_blocks.get(key)) is None:
+            needs_scope = any(isinstance(statement, (DeclarationStatement, InitializationStatement))
+                              for statement in block.statements)
+            self._scoped_blocks[key] = needs_scope
+        return needs_scope
+
     def _execute_else(self, element: 'Part'):
         element.block.accept(self)
 
     def visit_while_statement(self, element: 'WhileStatement'):
-        self._current_recursion += 1
-        self._stop_program_execution()
-        if self._execute_condition_expression_and_block(element):
+        iterations = 0
+        while self._execute_condition_expression_and_block(element):
             if self._was_return:
                 return
-            self.visit_while_statement(element)
-        self._current_recursion = 1
+            iterations += 1
+            self._loop_iterations += 1
+            if iterations > self._max_loop_iterations:
+                raise InterpreterError(message=f"Maximum number of loop iterations. Program stopped")
 
     def visit_casting_expression(self, element: 'CastingExpression') -> None:
         casting_type = element.type
@@ -460,49 +1121,90 @@ class Interpreter(Visitor):
             raise InterpreterError(message=f"Can't find variable with id: {element.id}")
         self._last_result = variable.value
 
-    def visit_function_call_expression(self, element: 'FunctionCallExpression'):
+    def visit_function_call_expression(self, element: 'FunctionCallExpression',
+                                       function_definition: Optional['BaseFunctonDefinition'] = None):
         function_name = element.id
         function_arguments = element.arguments
-        if function_definition := self.find_function_definition(function_name):
+        if function_definition := function_definition or self.find_function_definition(function_name):
             params = function_definition.parameters
 
-            function_context, block_variables = FunctionContext(), BlockVariables()
+            block_variables = self._execution_stack.acquire_block()
+            read_only = self._read_only_parameters.get(function_name, ())
 
             number_params = len(params)
 
             if number_params > 0 and isinstance(params[-1], ThisParameter):
                 number_params -= 1
                 this = self._last_result
-                block_variables.add_variable(Variable(this.type, params[-1].id, this))
-
-            if len(function_arguments) != number_params:
-                raise InterpreterError(f"Number of arguments and parameters doesn't match")
-
+                if function_name not in self.lazy_methods:
+                    this = self._materialize(this)
+                elif not isinstance(this, QueryValue) or this.materialized:
+                    self._query_location = (element.position.line, element.position.column)
+                block_variables.add_variable(Variable(this.type, params[-1].id, this, borrowed=True))
+
+            optional = number_params > 0 and isinstance(params[number_params - 1], OptionalFunctionParameter)
+            if not number_params - optional <= len(function_arguments) <= number_params:
+                raise InterpreterError(message=f"Number of arguments and parameters doesn't match")
+
+            arguments = []
+            function_calls = []
             for i in range(0, len(function_arguments)):
                 param_type, param_id = params[i].type, params[i].id
                 if isinstance(params[i], FunctionParameter):
                     if isinstance(function_arguments[i], FunctionCallExpression):
-                        self._last_function_call = function_arguments[i]
+                        function_calls.append(function_arguments[i])
                     else:
                         raise InterpreterError(message=f"Function {function_name} requires function call as its parameter")
                 else:
-                    function_arguments[i].accept(self)
-                    argument = self._last_result
-                    param_type = self._define_types(param_type, argument.type)
-                    if argument.type == param_type:
-                        block_variables.add_variable(Variable(argument.type, param_id, argument))
-                    else:
-                        raise ExpressionTypeError(message=f"Param: {param_id} takes value type {param_type}, not {argument.type}")
-
-            self._push_function_context(function_context)
-            self._push_block_variables(block_variables)
+                    argument = self._evaluate_argument(params[i], function_arguments[i])
+                    block_variables.add_variable(Variable(argument.type, param_id, argument,
+                                                          borrowed=param_id in read_only))
+                    arguments.append(argument)
 
-            function_definition.accept(self)
-
-            self._pop_block_variables()
-            self._pop_function_context()
+            self._function_calls = function_calls
+            self._execute_function(function_name, function_definition, block_variables, arguments)
         else:
-            raise InterpreterError(f"There is no function with id: {function_name}")
+            raise InterpreterError(message=f"There is no function with id: {function_name}")
+
+    def _invoke_function(self, function_name: str, function_definition: 'BaseFunctonDefinition',
+                         arguments: list[Value]) -> Value:
+        block_variables = self._execution_stack.acquire_block()
+        read_only = self._read_only_parameters.get(function_name, ())
+        for param, argument in zip(function_definition.parameters, arguments):
+            block_variables.add_variable(Variable(argument.type, param.id, argument, borrowed=param.id in read_only))
+        return self._execute_function(function_name, function_definition, block_variables, arguments)
+
+    def _execute_function(self, function_name: str, function_definition: 'BaseFunctonDefinition',
+                          block_variables: BlockVariables, arguments: list[Value]) -> Value:
+        memo_cache = self._memo_caches.get(function_name) if isinstance(function_definition, FunctionDefinition) else None
+        memo_key = memo_cache.make_key(arguments) if memo_cache is not None else None
+        if memo_key is not None and (result := memo_cache.get(memo_key)) is not None:
+            self._execution_stack.release_block(block_variables)
+            self._last_result = result
+            return result
+
+        self._execution_stack.enter_function(block_variables)
+        function_definition.accept(self)
+        self._execution_stack.leave_function()
+
+        if memo_key is not None:
+            memo_cache.put(memo_key, self._last_result)
+        return self._last_result
+
+    def _evaluate_argument(self, parameter: 'Parameter', expression: 'Expression') -> Value:
+        expression.accept(self)
+        argument = self._materialize(self._last_result)
+        param_type = self._define_types(parameter.type, argument.type)
+        if argument.type != param_type:
+            raise ExpressionTypeError(message=f"Param: {parameter.id} takes value type {param_type}, not {argument.type}")
+        return argument
+
+    def _prepare_tail_call(self, function_definition: 'FunctionDefinition', element: 'FunctionCallExpression') -> None:
+        params = function_definition.parameters
+        if len(element.arguments) != len(params):
+            raise InterpreterError(message=f"Number of arguments and parameters doesn't match")
+        arguments = [self._evaluate_argument(param, argument) for param, argument in zip(params, element.arguments)]
+        self._pending_tail_call = [Variable(argument.type, param.id, argument) for param, argument in zip(params, arguments)]
 
     def _define_types(self, param_type: 'BaseType', argument_type: 'BaseType') -> 'BaseType':
         if (isinstance(param_type, KeyValueType) and isinstance(argument_type, KeyValueType)
@@ -526,14 +1228,14 @@ class Interpreter(Visitor):
     def visit_method_call_expression(self, element: 'MethodCallExpression'):
         id = element.id
         arguments = element.arguments
-        function_call_expression = FunctionCallExpression(id, arguments)
-        function_call_expression.accept(self)
+        function_call_expression = FunctionCallExpression(id, arguments, element.position)
+        self.visit_function_call_expression(function_call_expression, self._find_method_definition(id))
 
     def visit_method_call_and_field_access_expression(self, element: 'MethodCallAndFieldAccessExpression'):
         id = element.id
         arguments = element.arguments
-        function_call_expression = FunctionCallExpression(id, arguments)
-        function_call_expression.accept(self)
+        function_call_expression = FunctionCallExpression(id, arguments, element.position)
+        self.visit_function_call_expression(function_call_expression, self._find_method_definition(id))
         result = self._last_result
         element.index.accept(self)
         index = self._last_result
@@ -557,18 +1259,20 @@ class Interpreter(Visitor):
         self._evaluate_index(function_result.type, function_result, index_result)
 
     def _evaluate_index(self, type: 'BaseType', value: 'Value', index: 'Value'):
+        if self._is_set(type):
+            raise InterpreterError(message=f"Can't index a set")
         if isinstance(type, ElementType):
             if index.type != BaseType(Type.INT):
                 raise InterpreterError(message=f"Index for element-type object must be int type")
             if len(value.value) < index.value:
                 raise InterpreterError(message=f"Index out of range")
-            self._last_result = Value(BaseType(type.element_type), value.value[index.value])
+            self._last_result = value.element(self._value_type(type.element_type), index.value)
         elif isinstance(type, KeyValueType):
             if index.type.type != type.key_type:
                 raise InterpreterError(message=f"Index for key-value-type object must be string type")
             if index.value not in value.value.keys():
                 raise InterpreterError(message=f"No object with key: {index.value}")
-            self._last_result = Value(BaseType(type.value_type), value.value[index.value])
+            self._last_result = value.element(self._value_type(type.value_type), index.value)
 
     def visit_class_initialization_expression(self, element: 'ClassInitializationExpression'):
         type = element.type
@@ -579,8 +1283,10 @@ class Interpreter(Visitor):
         elif isinstance(type, KeyValueType):
             if type.type == Type.PAIR:
                 result = self._handle_pair_type_arguments(type, arguments)
-            elif type.type == Type.DICT:
+            elif type.type in DICT_TYPES:
                 result = self._handle_dict_type_arguments(type, arguments)
+        elif type == BaseType(Type.STRING_BUILDER):
+            result = self._handle_string_builder_arguments(arguments)
         else:
             raise InterpreterError(message=f"Can't initialize class with type: {type.type}")
         self._last_result = result
@@ -591,11 +1297,25 @@ class Interpreter(Visitor):
         for argument in arguments:
             argument.accept(self)
             result = self._last_result
-            if result.type.type == element_type:
-                results.append(result.value)
+            if result.type == self._value_type(element_type):
+                results.append(result.stored())
             else:
                 raise InterpreterError(message=f"Element type takes values type: {type.element_type}, not: {result.type}")
-        return Value(type, results)
+        if type.type == Type.SET:
+            if not self._hashable(element_type):
+                raise InterpreterError(message=f"Set can't hold elements of type: {element_type}")
+            return Value(type, HashSet(results))
+        return Value(type, typed_list(element_type, results))
+
+    def _handle_string_builder_arguments(self, arguments: ['Expression']) -> Value:
+        fragments = list()
+        for argument in arguments:
+            argument.accept(self)
+            result = self._last_result
+            if result.type != BaseType(Type.STRING):
+                raise InterpreterError(message=f"StringBuilder takes values type: {Type.STRING}, not: {result.type}")
+            fragments.append(result.value)
+        return Value(BaseType(Type.STRING_BUILDER), StringBuilder(fragments))
 
     def _handle_pair_type_arguments(self, type: 'KeyValueType', arguments: ['Expression']) -> Value:
         key_type = type.key_type
@@ -608,23 +1328,20 @@ class Interpreter(Visitor):
             raise InterpreterError(message=f"Key should be type {key_type}, not {key_value.type}")
         arguments[1].accept(self)
         element_value = self._last_result
-        if element_value.type.type != value_type:
+        if element_value.type != self._value_type(value_type):
             raise InterpreterError(message=f"Key should be type {key_type}, not {key_value.type}")
-        value = dict()
-        value[key_value.value] = element_value.value
-        return Value(type, value)
+        return Value(type, (key_value.value, element_value.stored()))
 
     def _handle_dict_type_arguments(self, type: 'KeyValueType', arguments: ['Expression']) -> Value:
-        dictionary = dict()
+        dictionary = self._new_entries(type)
         for argument in arguments:
             argument.accept(self)
             result = self._last_result
             if result.type != KeyValueType(Type.PAIR, type.key_type, type.value_type):
                 raise InterpreterError(message=f"Element should be type: {type.type} [ {type.key_type} : {type.value_type} ]")
-            if not isinstance(result.value, dict):
+            if not isinstance(result.value, tuple):
                 raise InterpreterError(message=f"Element given as Dict Initialization argument should be pair value")
-            key = next(iter(result.value.keys()))
-            value = result.value[key]
+            key, value = result.value
             if key in dictionary.keys():
                 raise InterpreterError(message=f"Can't add {key} to Dict - already has this key")
             dictionary[key] = value
@@ -714,13 +1431,32 @@ class Interpreter(Visitor):
         else:
             raise ExpressionTypeError(message=f"Cannot evaluate division expression between objects type: {left.type} and {right.type}", position=element.position)
 
+    # a + b + c is parsed as a + (b + c); the operands of the whole chain are evaluated in the same order as before,
+    # and if they are all strings they are joined at once instead of building every intermediate string
     def visit_addition_expression(self, element: 'AdditionExpression') -> None:
-        left, right = self._get_left_and_right_element(element)
+        chain = [element]
+        while isinstance(chain[-1].right, AdditionExpression):
+            chain.append(chain[-1].right)
+        operands = []
+        for addition in chain:
+            addition.left.accept(self)
+            operands.append(self._last_result)
+        chain[-1].right.accept(self)
+        operands.append(self._last_result)
+        if all(operand.type == BaseType(Type.STRING) for operand in operands):
+            self._last_result = Value(BaseType(Type.STRING), "".join(operand.value for operand in operands))
+            return
+        result = operands.pop()
+        for addition, left in zip(reversed(chain), reversed(operands)):
+            result = self._add(left, result, addition)
+        self._last_result = result
+
+    def _add(self, left: Value, right: Value, element: 'AdditionExpression') -> Value:
         if {left.type, right.type} == {BaseType(Type.INT), BaseType(Type.FLOAT)} or left.type == right.type == BaseType(
                 Type.FLOAT):
-            self._last_result = Value(BaseType(Type.FLOAT), left.value + right.value)
+            return Value(BaseType(Type.FLOAT), left.value + right.value)
         elif left.type == right.type and left.type in {BaseType(Type.INT), BaseType(Type.STRING)}:
-            self._last_result = Value(left.type, left.value + right.value)
+            return Value(left.type, left.value + right.value)
         else:
             raise ExpressionTypeError(message=f"Cannot evaluate addition expression between objects type: {left.type} and {right.type}", position=element.position)
 
@@ -759,7 +1495,7 @@ class Interpreter(Visitor):
     def visit_initialization_statement(self, element: 'InitializationStatement'):
         type, id, expression = element.type, element.id, element.expression
         expression.accept(self)
-        value = self._last_result
+        value = self._materialize(self._last_result)
         if value.type == type:
             variable = Variable(value.type, id, value)
             self._add_variable(variable)
@@ -773,9 +1509,13 @@ class Interpreter(Visitor):
 
     def visit_return_statement(self, element: 'ReturnStatement') -> None:
         expression = element.expression
+        if self._tail_call_elimination and (function_definition := self._tail_calls.get(element)):
+            self._prepare_tail_call(function_definition, expression)
+            self._was_return = True
+            return
         expression.accept(self)
-        result = self._last_result
-        self._last_result = Value(result.type, result.value)
+        result = self._materialize(self._last_result)
+        self._last_result = result.copy() if result.owned else result
         self._was_return = True
 
     def visit_block(self, element: 'Block') -> None:
@@ -789,6 +1529,11 @@ class Interpreter(Visitor):
         self._stop_program_execution()
         block = element.block
         block.accept(self)
+        while self._pending_tail_call is not None:
+            parameters, self._pending_tail_call = self._pending_tail_call, None
+            self._was_return = False
+            self._execution_stack.current_context.rebind_variables(parameters)
+            block.accept(self)
         result = self._last_result
 
         if result.type != element.type:
@@ -807,7 +1552,7 @@ class Interpreter(Visitor):
         print(f"Program exited with value: {result.value} ({result.type})\n")
 
 
-def main(input_source):
+def main(input_source, memo_stats=False, dump_analysis=False, index_stats=False, **options):
     from io import StringIO
     from src.scanner.scanner import Scanner
     from src.lexer.lexer import Lexer
@@ -824,13 +1569,57 @@ def main(input_source):
     filter = Filter(lexer)
     parser = Parser(filter)
     program = parser.parse_program()
-    interpreter = Interpreter(program)
+    interpreter = Interpreter(program, **options)
+    if dump_analysis:
+        print(interpreter.dump_analysis())
     interpreter.interpret()
+    if memo_stats:
+        for name, (hits, misses) in interpreter.memo_statistics().items():
+            print(f"{name}: {hits} hits, {misses} misses")
+    if index_stats:
+        hits, misses = interpreter.value_index_statistics()
+        print(f"value index: {hits} hits, {misses} misses")
+    if options.get('explain_queries') or options.get('analyze_queries'):
+        print(interpreter.explain())
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Interpreter for a custom language.")
     parser.add_argument('source', type=str, help='Path to the source file or "-" to read from stdin')
+    parser.add_argument('--no-memoize', action='store_true', help='Disable memoization of pure functions')
+    parser.add_argument('--memo-size', type=int, default=1024, help='Maximum number of cached results per function')
+    parser.add_argument('--no-memoize-function', action='append', default=[], metavar='NAME',
+                        help='Exclude given function from memoization (can be repeated)')
+    parser.add_argument('--memo-stats', action='store_true', help='Print memoization hits and misses after the run')
+    parser.add_argument('--no-escape-analysis', action='store_true',
+                        help='Copy every argument instead of passing read-only ones by reference')
+    parser.add_argument('--dump-analysis', action='store_true',
+                        help='Print results of static analysis of every function before the run')
+    parser.add_argument('--no-optimize-queries', action='store_true', help='Run LINQ queries exactly as written')
+    parser.add_argument('--parallel-workers', type=int, default=0,
+                        help='Number of processes running LINQ stages with pure callbacks (0 disables)')
+    parser.add_argument('--parallel-threshold', type=int, default=10000,
+                        help='Smallest number of elements for which a LINQ stage runs in parallel')
+    parser.add_argument('--index-dict-values', action='store_true',
+                        help='Answer where queries comparing Dict values with a literal from a value index')
+    parser.add_argument('--index-stats', action='store_true', help='Print value index hits and misses after the run')
+    parser.add_argument('--disk-dicts', action='store_true',
+                        help='Keep Dict entries in a temporary SQLite database instead of memory')
+    parser.add_argument('--dict-cache-size', type=int, default=100000,
+                        help='Number of recently used entries of each disk Dict kept in memory')
+    parser.add_argument('--dict-partitions', type=int, default=0,
+                        help='Hash-shard Dict entries across N local processes that run queries on them (0 disables)')
+    parser.add_argument('--no-vectorize', action='store_true',
+                        help='Evaluate LINQ callbacks element by element even when NumPy is available')
+    parser.add_argument('--explain', action='store_true', help='Print the plan of every LINQ query after the run')
+    parser.add_argument('--explain-analyze', action='store_true',
+                        help='Print the plan of every LINQ query with per-operator statistics after the run')
 
     args = parser.parse_args()
-    main(args.source)
\ No newline at end of file
+    main(args.source, memo_stats=args.memo_stats, dump_analysis=args.dump_analysis,
+         memoize=not args.no_memoize, memo_size=args.memo_size, memo_exclude=tuple(args.no_memoize_function),
+         escape_analysis=not args.no_escape_analysis, optimize_queries=not args.no_optimize_queries,
+         explain_queries=args.explain, analyze_queries=args.explain_analyze,
+         parallel_workers=args.parallel_workers, parallel_threshold=args.parallel_threshold,
+         vectorize=not args.no_vectorize, index_dict_values=args.index_dict_values, index_stats=args.index_stats,
+         disk_dicts=args.disk_dicts, dict_cache_size=args.dict_cache_size, dict_partitions=args.dict_partitions)
\ No newline at end of file
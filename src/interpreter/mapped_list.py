@@ -0,0 +1,80 @@
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+from typing import Iterator
+
+from src.parser.classes.type import Type
+from src.interpreter.interpreter_error import InterpreterError
+from src.interpreter.typed_list import TypedList
+
+
+# file extension -> (struct format of one little-endian element, element type, typecode of an in-memory copy)
+FORMATS = {'.i32': ('i', Type.INT, 'q'), '.i64': ('q', Type.INT, 'q'),
+           '.f32': ('f', Type.FLOAT, 'd'), '.f64': ('d', Type.FLOAT, 'd')}
+
+
+# Read-only List over a memory-mapped file of little-endian numbers. Elements are decoded when they are read,
+# so the file can be larger than memory; the owning Value replaces it with an in-memory copy before any change.
+class MappedList(Sequence):
+    def __init__(self, path: str, format: str, typecode: str):
+        self._path = path
+        self._format = format
+        self._typecode = typecode
+        self._itemsize = struct.calcsize(f"<{format}")
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size % self._itemsize:
+                raise InterpreterError(message=f"Size of {path} is not a multiple of {self._itemsize} bytes")
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._length = size // self._itemsize
+        # elements are read directly from the mapping when the host byte order matches the file
+        self._view = memoryview(self._buffer).cast(format) if sys.byteorder == 'little' else None
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TypedList(self._typecode, (self[position] for position in range(*index.indices(self._length))))
+        if self._view is not None:
+            return self._view[index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("MappedList index out of range")
+        return struct.unpack_from(f"<{self._format}", self._buffer, index * self._itemsize)[0]
+
+    def __iter__(self) -> Iterator:
+        if self._view is not None:
+            return iter(self._view)
+        return (element for element, in struct.iter_unpack(f"<{self._format}", self._buffer))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(left == right for left, right in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __copy__(self) -> TypedList:
+        return TypedList(self._typecode, self._view if self._view is not None else iter(self))
+
+    def __repr__(self) -> str:
+        return f"MappedList({self._path!r}, {len(self)} elements)"
+
+
+def map_file(path: str) -> tuple[Type, MappedList]:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise InterpreterError(message=f"Can't map file {path} - extension should be one of: {', '.join(FORMATS)}")
+    format, element_type, typecode = FORMATS[extension]
+    try:
+        return element_type, MappedList(path, format, typecode)
+    except OSError as error:
+        raise InterpreterError(message=f"Can't map file {path}: {error.strerror}")
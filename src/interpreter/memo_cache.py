@@ -0,0 +1,72 @@
+from collections import OrderedDict
+from typing import Optional
+
+from src.interpreter.value import Value
+from src.interpreter.dict_view import DictView
+from src.interpreter.typed_list import TypedList
+from src.interpreter.sorted_map import SortedMap
+from src.interpreter.hash_set import HashSet
+from src.interpreter.string_builder import StringBuilder
+from src.interpreter.interpreter_error import InterpreterError
+
+
+def freeze(value):
+    if isinstance(value, (dict, SortedMap)):
+        return tuple((key, freeze(element)) for key, element in value.items())
+    if isinstance(value, (list, tuple, DictView, TypedList, HashSet)):
+        return tuple(freeze(element) for element in value)
+    if isinstance(value, StringBuilder):
+        return str(value)
+    return value
+
+
+class MemoCache:
+    def __init__(self, max_size: int = 1024) -> None:
+        if max_size < 1:
+            raise InterpreterError(message="Memo cache size must be positive")
+        self._entries: OrderedDict = OrderedDict()
+        self._max_size = max_size
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def make_key(self, arguments: list[Value]) -> Optional[tuple]:
+        key = tuple(freeze(argument.value) for argument in arguments)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key: tuple) -> Optional[Value]:
+        if key not in self._entries:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key].copy()
+
+    def put(self, key: tuple, result: Value) -> None:
+        self._entries[key] = result.copy()
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
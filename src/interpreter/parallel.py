@@ -0,0 +1,138 @@
+import itertools
+import math
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker
+from typing import TYPE_CHECKING, Optional
+
+from src.interpreter.interpreter_error import InterpreterError
+from src.interpreter.query import QueryStage, WHERE, SELECT, ORDER_BY, TOP_K
+from src.interpreter.shared_collections import SharedList, SHARED_TYPECODES
+from src.interpreter.typed_list import TypedList
+from src.interpreter.value import Value
+
+if TYPE_CHECKING:
+    from src.parser.classes.program import Program
+    from src.interpreter.interpreter import Interpreter
+
+
+PARALLEL_STAGES = {WHERE, SELECT, ORDER_BY, TOP_K}
+CHUNKS_PER_WORKER = 4
+
+_worker: Optional['Interpreter'] = None
+
+
+def _initialize_worker(program: 'Program') -> None:
+    global _worker
+    from src.interpreter.interpreter import Interpreter
+    _worker = Interpreter(program, optimize_queries=False)
+
+
+def _resolve_stage(stage: tuple) -> QueryStage:
+    return QueryStage.resolve(stage, _worker.find_function_definition)
+
+
+def _run_stages(stages: list[tuple], chunk: list) -> list:
+    return list(_worker._run_stages(chunk, [_resolve_stage(stage) for stage in stages]))
+
+
+def _sort_keys(stage: tuple, chunk: list) -> list:
+    stage = _resolve_stage(stage)
+    return [_worker._sort_key(stage, value) for value in chunk]
+
+
+def _call_function(name: str, arguments: list[Value]) -> Value:
+    return _worker.call_function(name, arguments)
+
+
+# Runs element-wise stages and sort key extraction of LINQ queries on a pool of worker processes.
+# Workers get the program once and resolve callbacks by name, so only the data is sent per query.
+# List<int> and List<float> buffers are placed in shared memory for the duration of a query and workers
+# get ranges of it instead of copies of their chunks.
+class ParallelExecutor:
+    def __init__(self, program: 'Program', pure_functions: set[str], workers: int, threshold: int):
+        self._program = program
+        self._pure_functions = pure_functions
+        self._workers = workers
+        self._threshold = threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._parallel_runs = 0
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def threshold(self) -> int:
+        return self._threshold
+
+    @property
+    def parallel_runs(self) -> int:
+        return self._parallel_runs
+
+    def can_run(self, stages: list[QueryStage], size: int) -> bool:
+        return (size >= self._threshold
+                and all(stage.kind in PARALLEL_STAGES and stage.callbacks
+                        and all(name in self._pure_functions for name in stage.function_names) for stage in stages))
+
+    def run_stages(self, stages: list[QueryStage], values: list) -> list:
+        specification = [stage.specification() for stage in stages]
+        results = self._map(_run_stages, specification, values)
+        return list(itertools.chain.from_iterable(results))
+
+    def sort_keys(self, stage: QueryStage, values: list) -> list:
+        results = self._map(_sort_keys, stage.specification(), values)
+        return list(itertools.chain.from_iterable(results))
+
+    def call_functions(self, name: str, argument_lists: list[list[Value]]) -> list[Value]:
+        return self._submit(lambda executor: list(executor.map(_call_function, itertools.repeat(name), argument_lists)))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _map(self, function, specification, values: list) -> list:
+        shared = None
+        if isinstance(values, TypedList) and values.typecode in SHARED_TYPECODES:
+            values = shared = SharedList.create(values)
+        self._parallel_runs += 1
+        size = max(math.ceil(len(values) / (self._workers * CHUNKS_PER_WORKER)), 1)
+        chunks = [self._chunk(values, start, start + size) for start in range(0, len(values), size)]
+        try:
+            return self._submit(lambda executor: self._gather(
+                [executor.submit(function, specification, chunk) for chunk in chunks]))
+        finally:
+            if shared is not None:
+                shared.segment.release()
+
+    # when a chunk fails, the queued ones are cancelled and the running ones are waited for, so no worker still
+    # reads the shared segment after it is released; a worker that died meanwhile breaks the pool, which is replaced
+    @staticmethod
+    def _gather(futures: list[Future]) -> list:
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            if any(not future.cancelled() and isinstance(future.exception(), BrokenProcessPool) for future in futures):
+                raise BrokenProcessPool()
+            raise
+
+    # a crashed worker breaks the whole pool, so it is replaced by a new one on the next run
+    def _submit(self, run):
+        if self._executor is None:
+            # workers inherit the resource tracker of this process, so a shared memory segment they attach to
+            # is removed only by its owner here, or by the tracker if this process dies
+            resource_tracker.ensure_running()
+            self._executor = ProcessPoolExecutor(self._workers, initializer=_initialize_worker, initargs=(self._program,))
+        try:
+            return run(self._executor)
+        except BrokenProcessPool:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            raise InterpreterError(message="A parallel worker process exited unexpectedly")
+
+    def _chunk(self, values, start: int, stop: int):
+        return values.window(start, stop) if isinstance(values, SharedList) else values[start:stop]
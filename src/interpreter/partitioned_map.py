@@ -0,0 +1,435 @@
+import heapq
+import itertools
+import multiprocessing
+import pickle
+import weakref
+from abc import ABC, abstractmethod
+from collections.abc import MutableMapping, Mapping, ItemsView, ValuesView
+from multiprocessing.connection import Connection
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional
+
+from src.interpreter.interpreter_error import InterpreterError
+from src.interpreter.query import QueryStage
+
+if TYPE_CHECKING:
+    from src.parser.classes.program import Program
+    from src.interpreter.interpreter import Interpreter
+
+
+_FETCH_SIZE = 4096
+_BATCH_SIZE = 100000
+
+
+# Entries of the partitioned Dicts kept by one shard: map id -> key -> (sequence number, value).
+# Sequence numbers come from the coordinator, so merging the shards by them restores the insertion order.
+class Shard:
+    def __init__(self, program: Optional['Program'] = None):
+        self._program = program
+        self._interpreter: Optional['Interpreter'] = None
+        self._maps: dict[int, dict] = {}
+        self._cursors: dict[int, Iterator] = {}
+        self._operations = {'create': self._create, 'drop': self._drop, 'get': self._get, 'contains': self._contains,
+                            'set': self._set, 'delete': self._delete, 'copy': self._copy, 'scan': self._scan,
+                            'fetch': self._fetch, 'close_cursor': self._close_cursor, 'run': self._run}
+
+    # reply to a message: (True, result) or (False, error message)
+    def handle(self, message: tuple) -> tuple[bool, Any]:
+        operation, *arguments = message
+        try:
+            return True, self._operations[operation](*arguments)
+        except Exception as error:
+            return False, str(error) or type(error).__name__
+
+    def _create(self, map_id: int) -> None:
+        self._maps[map_id] = {}
+
+    def _drop(self, map_id: int) -> None:
+        self._maps.pop(map_id, None)
+
+    def _get(self, map_id: int, key) -> tuple[bool, Any]:
+        entry = self._maps[map_id].get(key)
+        return (False, None) if entry is None else (True, entry[1])
+
+    def _contains(self, map_id: int, key) -> bool:
+        return key in self._maps[map_id]
+
+    # an existing key keeps its place in the insertion order
+    def _set(self, map_id: int, entries: list[tuple]) -> int:
+        stored = self._maps[map_id]
+        added = 0
+        for key, sequence, value in entries:
+            if (entry := stored.get(key)) is None:
+                added += 1
+                stored[key] = (sequence, value)
+            else:
+                stored[key] = (entry[0], value)
+        return added
+
+    def _delete(self, map_id: int, key) -> bool:
+        return self._maps[map_id].pop(key, None) is not None
+
+    def _copy(self, map_id: int, copy_id: int) -> None:
+        self._maps[copy_id] = dict(self._maps[map_id])
+
+    def _scan(self, map_id: int, cursor_id: int) -> None:
+        self._cursors[cursor_id] = iter(list(self._maps[map_id].items()))
+
+    def _fetch(self, cursor_id: int, count: int) -> list[tuple]:
+        batch = [(sequence, key, value) for key, (sequence, value) in itertools.islice(self._cursors[cursor_id], count)]
+        if len(batch) < count:
+            del self._cursors[cursor_id]
+        return batch
+
+    def _close_cursor(self, cursor_id: int) -> None:
+        self._cursors.pop(cursor_id, None)
+
+    # map task: element-wise stages over the entries of the shard, then an aggregate of the results if given
+    def _run(self, map_id: int, specifications: list[tuple], aggregate: Optional[str]):
+        from src.interpreter.interpreter import _FILTERED
+        interpreter = self._worker()
+        stages = [QueryStage.resolve(specification, interpreter.find_function_definition)
+                  for specification in specifications]
+        results = ((sequence, result) for key, (sequence, value) in self._maps[map_id].items()
+                   if (result := interpreter._apply_stages((key, value), stages)) is not _FILTERED)
+        if aggregate is None:
+            return list(results)
+        values = (value for _, value in results)
+        if aggregate == 'sum':
+            return sum(values, 0)
+        if aggregate == 'count':
+            return sum(1 for _ in values)
+        found = list(itertools.islice(values, 1))
+        if not found:
+            return False, None
+        return True, (min if aggregate == 'min' else max)(itertools.chain(found, values))
+
+    def _worker(self) -> 'Interpreter':
+        if self._interpreter is None:
+            if self._program is None:
+                raise InterpreterError(message="Shard has no program to run queries with")
+            from src.interpreter.interpreter import Interpreter
+            self._interpreter = Interpreter(self._program, optimize_queries=False, dict_partitions=0)
+        return self._interpreter
+
+
+# Serves the messages of one shard until the coordinator closes the connection. The connection can be a
+# multiprocessing Pipe or a socket from multiprocessing.connection.Listener on another machine.
+def serve(connection: Connection, program: Optional['Program'] = None) -> None:
+    shard = Shard(program)
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            return
+        if message == ('close',):
+            return
+        connection.send(shard.handle(message))
+
+
+# How the coordinator reaches the shards: each message gets exactly one reply, in order.
+class Transport(ABC):
+    @property
+    @abstractmethod
+    def shards(self) -> int:
+        pass
+
+    @abstractmethod
+    def send(self, shard: int, message: tuple) -> None:
+        pass
+
+    @abstractmethod
+    def receive(self, shard: int) -> tuple[bool, Any]:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def request(self, shard: int, message: tuple) -> Any:
+        self.send(shard, message)
+        return self._result(shard, self.receive(shard))
+
+    # sends one message to every shard before waiting for any reply, so the shards work at the same time
+    def broadcast(self, messages: list[tuple]) -> list:
+        for shard, message in enumerate(messages):
+            self.send(shard, message)
+        replies = [self.receive(shard) for shard in range(len(messages))]
+        return [self._result(shard, reply) for shard, reply in enumerate(replies)]
+
+    def _result(self, shard: int, reply: tuple[bool, Any]) -> Any:
+        succeeded, result = reply
+        if not succeeded:
+            raise InterpreterError(message=f"Dict partition {shard} failed: {result}")
+        return result
+
+
+# Shards in the coordinator process. Messages are pickled like for other transports, so values are copied the same way.
+class LocalTransport(Transport):
+    def __init__(self, shards: int, program: Optional['Program'] = None):
+        if shards < 1:
+            raise InterpreterError(message="Number of Dict partitions must be positive")
+        self._shards = [Shard(program) for _ in range(shards)]
+        self._replies: list[Optional[bytes]] = [None] * shards
+
+    @property
+    def shards(self) -> int:
+        return len(self._shards)
+
+    def send(self, shard: int, message: tuple) -> None:
+        reply = self._shards[shard].handle(pickle.loads(pickle.dumps(message)))
+        self._replies[shard] = pickle.dumps(reply)
+
+    def receive(self, shard: int) -> tuple[bool, Any]:
+        reply, self._replies[shard] = self._replies[shard], None
+        return pickle.loads(reply)
+
+
+# Shards behind multiprocessing connections, one per shard.
+class ConnectionTransport(Transport):
+    def __init__(self, connections: list[Connection]):
+        if not connections:
+            raise InterpreterError(message="Number of Dict partitions must be positive")
+        self._connections = connections
+
+    @property
+    def shards(self) -> int:
+        return len(self._connections)
+
+    def send(self, shard: int, message: tuple) -> None:
+        try:
+            self._connections[shard].send(message)
+        except (OSError, ValueError):
+            raise InterpreterError(message=f"Dict partition {shard} is not reachable")
+
+    def receive(self, shard: int) -> tuple[bool, Any]:
+        try:
+            return self._connections[shard].recv()
+        except (EOFError, OSError):
+            raise InterpreterError(message=f"Dict partition {shard} is not reachable")
+
+    def close(self) -> None:
+        for connection in self._connections:
+            try:
+                connection.send(('close',))
+            except (OSError, ValueError):
+                pass
+            connection.close()
+
+
+# One local process per shard, connected with a pipe. The processes end with the coordinator.
+class ProcessTransport(ConnectionTransport):
+    def __init__(self, shards: int, program: Optional['Program'] = None):
+        if shards < 1:
+            raise InterpreterError(message="Number of Dict partitions must be positive")
+        connections = []
+        self._processes = []
+        for _ in range(shards):
+            local, remote = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=serve, args=(remote, program), daemon=True)
+            process.start()
+            remote.close()
+            connections.append(local)
+            self._processes.append(process)
+        super().__init__(connections)
+
+    @property
+    def processes(self) -> list[multiprocessing.Process]:
+        return self._processes
+
+    def close(self) -> None:
+        super().close()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+
+# Partitioned Dicts of one interpreter run sharing a transport, which is closed with the last of them.
+# Messages that can't be sent right away, because they come from a garbage collected Dict or an abandoned
+# iteration, wait for the next operation.
+class PartitionedStorage:
+    def __init__(self, transport: Transport):
+        self._transport = transport
+        self._finalizer = weakref.finalize(self, transport.close)
+        self._map_ids = itertools.count()
+        self._cursor_ids = itertools.count()
+        self._sequence = itertools.count()
+        self._deferred: list[tuple] = []
+        self._map_tasks = 0
+        self._closed = False
+
+    @property
+    def shards(self) -> int:
+        return self._transport.shards
+
+    @property
+    def map_tasks(self) -> int:
+        return self._map_tasks
+
+    def create(self) -> 'PartitionedMap':
+        map_id = next(self._map_ids)
+        self.broadcast(('create', map_id))
+        return PartitionedMap(self, map_id)
+
+    def copy(self, source: 'PartitionedMap') -> 'PartitionedMap':
+        map_id = next(self._map_ids)
+        self.broadcast(('copy', source.map_id, map_id))
+        return PartitionedMap(self, map_id, len(source))
+
+    def close(self) -> None:
+        self._closed = True
+        self._deferred.clear()
+        self._finalizer()
+
+    def next_sequence(self) -> int:
+        return next(self._sequence)
+
+    def request(self, shard: int, message: tuple) -> Any:
+        self._send_deferred()
+        return self._transport.request(shard, message)
+
+    def broadcast(self, message: tuple) -> list:
+        return self.scatter([message] * self.shards)
+
+    def scatter(self, messages: list[tuple]) -> list:
+        self._send_deferred()
+        return self._transport.broadcast(messages)
+
+    def run(self, map_id: int, stages: list[QueryStage], aggregate: Optional[str] = None) -> list:
+        self._map_tasks += 1
+        return self.broadcast(('run', map_id, [stage.specification() for stage in stages], aggregate))
+
+    # entries of one shard as (sequence number, key, value), fetched in batches
+    def scan(self, map_id: int, shard: int) -> Iterator[tuple]:
+        cursor_id = next(self._cursor_ids)
+        self.request(shard, ('scan', map_id, cursor_id))
+        finished = False
+        try:
+            while True:
+                batch = self.request(shard, ('fetch', cursor_id, _FETCH_SIZE))
+                finished = len(batch) < _FETCH_SIZE
+                yield from batch
+                if finished:
+                    return
+        finally:
+            if not finished:
+                self.defer(shard, ('close_cursor', cursor_id))
+
+    def defer(self, shard: Optional[int], message: tuple) -> None:
+        if not self._closed:
+            self._deferred.append((shard, message))
+
+    def _send_deferred(self) -> None:
+        if self._closed:
+            raise InterpreterError(message="Partitioned Dict storage is closed")
+        while self._deferred:
+            shard, message = self._deferred.pop(0)
+            if shard is None:
+                self._transport.broadcast([message] * self.shards)
+            else:
+                self._transport.request(shard, message)
+
+
+def _drop(storage: PartitionedStorage, map_id: int) -> None:
+    storage.defer(None, ('drop', map_id))
+
+
+# Dict entries hash-sharded across the shards of a transport, with the same mapping interface as dict.
+# Keys are assigned to shards with hash() in the coordinator only, so the shards never hash them.
+class PartitionedMap(MutableMapping):
+    def __init__(self, storage: PartitionedStorage, map_id: int, length: int = 0):
+        self._storage = storage
+        self._map_id = map_id
+        self._length = length
+        weakref.finalize(self, _drop, storage, map_id)
+
+    @property
+    def map_id(self) -> int:
+        return self._map_id
+
+    @property
+    def shards(self) -> int:
+        return self._storage.shards
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, key) -> bool:
+        return self._storage.request(self._shard(key), ('contains', self._map_id, key))
+
+    def __getitem__(self, key):
+        found, value = self._storage.request(self._shard(key), ('get', self._map_id, key))
+        if not found:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        entry = (key, self._storage.next_sequence(), value)
+        self._length += self._storage.request(self._shard(key), ('set', self._map_id, [entry]))
+
+    def __delitem__(self, key) -> None:
+        if not self._storage.request(self._shard(key), ('delete', self._map_id, key)):
+            raise KeyError(key)
+        self._length -= 1
+
+    # entries are sent to the shards in batches instead of one message per entry
+    def update(self, other: Iterable = (), /, **entries) -> None:
+        pairs = other.items() if isinstance(other, Mapping) else other
+        batches: list[list[tuple]] = [[] for _ in range(self.shards)]
+        size = 0
+        for key, value in itertools.chain(pairs, entries.items()):
+            batches[self._shard(key)].append((key, self._storage.next_sequence(), value))
+            size += 1
+            if size == _BATCH_SIZE:
+                self._store(batches)
+                batches, size = [[] for _ in range(self.shards)], 0
+        if size:
+            self._store(batches)
+
+    def __iter__(self) -> Iterator:
+        return (key for key, _ in self._entries())
+
+    def items(self) -> ItemsView:
+        return _PartitionedItemsView(self)
+
+    def values(self) -> ValuesView:
+        return _PartitionedValuesView(self)
+
+    def __copy__(self) -> 'PartitionedMap':
+        return self._storage.copy(self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    # results of element-wise stages in insertion order, computed by the shards
+    def run(self, stages: list[QueryStage]) -> Iterator:
+        results = self._storage.run(self._map_id, stages)
+        return (result for _, result in heapq.merge(*results, key=itemgetter(0)))
+
+    # aggregate of the results of element-wise stages: partial results of the shards combined here
+    def aggregate(self, stages: list[QueryStage], kind: str, default):
+        partials = self._storage.run(self._map_id, stages, kind)
+        if kind in ('sum', 'count'):
+            return sum(partials, default)
+        found = [value for exists, value in partials if exists]
+        return (min if kind == 'min' else max)(found, default=default)
+
+    def _shard(self, key) -> int:
+        return hash(key) % self.shards
+
+    def _store(self, batches: list[list[tuple]]) -> None:
+        self._length += sum(self._storage.scatter([('set', self._map_id, batch) for batch in batches]))
+
+    def _entries(self) -> Iterator[tuple]:
+        scans = [self._storage.scan(self._map_id, shard) for shard in range(self.shards)]
+        return ((key, value) for _, key, value in heapq.merge(*scans, key=itemgetter(0)))
+
+
+class _PartitionedItemsView(ItemsView):
+    def __iter__(self) -> Iterator[tuple]:
+        return self._mapping._entries()
+
+
+class _PartitionedValuesView(ValuesView):
+    def __iter__(self) -> Iterator:
+        return (value for _, value in self._mapping._entries())
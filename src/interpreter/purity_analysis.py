@@ -0,0 +1,165 @@
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from src.parser.classes.type import Type
+from src.parser.classes.function_definition import FunctionDefinition
+from src.parser.classes.expression import (IdExpression, IndexAccessExpression, IndexingExpression, DotCallExpression,
+                                           FunctionCallExpression, MethodCallExpression,
+                                           MethodCallAndFieldAccessExpression, ClassInitializationExpression)
+
+from src.interpreter.ast_walker import AstWalker
+
+if TYPE_CHECKING:
+    from src.parser.classes.program import Program
+    from src.parser.classes.expression import Expression
+    from src.parser.classes.statement import InitializationStatement, AssignmentStatement
+
+
+MUTATING_METHODS = {'push', 'pop', 'add', 'remove', 'append'}
+IMPURE_FUNCTIONS = {'print', 'mapFile'}
+
+
+def root_id(expression: 'Expression') -> Optional[str]:
+    if isinstance(expression, (IdExpression, IndexAccessExpression)):
+        return expression.id
+    if isinstance(expression, IndexingExpression):
+        return root_id(expression.expression)
+    if isinstance(expression, DotCallExpression):
+        return root_id(expression.left)
+    return None
+
+
+def method_chain(expression: 'Expression') -> list['Expression']:
+    if isinstance(expression, DotCallExpression):
+        return method_chain(expression.left) + method_chain(expression.right)
+    return [expression]
+
+
+class FunctionSummary:
+    def __init__(self, definition: FunctionDefinition):
+        self.definition = definition
+        self.parameters = {parameter.id for parameter in definition.parameters}
+        self.callees: set[str] = set()
+        self.mutated: set[str] = set()
+        self.fresh_locals: set[str] = set()
+        self.aliased_locals: set[str] = set()
+        self.impure = False
+
+    def mutates_shared_state(self) -> bool:
+        owned = self.fresh_locals - self.aliased_locals
+        return any(name not in owned for name in self.mutated)
+
+
+# Finds user functions whose result depends only on their arguments: they don't print, don't mutate
+# containers they didn't create themselves and call only other pure functions.
+class PurityAnalyzer(AstWalker):
+    def __init__(self, program: 'Program', system_functions: Iterable[str] = ()):
+        self._program = program
+        self._pure_system_functions = set(system_functions) - MUTATING_METHODS - IMPURE_FUNCTIONS
+        self._summaries: dict[str, FunctionSummary] = {}
+        self._current: Optional[FunctionSummary] = None
+        self._pure_functions: Optional[set[str]] = None
+
+    @property
+    def summaries(self) -> dict[str, FunctionSummary]:
+        return self._summaries
+
+    def pure_functions(self) -> set[str]:
+        if self._pure_functions is None:
+            self._program.accept(self)
+            self._pure_functions = self._solve()
+        return self._pure_functions
+
+    def is_pure(self, name: str) -> bool:
+        return name in self.pure_functions()
+
+    def _solve(self) -> set[str]:
+        pure = {name for name, summary in self._summaries.items()
+                if not summary.impure and not summary.mutates_shared_state()}
+        changed = True
+        while changed:
+            changed = False
+            for name in list(pure):
+                for callee in self._summaries[name].callees:
+                    if callee not in pure and (callee in self._summaries or callee not in self._pure_system_functions):
+                        pure.discard(name)
+                        changed = True
+                        break
+        return pure
+
+    def _record_call(self, name: str) -> None:
+        if name in IMPURE_FUNCTIONS:
+            self._current.impure = True
+        elif name in MUTATING_METHODS:
+            self._current.impure = True
+        else:
+            self._current.callees.add(name)
+
+    def _walk_method_chain(self, receiver: 'Expression', chain: 'Expression') -> None:
+        self.walk(receiver)
+        receiver_id = root_id(receiver)
+        for method in method_chain(chain):
+            if isinstance(method, (MethodCallExpression, MethodCallAndFieldAccessExpression, FunctionCallExpression)):
+                if method.id in MUTATING_METHODS:
+                    if receiver_id is not None:
+                        self._current.mutated.add(receiver_id)
+                elif method.id in IMPURE_FUNCTIONS:
+                    self._current.impure = True
+                elif method.id not in self._pure_system_functions:
+                    self._current.callees.add(method.id)
+                self.walk_all(method.arguments)
+                if isinstance(method, MethodCallAndFieldAccessExpression):
+                    self.walk(method.index)
+            else:
+                self.walk(method)
+
+    def visit_program(self, element: 'Program'):
+        for function in element.functions.values():
+            if isinstance(function, FunctionDefinition):
+                self.walk(function)
+
+    def visit_function_definition(self, element: FunctionDefinition):
+        self._current = FunctionSummary(element)
+        self._summaries[element.name] = self._current
+        self.walk(element.block)
+        self._current = None
+
+    def visit_initialization_statement(self, element: 'InitializationStatement'):
+        if isinstance(element.expression, ClassInitializationExpression):
+            self._current.fresh_locals.add(element.id)
+        else:
+            self._current.aliased_locals.add(element.id)
+        self.walk(element.expression)
+
+    def visit_declaration_statement(self, element):
+        self._current.fresh_locals.add(element.id)
+
+    def visit_assignment_statement(self, element: 'AssignmentStatement'):
+        target = element.expression
+        target_id = root_id(target)
+        if target_id is not None:
+            if isinstance(target, IdExpression):
+                if target_id in self._current.parameters:
+                    self._current.mutated.add(target_id)
+                elif not isinstance(element.assign_expression, ClassInitializationExpression):
+                    self._current.aliased_locals.add(target_id)
+            else:
+                self._current.mutated.add(target_id)
+        self.walk(target)
+        self.walk(element.assign_expression)
+
+    def visit_function_call_expression(self, element: FunctionCallExpression):
+        self._record_call(element.id)
+        self.walk_all(element.arguments)
+
+    def visit_id_or_call_expression(self, element):
+        self._walk_method_chain(element.left, element.right)
+
+    def visit_dot_call_expression(self, element):
+        self._walk_method_chain(element.left, element.right)
+
+
+def memoizable_functions(program: 'Program', system_functions: Iterable[str] = ()) -> set[str]:
+    analyzer = PurityAnalyzer(program, system_functions)
+    functions = program.get_functions()
+    return {name for name in analyzer.pure_functions()
+            if functions[name].type.type != Type.VOID}
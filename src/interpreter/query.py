@@ -0,0 +1,119 @@
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Union
+
+from src.parser.classes.type import BaseType, KeyValueType, ElementType
+
+from src.interpreter.value import Value
+
+if TYPE_CHECKING:
+    from src.interpreter.base_function_definition import BaseFunctonDefinition
+
+
+WHERE = 'where'
+SELECT = 'select'
+ORDER_BY = 'orderBy'
+TAKE = 'take'
+TOP_K = 'topK'
+FOR_EACH = 'forEach'
+GROUP_BY = 'groupBy'
+JOIN = 'join'
+DISTINCT = 'distinct'
+ELEMENT_STAGES = {WHERE, SELECT, FOR_EACH}
+
+
+class QueryStage:
+    def __init__(self, kind: str, argument_type: Union[BaseType, KeyValueType],
+                 callbacks: list[tuple[str, 'BaseFunctonDefinition']] = None, count: Optional[int] = None,
+                 other: Optional[Value] = None):
+        self.kind = kind
+        self.argument_type = argument_type
+        self.callbacks = callbacks if callbacks is not None else []
+        self.count = count
+        self.other = other
+
+    @property
+    def function_names(self) -> list[str]:
+        return [name for name, _ in self.callbacks]
+
+    # picklable form of the stage for another interpreter of the same program, with callbacks given by name
+    def specification(self) -> tuple:
+        return self.kind, self.argument_type, self.function_names, self.count
+
+    @classmethod
+    def resolve(cls, specification: tuple, find_function: Callable[[str], 'BaseFunctonDefinition']) -> 'QueryStage':
+        kind, argument_type, names, count = specification
+        return cls(kind, argument_type, [(name, find_function(name)) for name in names], count)
+
+    def __str__(self):
+        separator = " && " if self.kind == WHERE else ", "
+        arguments = [separator.join(self.function_names)] if self.callbacks else []
+        if self.count is not None:
+            arguments.append(str(self.count))
+        return f"{self.kind}({', '.join(arguments)})"
+
+
+# Deferred result of chained LINQ calls. Consecutive element-wise stages are fused into a single pass,
+# which runs the first time the value is needed.
+class QueryValue(Value):
+    def __init__(self, type: Union[ElementType, KeyValueType], source: Value, stages: list[QueryStage],
+                 run: Callable[['QueryValue'], Union[list, dict]], location: tuple[int, int] = (1, 1)):
+        super().__init__(type, None)
+        self._source = source
+        self._stages = stages
+        self._run = run
+        self._location = location
+        self._materialized = False
+
+    @property
+    def value(self):
+        if not self._materialized:
+            self._value = self._run(self)
+            self._materialized = True
+            self._release_sources()
+        return self._value
+
+    @property
+    def source(self) -> Optional[Value]:
+        return self._source
+
+    @property
+    def stages(self) -> list[QueryStage]:
+        return self._stages
+
+    @property
+    def location(self) -> tuple[int, int]:
+        return self._location
+
+    @property
+    def materialized(self) -> bool:
+        return self._materialized
+
+    def copy(self) -> Value:
+        return self.materialize().copy()
+
+    def own(self) -> Value:
+        return self.materialize().own()
+
+    def extend(self, type: Union[ElementType, KeyValueType], stage: QueryStage) -> 'QueryValue':
+        if self._materialized:
+            return QueryValue(type, Value(self._type, self._value), [stage], self._run, self._location)
+        query = QueryValue(type, self._source, self._stages + [stage], self._run, self._location)
+        self._source, self._stages, self._materialized = None, [], True
+        return query
+
+    def materialize(self) -> Value:
+        return Value(self._type, self.value)
+
+    # Passes the elements to a consumer that may stop early. The query is used up afterwards.
+    def stream(self, run: Callable[['QueryValue'], Iterator]) -> Iterator:
+        try:
+            yield from run(self)
+        finally:
+            self._value, self._materialized = None, True
+            self._release_sources()
+
+    def _release_sources(self) -> None:
+        self._source.release()
+        self._source = None
+        for stage in self._stages:
+            if stage.other is not None:
+                stage.other.release()
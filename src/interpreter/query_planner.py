@@ -0,0 +1,83 @@
+from typing import Optional
+
+from src.parser.classes.parameter import Parameter
+from src.parser.classes.function_definition import FunctionDefinition
+from src.parser.classes.statement import ReturnStatement
+from src.parser.classes.expression import IdOrCallExpression, IdExpression, MethodCallExpression
+
+from src.interpreter.query import QueryStage, WHERE, ORDER_BY, TAKE, TOP_K
+
+
+def is_key_selector(function, argument_type) -> bool:
+    if not isinstance(function, FunctionDefinition) or len(function.parameters) != 1:
+        return False
+    parameter, = function.parameters
+    statements = function.block.statements
+    if type(parameter) is not Parameter or parameter.type != argument_type or len(statements) != 1:
+        return False
+    expression = statements[0].expression if isinstance(statements[0], ReturnStatement) else None
+    return (isinstance(expression, IdOrCallExpression) and isinstance(expression.left, IdExpression)
+            and expression.left.id == parameter.id and isinstance(expression.right, MethodCallExpression)
+            and expression.right.id == 'key' and not expression.right.arguments)
+
+
+# Rewrites a deferred query before it runs. Every rule keeps the result unchanged;
+# rules that change how many times a callback is called apply only to pure callbacks.
+class QueryPlanner:
+    def __init__(self, pure_functions: set[str]):
+        self._pure_functions = pure_functions
+
+    def optimize(self, stages: list[QueryStage], key_ordered: bool = False) -> list[QueryStage]:
+        stages = list(stages)
+        while ((key_ordered and self._drop_key_order(stages)) or self._push_down_where(stages)
+               or self._merge_where(stages) or self._merge_take(stages) or self._use_top_k(stages)):
+            pass
+        return stages
+
+    def _is_pure(self, stage: QueryStage) -> bool:
+        return all(name in self._pure_functions for name in stage.function_names)
+
+    def _find_pair(self, stages: list[QueryStage], first: str, second: str) -> Optional[int]:
+        for index in range(len(stages) - 1):
+            if stages[index].kind == first and stages[index + 1].kind == second:
+                return index
+        return None
+
+    # a SortedDict source is already ordered by key, and where and take keep that order
+    def _drop_key_order(self, stages: list[QueryStage]) -> bool:
+        for index, stage in enumerate(stages):
+            if stage.kind in (ORDER_BY, TOP_K) and is_key_selector(stage.callbacks[0][1], stage.argument_type):
+                stages[index:index + 1] = [QueryStage(TAKE, stage.argument_type, count=stage.count)] if stage.kind == TOP_K else []
+                return True
+            if stage.kind not in (WHERE, TAKE):
+                return False
+        return False
+
+    def _push_down_where(self, stages: list[QueryStage]) -> bool:
+        for index in range(len(stages) - 1):
+            order_by, where = stages[index], stages[index + 1]
+            if order_by.kind == ORDER_BY and where.kind == WHERE and self._is_pure(order_by) and self._is_pure(where):
+                stages[index], stages[index + 1] = where, order_by
+                return True
+        return False
+
+    def _merge_where(self, stages: list[QueryStage]) -> bool:
+        if (index := self._find_pair(stages, WHERE, WHERE)) is None:
+            return False
+        first, second = stages[index], stages[index + 1]
+        stages[index:index + 2] = [QueryStage(WHERE, first.argument_type, first.callbacks + second.callbacks)]
+        return True
+
+    def _merge_take(self, stages: list[QueryStage]) -> bool:
+        if (index := self._find_pair(stages, TAKE, TAKE)) is None:
+            return False
+        first, second = stages[index], stages[index + 1]
+        stages[index:index + 2] = [QueryStage(TAKE, first.argument_type, count=min(first.count, second.count))]
+        return True
+
+    def _use_top_k(self, stages: list[QueryStage]) -> bool:
+        if (index := self._find_pair(stages, ORDER_BY, TAKE)) is None:
+            return False
+        order_by, take = stages[index], stages[index + 1]
+        stages[index:index + 2] = [QueryStage(TOP_K, order_by.argument_type, order_by.callbacks, take.count)]
+        return True
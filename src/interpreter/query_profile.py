@@ -0,0 +1,128 @@
+import time
+from typing import Callable, Iterable, Iterator
+
+from src.interpreter.query import QueryStage, ORDER_BY, TOP_K, FOR_EACH, GROUP_BY, JOIN
+
+
+class StageStatistics:
+    def __init__(self, stage: QueryStage):
+        self.stage = stage
+        self.input_rows = 0
+        self.output_rows = 0
+        self.calls = 0
+        self.time = 0.0
+
+
+class QueryExecution:
+    def __init__(self, stages: int):
+        self.source_rows = 0
+        self.start = time.perf_counter()
+        # values measured while pulling from a stage also include the work of all stages before it
+        self.output_rows = [0] * stages
+        self.calls = [0] * stages
+        self.time = [0.0] * stages
+
+
+# Plan of one LINQ query in the program and, in analyze mode, statistics summed over all its executions.
+class QueryProfile:
+    def __init__(self, location: tuple[int, int], written: list[QueryStage], plan: list[QueryStage]):
+        self._location = location
+        self._written = written
+        self._plan = plan
+        self._statistics = [StageStatistics(stage) for stage in plan]
+        self._executions = 0
+        self._source_rows = 0
+        self._peak_size = 0
+        self._time = 0.0
+
+    @property
+    def location(self) -> tuple[int, int]:
+        return self._location
+
+    @property
+    def written(self) -> list[QueryStage]:
+        return self._written
+
+    @property
+    def plan(self) -> list[QueryStage]:
+        return self._plan
+
+    @property
+    def statistics(self) -> list[StageStatistics]:
+        return self._statistics
+
+    @property
+    def executions(self) -> int:
+        return self._executions
+
+    @property
+    def source_rows(self) -> int:
+        return self._source_rows
+
+    @property
+    def peak_size(self) -> int:
+        return self._peak_size
+
+    @property
+    def time(self) -> float:
+        return self._time
+
+    def start(self) -> QueryExecution:
+        return QueryExecution(len(self._plan))
+
+    def read_source(self, execution: QueryExecution, values: Iterable) -> Iterator:
+        for value in values:
+            execution.source_rows += 1
+            yield value
+
+    def measure(self, execution: QueryExecution, index: int, values: Iterable, calls: Callable[[], int]) -> Iterator:
+        iterator = iter(values)
+        while True:
+            start, start_calls = time.perf_counter(), calls()
+            try:
+                value = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                execution.time[index] += time.perf_counter() - start
+                execution.calls[index] += calls() - start_calls
+            execution.output_rows[index] += 1
+            yield value
+
+    def finish(self, execution: QueryExecution) -> None:
+        self._executions += 1
+        self._source_rows += execution.source_rows
+        self._time += time.perf_counter() - execution.start
+        input_rows, previous_calls, previous_time = execution.source_rows, 0, 0.0
+        peak_size = 0
+        for index, statistics in enumerate(self._statistics):
+            statistics.input_rows += input_rows
+            statistics.output_rows += execution.output_rows[index]
+            statistics.calls += execution.calls[index] - previous_calls
+            statistics.time += max(execution.time[index] - previous_time, 0.0)
+            if statistics.stage.kind in (ORDER_BY, GROUP_BY):
+                peak_size = max(peak_size, input_rows)
+            elif statistics.stage.kind == JOIN:
+                peak_size = max(peak_size, len(statistics.stage.other.value))
+            elif statistics.stage.kind == TOP_K:
+                peak_size = max(peak_size, min(input_rows, statistics.stage.count))
+            input_rows, previous_calls, previous_time = (execution.output_rows[index], execution.calls[index],
+                                                         execution.time[index])
+        if not self._plan or self._plan[-1].kind != FOR_EACH:
+            peak_size = max(peak_size, input_rows)
+        self._peak_size = max(self._peak_size, peak_size)
+
+    def format(self, analyze: bool = False) -> str:
+        line, column = self._location
+        lines = [f"Query at line {line}, column {column}:",
+                 f"  plan: {' -> '.join(str(stage) for stage in self._plan)}"]
+        if [str(stage) for stage in self._written] != [str(stage) for stage in self._plan]:
+            lines.append(f"  written: {' -> '.join(str(stage) for stage in self._written)}")
+        if analyze:
+            lines.append(f"  executions: {self._executions}, source rows: {self._source_rows},"
+                         f" peak intermediate size: {self._peak_size}, time: {self._time * 1000:.3f} ms")
+            for statistics in self._statistics:
+                lines.append(f"    {str(statistics.stage):<30} input: {statistics.input_rows}, "
+                             f"output: {statistics.output_rows}, calls: {statistics.calls}, "
+                             f"time: {statistics.time * 1000:.3f} ms")
+        return "\n".join(lines)
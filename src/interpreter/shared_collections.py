@@ -0,0 +1,293 @@
+import pickle
+import struct
+import weakref
+import zlib
+from array import array
+from collections.abc import Mapping, Sequence, ItemsView, ValuesView
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterator, Optional
+
+from src.interpreter.interpreter_error import InterpreterError
+from src.interpreter.typed_list import TypedList
+
+
+# typecodes of List<int> and List<float> buffers that can be shared
+SHARED_TYPECODES = {'q', 'd'}
+_OFFSET = struct.calcsize('q')
+
+
+def _create_segment(size: int) -> SharedMemory:
+    try:
+        return SharedMemory(create=True, size=max(size, 1))
+    except OSError as error:
+        raise InterpreterError(message=f"Can't create shared memory segment of {size} bytes: {error.strerror}")
+
+
+def _attach_segment(name: str) -> SharedMemory:
+    # Python 3.13+ can attach without registering the segment with the resource tracker; before that the
+    # workers share the tracker of the process that created the segment, so registering it again is harmless
+    try:
+        return SharedMemory(name, track=False)
+    except TypeError:
+        return SharedMemory(name)
+
+
+def _close_segment(memory: SharedMemory, views: list[memoryview], owner: bool) -> None:
+    try:
+        for view in views:
+            view.release()
+        memory.close()
+    except BufferError:
+        # a view of the segment is still exported; the mapping is closed when it is freed
+        pass
+    if owner:
+        try:
+            memory.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# One shared memory segment. The process that created it removes it when the segment is released or garbage
+# collected; processes that attached to it only close their mapping. Views of the segment are released with it,
+# so reading a released collection fails instead of touching unmapped memory. If the creating process dies, the
+# multiprocessing resource tracker removes the segments it left behind.
+class SharedSegment:
+    def __init__(self, memory: SharedMemory, owner: bool):
+        self._memory = memory
+        self._owner = owner
+        self._views: list[memoryview] = []
+        self._finalizer = weakref.finalize(self, _close_segment, memory, self._views, owner)
+
+    @classmethod
+    def create(cls, size: int) -> 'SharedSegment':
+        return cls(_create_segment(size), True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedSegment':
+        try:
+            return cls(_attach_segment(name), False)
+        except FileNotFoundError:
+            raise InterpreterError(message=f"Shared memory segment {name} no longer exists")
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def view(self, start: int, stop: int, format: str = 'B') -> memoryview:
+        if self.released:
+            raise InterpreterError(message=f"Shared memory segment {self.name} was released")
+        view = self._memory.buf[start:stop].cast(format)
+        self._views.append(view)
+        return view
+
+    @property
+    def owner(self) -> bool:
+        return self._owner
+
+    @property
+    def released(self) -> bool:
+        return not self._finalizer.alive
+
+    def release(self) -> None:
+        self._finalizer()
+
+
+def _attach_list(name: str, typecode: str, start: int, length: int) -> 'SharedList':
+    return SharedList(SharedSegment.attach(name), typecode, start, length)
+
+
+# Read-only List<int> or List<float> stored in a shared memory segment. Pickling it sends only the segment
+# name and the range, so worker processes read the elements in place; the owning Value copies it before any change.
+class SharedList(Sequence):
+    def __init__(self, segment: SharedSegment, typecode: str, start: int, length: int):
+        self._segment = segment
+        self._typecode = typecode
+        self._start = start
+        self._length = length
+        self._elements: Optional[memoryview] = None
+
+    # mapped on first read, so windows that are only sent to other processes don't keep views
+    @property
+    def _view(self) -> memoryview:
+        if self._elements is None:
+            itemsize = struct.calcsize(self._typecode)
+            self._elements = self._segment.view(self._start * itemsize, (self._start + self._length) * itemsize,
+                                                self._typecode)
+        return self._elements
+
+    @classmethod
+    def create(cls, values: TypedList) -> 'SharedList':
+        if values.typecode not in SHARED_TYPECODES:
+            raise InterpreterError(message="Only List<int> and List<float> can be placed in shared memory")
+        segment = SharedSegment.create(len(values) * values.itemsize)
+        shared = cls(segment, values.typecode, 0, len(values))
+        shared._view[:] = values
+        return shared
+
+    @property
+    def segment(self) -> SharedSegment:
+        return self._segment
+
+    @property
+    def typecode(self) -> str:
+        return self._typecode
+
+    # elements start to stop sharing the same segment, without copying them
+    def window(self, start: int, stop: int) -> 'SharedList':
+        start, stop, _ = slice(start, stop).indices(self._length)
+        return SharedList(self._segment, self._typecode, self._start + start, max(stop - start, 0))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TypedList(self._typecode, self._view[index])
+        return self._view[index]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._view)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(left == right for left, right in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __copy__(self) -> TypedList:
+        return TypedList(self._typecode, self._view)
+
+    def __reduce__(self):
+        return _attach_list, (self._segment.name, self._typecode, self._start, self._length)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+def _attach_dict(name: str) -> 'SharedDict':
+    return SharedDict(SharedSegment.attach(name))
+
+
+# Read-only snapshot of a Dict stored in a shared memory segment: a header with the number of entries and of
+# hash slots, an open-addressing table of entry numbers, the offsets of the pickled keys and values in
+# insertion order and the pickled data itself. Keys are hashed with CRC32 of their pickle, which is the same
+# in every process, unlike hash(). Values are unpickled on every read, so changes to them are not shared.
+class SharedDict(Mapping):
+    def __init__(self, segment: SharedSegment):
+        self._segment = segment
+        self._count, self._slots = segment.view(0, 2 * _OFFSET, 'q')
+        header = 2 * _OFFSET
+        table_end = header + self._slots * _OFFSET
+        offsets_end = table_end + (2 * self._count + 1) * _OFFSET
+        self._table = segment.view(header, table_end, 'q')
+        self._offsets = segment.view(table_end, offsets_end, 'q')
+        self._data = segment.view(offsets_end, offsets_end + self._offsets[-1])
+
+    @classmethod
+    def create(cls, entries: Mapping) -> 'SharedDict':
+        encoded = [(_encode_key(key), _encode_value(value)) for key, value in entries.items()]
+        slots = 8
+        while slots < 2 * len(encoded):
+            slots *= 2
+        table = [0] * slots
+        offsets = [0]
+        for number, (key, value) in enumerate(encoded):
+            slot = zlib.crc32(key) & (slots - 1)
+            while table[slot]:
+                slot = (slot + 1) & (slots - 1)
+            table[slot] = number + 1
+            offsets.append(offsets[-1] + len(key))
+            offsets.append(offsets[-1] + len(value))
+        header = struct.pack('qq', len(encoded), slots) + array('q', table).tobytes() + array('q', offsets).tobytes()
+        segment = SharedSegment.create(len(header) + offsets[-1])
+        buffer = segment.view(0, len(header) + offsets[-1])
+        buffer[:len(header)] = header
+        position = len(header)
+        for key, value in encoded:
+            for data in (key, value):
+                buffer[position:position + len(data)] = data
+                position += len(data)
+        return cls(segment)
+
+    @property
+    def segment(self) -> SharedSegment:
+        return self._segment
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key) -> bool:
+        return self._find(key) is not None
+
+    def __getitem__(self, key):
+        if (number := self._find(key)) is None:
+            raise KeyError(key)
+        return pickle.loads(self._data[self._offsets[2 * number + 1]:self._offsets[2 * number + 2]])
+
+    def __iter__(self) -> Iterator:
+        return (key for key, _ in self._entries(values=False))
+
+    def items(self) -> ItemsView:
+        return _SharedItemsView(self)
+
+    def values(self) -> ValuesView:
+        return _SharedValuesView(self)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Mapping):
+            return len(self) == len(other) and all(key in other and other[key] == value for key, value in self.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __copy__(self) -> dict:
+        return dict(self.items())
+
+    def __reduce__(self):
+        return _attach_dict, (self._segment.name,)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def _find(self, key) -> Optional[int]:
+        try:
+            encoded = _encode_key(key)
+        except InterpreterError:
+            return None
+        mask = self._slots - 1
+        slot = zlib.crc32(encoded) & mask
+        while entry := self._table[slot]:
+            number = entry - 1
+            if self._data[self._offsets[2 * number]:self._offsets[2 * number + 1]] == encoded:
+                return number
+            slot = (slot + 1) & mask
+        return None
+
+    def _entries(self, values: bool = True) -> Iterator[tuple]:
+        data, offsets = self._data, self._offsets
+        for number in range(self._count):
+            key = pickle.loads(data[offsets[2 * number]:offsets[2 * number + 1]])
+            value = pickle.loads(data[offsets[2 * number + 1]:offsets[2 * number + 2]]) if values else None
+            yield key, value
+
+
+class _SharedItemsView(ItemsView):
+    def __iter__(self) -> Iterator[tuple]:
+        return self._mapping._entries()
+
+
+class _SharedValuesView(ValuesView):
+    def __iter__(self) -> Iterator:
+        return (value for _, value in self._mapping._entries())
+
+
+def _encode_key(key) -> bytes:
+    if type(key) not in (int, float, str, bool):
+        raise InterpreterError(message=f"Key {key!r} can't be used in a shared Dict")
+    # 0.0 and -0.0 are the same key
+    return pickle.dumps(key + 0.0 if type(key) is float else key, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _encode_value(value) -> bytes:
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
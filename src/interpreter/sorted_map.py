@@ -0,0 +1,113 @@
+import bisect
+import itertools
+from collections.abc import MutableMapping
+from typing import Iterable, Iterator
+
+
+# largest number of keys in one chunk before it is split in two
+CHUNK_SIZE = 512
+
+
+# Value of a SortedDict: a hash table for lookups and the keys in order, kept in a two-level B-tree-like list
+# (chunks of at most CHUNK_SIZE sorted keys, searched by their largest keys). Insertion, removal, min/max and
+# the start of a range need O(log n) comparisons; iteration goes in key order.
+class SortedMap(MutableMapping):
+    def __init__(self, items: Iterable[tuple] = ()):
+        self._values: dict = {}
+        self._chunks: list[list] = []
+        self._maxes: list = []
+        for key, value in items:
+            self[key] = value
+
+    @classmethod
+    def from_sorted(cls, items: Iterable[tuple]) -> 'SortedMap':
+        result = cls()
+        result._values = dict(items)
+        keys = list(result._values)
+        result._chunks = [keys[start:start + CHUNK_SIZE] for start in range(0, len(keys), CHUNK_SIZE)]
+        result._maxes = [chunk[-1] for chunk in result._chunks]
+        return result
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key) -> bool:
+        return key in self._values
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __setitem__(self, key, value) -> None:
+        if key not in self._values:
+            self._insert(key)
+        self._values[key] = value
+
+    def __delitem__(self, key) -> None:
+        del self._values[key]
+        self._remove(key)
+
+    def __iter__(self) -> Iterator:
+        return itertools.chain.from_iterable(self._chunks)
+
+    def __reversed__(self) -> Iterator:
+        return (key for chunk in reversed(self._chunks) for key in reversed(chunk))
+
+    def __copy__(self) -> 'SortedMap':
+        result = SortedMap()
+        result._values = dict(self._values)
+        result._chunks = [list(chunk) for chunk in self._chunks]
+        result._maxes = list(self._maxes)
+        return result
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def min_key(self):
+        return self._chunks[0][0]
+
+    def max_key(self):
+        return self._maxes[-1]
+
+    def range(self, low, high) -> 'SortedMap':
+        return SortedMap.from_sorted((key, self._values[key]) for key in self.keys_between(low, high))
+
+    def keys_between(self, low, high) -> Iterator:
+        index = bisect.bisect_left(self._maxes, low)
+        if index == len(self._maxes):
+            return
+        position = bisect.bisect_left(self._chunks[index], low)
+        for chunk in itertools.islice(self._chunks, index, None):
+            for key in itertools.islice(chunk, position, None):
+                if not key < high:
+                    return
+                yield key
+            position = 0
+
+    def _insert(self, key) -> None:
+        if not self._maxes:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            return
+        index = bisect.bisect_left(self._maxes, key)
+        if index == len(self._maxes):
+            index -= 1
+            self._chunks[index].append(key)
+            self._maxes[index] = key
+        else:
+            bisect.insort(self._chunks[index], key)
+        chunk = self._chunks[index]
+        if len(chunk) > CHUNK_SIZE:
+            half = len(chunk) // 2
+            self._chunks.insert(index + 1, chunk[half:])
+            del chunk[half:]
+            self._maxes.insert(index, chunk[-1])
+
+    def _remove(self, key) -> None:
+        index = bisect.bisect_left(self._maxes, key)
+        chunk = self._chunks[index]
+        del chunk[bisect.bisect_left(chunk, key)]
+        if not chunk:
+            del self._chunks[index]
+            del self._maxes[index]
+        else:
+            self._maxes[index] = chunk[-1]
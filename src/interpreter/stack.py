@@ -20,6 +20,11 @@ class BlockVariables:
             return self._variables[key]
         return None
 
+    def clear(self) -> None:
+        for variable in self._variables.values():
+            variable.release()
+        self._variables.clear()
+
 
 class FunctionContext:
     def __init__(self) -> None:
@@ -34,15 +39,31 @@ class FunctionContext:
                 raise InterpreterError(message=f"There is already a variable {variable.id} declared")
         self._current_block_variable.add_variable(variable)
 
+    @property
+    def block_count(self) -> int:
+        return len(self._block_variables)
+
     def push_block_variables(self, block_variables: BlockVariables) -> None:
         self._block_variables.append(block_variables)
         self._current_block_variable = block_variables
 
     def pop_block_variables(self) -> BlockVariables:
         result = self._block_variables.pop()
+        result.clear()
         self._current_block_variable = self._block_variables[-1] if len(self._block_variables) > 0 else None
         return result
 
+    def clear(self) -> None:
+        while self._block_variables:
+            self.pop_block_variables()
+
+    def rebind_variables(self, variables: [Variable]) -> None:
+        if len(self._block_variables) != 1:
+            raise InterpreterError("Can't rebind function parameters inside of a nested block")
+        self._current_block_variable.clear()
+        for variable in variables:
+            self._current_block_variable.add_variable(variable)
+
     def find_variable(self, key: str) -> Optional[Variable]:
         for block_variable in self._block_variables:
             if variable := block_variable.find_variable(key):
@@ -50,10 +71,63 @@ class FunctionContext:
         return None
 
 
+class FramePool:
+    def __init__(self) -> None:
+        self._free_contexts: [FunctionContext] = []
+        self._free_blocks: [BlockVariables] = []
+        self._acquired_contexts = 0
+        self._acquired_blocks = 0
+        self._allocated_contexts = 0
+        self._allocated_blocks = 0
+
+    @property
+    def acquired_contexts(self) -> int:
+        return self._acquired_contexts
+
+    @property
+    def acquired_blocks(self) -> int:
+        return self._acquired_blocks
+
+    @property
+    def allocated_contexts(self) -> int:
+        return self._allocated_contexts
+
+    @property
+    def allocated_blocks(self) -> int:
+        return self._allocated_blocks
+
+    def acquire_context(self) -> FunctionContext:
+        self._acquired_contexts += 1
+        if self._free_contexts:
+            return self._free_contexts.pop()
+        self._allocated_contexts += 1
+        return FunctionContext()
+
+    def release_context(self, context: FunctionContext) -> None:
+        context.clear()
+        self._free_contexts.append(context)
+
+    def acquire_block(self) -> BlockVariables:
+        self._acquired_blocks += 1
+        if self._free_blocks:
+            return self._free_blocks.pop()
+        self._allocated_blocks += 1
+        return BlockVariables()
+
+    def release_block(self, block_variables: BlockVariables) -> None:
+        block_variables.clear()
+        self._free_blocks.append(block_variables)
+
+
 class ExecutionStack:
     def __init__(self) -> None:
         self._function_contexts: [FunctionContext] = []
         self._current_context: Optional[FunctionContext] = None
+        self._pool = FramePool()
+
+    @property
+    def pool(self) -> FramePool:
+        return self._pool
 
     @property
     def function_contexts(self) -> [FunctionContext]:
@@ -90,5 +164,30 @@ class ExecutionStack:
         self._current_context = self._function_contexts[-1] if len(self._function_contexts) > 0 else None
         return result
 
+    def acquire_block(self) -> BlockVariables:
+        return self._pool.acquire_block()
+
+    def release_block(self, block_variables: BlockVariables) -> None:
+        self._pool.release_block(block_variables)
+
+    def enter_function(self, block_variables: BlockVariables) -> None:
+        context = self._pool.acquire_context()
+        context.push_block_variables(block_variables)
+        self._function_contexts.append(context)
+        self._current_context = context
+
+    def leave_function(self) -> None:
+        context = self._function_contexts.pop()
+        self._current_context = self._function_contexts[-1] if self._function_contexts else None
+        while context.block_count:
+            self._pool.release_block(context.pop_block_variables())
+        self._pool.release_context(context)
+
+    def enter_block(self) -> None:
+        self._current_context.push_block_variables(self._pool.acquire_block())
+
+    def leave_block(self) -> None:
+        self._pool.release_block(self._current_context.pop_block_variables())
+
     def find_variable(self, key: str) -> Optional[Variable]:
         return self._current_context.find_variable(key)
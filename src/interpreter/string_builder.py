@@ -0,0 +1,36 @@
+from typing import Iterable
+
+
+# Value of a StringBuilder: appended strings are kept as a list of fragments and joined only when the text is
+# read, so building a string piece by piece takes linear time instead of copying the whole text on every append.
+class StringBuilder:
+    def __init__(self, fragments: Iterable[str] = ()):
+        self._fragments: list[str] = [fragment for fragment in fragments if fragment]
+        self._length = sum(map(len, self._fragments))
+
+    def append(self, text: str) -> None:
+        if text:
+            self._fragments.append(text)
+            self._length += len(text)
+
+    def __len__(self) -> int:
+        return self._length
+
+    # the joined text replaces the fragments, so reading it again doesn't join them again
+    def __str__(self) -> str:
+        if len(self._fragments) > 1:
+            self._fragments[:] = ["".join(self._fragments)]
+        return self._fragments[0] if self._fragments else ""
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, StringBuilder):
+            return len(self) == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __copy__(self) -> 'StringBuilder':
+        return StringBuilder((str(self),))
+
+    def __repr__(self) -> str:
+        return f"StringBuilder({str(self)!r})"
@@ -0,0 +1,43 @@
+from typing import TYPE_CHECKING, Optional
+
+from src.parser.classes.expression import FunctionCallExpression
+from src.parser.classes.function_definition import FunctionDefinition
+
+from src.interpreter.ast_walker import AstWalker
+
+if TYPE_CHECKING:
+    from src.parser.classes.program import Program
+    from src.parser.classes.statement import ReturnStatement
+
+
+# Finds "return f(...);" statements inside the body of f itself. Their result is returned unchanged,
+# so the interpreter can rebind the parameters and jump back to the beginning of f instead of calling it.
+class TailCallAnalyzer(AstWalker):
+    def __init__(self, program: 'Program'):
+        self._program = program
+        self._current: Optional[FunctionDefinition] = None
+        self._tail_calls: dict['ReturnStatement', FunctionDefinition] = {}
+
+    def tail_calls(self) -> dict['ReturnStatement', FunctionDefinition]:
+        self._tail_calls = {}
+        self._program.accept(self)
+        return self._tail_calls
+
+    def visit_program(self, element: 'Program'):
+        for function in element.functions.values():
+            if isinstance(function, FunctionDefinition):
+                self.walk(function)
+
+    def visit_function_definition(self, element: FunctionDefinition):
+        self._current = element
+        self.walk(element.block)
+        self._current = None
+
+    def visit_return_statement(self, element: 'ReturnStatement'):
+        expression = element.expression
+        if isinstance(expression, FunctionCallExpression) and expression.id == self._current.name:
+            self._tail_calls[element] = self._current
+
+
+def find_tail_calls(program: 'Program') -> dict['ReturnStatement', FunctionDefinition]:
+    return TailCallAnalyzer(program).tail_calls()
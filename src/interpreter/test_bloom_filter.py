@@ -0,0 +1,24 @@
+import copy
+
+from src.interpreter.bloom_filter import BloomFilter
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        for value in range(0, 2000, 2):
+            bloom.add(value)
+        assert all(value in bloom for value in range(0, 2000, 2))
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(10000)
+        for value in range(10000):
+            bloom.add(f"key{value}")
+        false_positives = sum(f"other{value}" in bloom for value in range(10000))
+        assert false_positives < 300
+
+    def test_copy_is_independent(self):
+        bloom = BloomFilter(10)
+        copied = copy.copy(bloom)
+        copied.add("a")
+        assert "a" in copied and "a" not in bloom
@@ -0,0 +1,44 @@
+import copy
+
+from src.parser.classes.type import Type, ElementType, KeyValueType
+
+from src.interpreter.value import Value
+from src.interpreter.dict_view import DictView
+
+
+class TestDictView:
+    def test_view_reads_dict_without_copy(self):
+        entries = {"a": 1, "b": 2}
+        keys, values = DictView(entries, keys=True), DictView(entries, keys=False)
+        assert len(keys) == 2
+        assert list(keys) == ["a", "b"] and values[1] == 2
+        assert keys.entries is entries
+
+    def test_view_equals_list(self):
+        assert DictView({"a": 1}, keys=False) == [1]
+        assert [1] == DictView({"a": 1}, keys=False)
+
+    def test_copy_is_a_list(self):
+        assert copy.copy(DictView({"a": 1}, keys=True)) == ["a"]
+        assert isinstance(copy.copy(DictView({"a": 1}, keys=True)), list)
+
+    def test_dict_value_reuses_view_until_changed(self):
+        value = Value(KeyValueType(Type.DICT, Type.STRING, Type.INT), {"a": 1})
+        view = value.dict_view(keys=True)
+        assert value.dict_view(keys=True) is view
+        value.detach()
+        value.value["b"] = 2
+        assert value.dict_view(keys=True) is not view
+        assert value.dict_view(keys=True) == ["a", "b"]
+
+    def test_owning_view_takes_snapshot(self):
+        entries = {"a": 1}
+        owned = Value(ElementType(Type.LIST, Type.INT), DictView(entries, keys=False)).own()
+        entries["b"] = 2
+        assert owned.value == [1]
+
+    def test_detach_materializes_view(self):
+        value = Value(ElementType(Type.LIST, Type.STRING), DictView({"a": 1}, keys=True))
+        assert value.detach()
+        value.value.append("b")
+        assert value.value == ["a", "b"]
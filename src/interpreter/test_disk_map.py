@@ -0,0 +1,72 @@
+import copy
+import random
+
+import pytest
+
+from src.interpreter.disk_map import DiskStorage
+from src.interpreter.interpreter_error import InterpreterError
+
+
+class TestDiskMap:
+    def test_matches_dict(self):
+        storage = DiskStorage(cache_size=4, batch_size=3)
+        disk_map, expected = storage.create(), {}
+        generator = random.Random(1)
+        for _ in range(2000):
+            key = generator.choice([generator.randrange(50), f"k{generator.randrange(50)}"])
+            action = generator.random()
+            if action < 0.5:
+                disk_map[key] = expected[key] = generator.choice([generator.random(), [1, 2], "v", True, 2 ** 70])
+            elif action < 0.7 and key in expected:
+                del disk_map[key], expected[key]
+            else:
+                assert (key in disk_map) == (key in expected)
+                assert disk_map.get(key) == expected.get(key)
+        assert len(disk_map) == len(expected)
+        assert list(disk_map.items()) == list(expected.items())
+        assert list(disk_map.values()) == list(expected.values())
+
+    def test_deleted_key_added_again_moves_to_end(self):
+        disk_map = DiskStorage(batch_size=100).create()
+        disk_map["a"], disk_map["b"] = 1, 2
+        disk_map.flush()
+        del disk_map["a"]
+        disk_map["a"] = 3
+        assert list(disk_map.items()) == [("b", 2), ("a", 3)]
+
+    def test_copy_is_independent(self):
+        disk_map = DiskStorage().create()
+        disk_map[1] = "a"
+        copied = copy.copy(disk_map)
+        copied[2] = "b"
+        del copied[1]
+        assert dict(disk_map) == {1: "a"} and dict(copied) == {2: "b"}
+
+    def test_bloom_filter_skips_missing_keys(self):
+        disk_map = DiskStorage(cache_size=0).create()
+        disk_map.update((f"key{index}", index) for index in range(5000))
+        disk_map.flush()
+        assert sum(f"missing{index}" in disk_map for index in range(1000)) == 0
+        statistics = disk_map.statistics()
+        assert statistics["bloom_skips"] > 950 and statistics["table_reads"] < 50
+
+    def test_cache_serves_repeated_reads(self):
+        disk_map = DiskStorage(cache_size=10).create()
+        disk_map.update((index, index) for index in range(100))
+        disk_map.flush()
+        for _ in range(3):
+            assert disk_map[7] == 7
+        assert disk_map.statistics()["cache_hits"] >= 2
+
+    def test_named_table_persists(self, tmp_path):
+        path = str(tmp_path / "dicts.db")
+        storage = DiskStorage(path)
+        table = storage.open("lookup")
+        table["a"] = 1
+        storage.close()
+        reopened = DiskStorage(path).open("lookup")
+        assert dict(reopened) == {"a": 1} and "a" in reopened and "b" not in reopened
+
+    def test_invalid_table_name(self):
+        with pytest.raises(InterpreterError):
+            DiskStorage().open("drop table x")
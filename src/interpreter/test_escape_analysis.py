@@ -0,0 +1,52 @@
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.escape_analysis import EscapeAnalyzer
+
+
+def analyze(string) -> dict[str, set[str]]:
+    program = Parser(Filter(Lexer(Scanner(StringIO(string))))).parse_program()
+    return EscapeAnalyzer(program, Interpreter.system_methods.keys()).read_only_parameters()
+
+
+class TestEscapeAnalysis:
+    def test_reading_parameter_is_read_only(self):
+        result = analyze("int size(List<int> l) { return l.length(); } int main() { return 0; }")
+        assert result["size"] == {"l"}
+
+    def test_push_mutates_parameter(self):
+        result = analyze("void fill(List<int> l, int n) { l.push(n); } int main() { return 0; }")
+        assert result["fill"] == {"n"}
+
+    def test_index_assignment_mutates_parameter(self):
+        result = analyze("void set(Dict<string, int> d) { d[\"a\"] = 1; } int main() { return 0; }")
+        assert result["set"] == set()
+
+    def test_assignment_mutates_parameter(self):
+        result = analyze("int inc(int n) { n = n + 1; return n; } int main() { return 0; }")
+        assert result["inc"] == set()
+
+    def test_passing_to_read_only_parameter(self):
+        result = analyze("int size(List<int> l) { return l.length(); }"
+                         "int outer(List<int> l) { return size(l); } int main() { return 0; }")
+        assert result["outer"] == {"l"}
+
+    def test_passing_to_mutating_parameter(self):
+        result = analyze("void fill(List<int> l) { l.push(1); }"
+                         "void outer(List<int> l) { fill(l); } int main() { return 0; }")
+        assert result["outer"] == set()
+
+    def test_mutation_propagates_through_recursion(self):
+        result = analyze("void a(List<int> l, int n) { if (n > 0) { b(l, n - 1); } }"
+                         "void b(List<int> l, int n) { a(l, n); l.pop(); } int main() { return 0; }")
+        assert result["a"] == {"n"}
+        assert result["b"] == {"n"}
+
+    def test_passing_to_system_function(self):
+        result = analyze("void show(string s) { print(s); } int main() { return 0; }")
+        assert result["show"] == {"s"}
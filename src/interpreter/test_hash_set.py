@@ -0,0 +1,35 @@
+import copy
+
+from src.interpreter.hash_set import HashSet
+
+
+class TestHashSet:
+    def test_keeps_first_insertion_order(self):
+        values = HashSet([3, 1, 3, 2, 1])
+        values.add(1)
+        values.add(0)
+        assert list(values) == [3, 1, 2, 0]
+        assert len(values) == 4 and 2 in values and 5 not in values
+
+    def test_remove(self):
+        values = HashSet([1, 2, 3])
+        values.remove(2)
+        values.discard(7)
+        assert list(values) == [1, 3]
+
+    def test_algebra_keeps_left_order(self):
+        left, right = HashSet([4, 1, 3, 2]), HashSet([2, 5, 4])
+        assert list(left.union(right)) == [4, 1, 3, 2, 5]
+        assert list(left.intersection(right)) == [4, 2]
+        assert list(left.difference(right)) == [1, 3]
+        assert list(left) == [4, 1, 3, 2]
+
+    def test_equality_ignores_order(self):
+        assert HashSet([1, 2]) == HashSet([2, 1])
+        assert HashSet([1, 2]) == {1, 2}
+
+    def test_copy_is_independent(self):
+        values = HashSet(["a"])
+        copied = copy.copy(values)
+        copied.add("b")
+        assert list(values) == ["a"] and list(copied) == ["a", "b"]
@@ -1,4 +1,10 @@
+import contextlib
+import os
+import signal
+
 import pytest
+from array import array
+from collections.abc import Mapping
 from io import StringIO
 
 from src.scanner.position import Position
@@ -26,7 +32,13 @@ from src.interpreter.value import Value
 from src.interpreter.interpreter import Interpreter
 from src.interpreter.interpreter_error import InterpreterError, ReturnTypeError, MainNotImplementedError, \
     ExpressionTypeError, DivisionError, InitializationError, AssignmentError
+from src.interpreter.ast_walker import AstWalker
 from src.interpreter.embedded_functions import KeyFunctionDefinition
+from src.interpreter.typed_list import TypedList, typed_list
+from src.interpreter.disk_map import DiskMap
+from src.interpreter.mapped_list import MappedList
+from src.interpreter.shared_collections import SharedList, SharedDict
+from src.interpreter.partitioned_map import PartitionedMap, LocalTransport
 
 
 class MockedParser(ParserInterface):
@@ -37,14 +49,14 @@ class MockedParser(ParserInterface):
         return self.ast_tree
 
 
-def create_interpreter(string) -> Interpreter:
+def create_interpreter(string, **options) -> Interpreter:
     text = StringIO(string)
     scanner = Scanner(text)
     lexer = Lexer(scanner)
     filter = Filter(lexer)
     parser = Parser(filter)
     program = parser.parse_program()
-    interpreter = Interpreter(program)
+    interpreter = Interpreter(program, **options)
     return interpreter
 
 
@@ -99,7 +111,7 @@ class TestMockedFunctionReturn:
                                                        )})
         interpreter = create_mocked_interpreter(ast_tree)
         interpreter.interpret()
-        assert interpreter.last_result == Value(KeyValueType(Type.PAIR, Type.STRING, Type.INT), {"a": 10})
+        assert interpreter.last_result == Value(KeyValueType(Type.PAIR, Type.STRING, Type.INT), ("a", 10))
 
     def test_interpreting_dict_function(self):
         ast_tree = Program({'main': FunctionDefinition('main', KeyValueType(Type.DICT, Type.STRING, Type.INT), [],
@@ -900,7 +912,7 @@ class TestInterpretingFunction:
     def test_interpreting_pair_function(self):
         interpreter = create_interpreter("Pair<string,int> main() { return new Pair<string,int>(\"a\", 10); }")
         interpreter.interpret()
-        assert interpreter.last_result == Value(KeyValueType(Type.PAIR, Type.STRING, Type.INT), {'a': 10})
+        assert interpreter.last_result == Value(KeyValueType(Type.PAIR, Type.STRING, Type.INT), ('a', 10))
 
     def test_interpreting_dict_function(self):
         interpreter = create_interpreter(
@@ -912,3 +924,1379 @@ class TestInterpretingFunction:
         interpreter = create_interpreter("List<int> main() { return new List<int>(1,2,3,4,5); }")
         interpreter.interpret()
         assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [1, 2, 3, 4, 5])
+
+
+class TestTailCallElimination:
+    SUM = "int sum(int n, int acc) { if (n == 0) { return acc; } return sum(n - 1, acc + n); } int main() { return sum(%d, 0); }"
+
+    def test_deep_tail_recursion(self):
+        interpreter = create_interpreter(self.SUM % 5000)
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 12502500)
+        assert interpreter.execution_stack.function_contexts == []
+
+    def test_tail_call_with_wrong_number_of_arguments(self):
+        interpreter = create_interpreter("int f(int n) { if (n < 1) { return 0; } return f(n - 1, 2); } int main() { return f(3); }")
+        with pytest.raises(InterpreterError) as error:
+            interpreter.interpret()
+        assert str(error.value) == "Number of arguments and parameters doesn't match"
+
+    def test_recursion_limit_without_elimination(self):
+        program = Parser(Filter(Lexer(Scanner(StringIO(self.SUM % 5000))))).parse_program()
+        interpreter = Interpreter(program, tail_call_elimination=False)
+        with pytest.raises(InterpreterError):
+            interpreter.interpret()
+
+    def test_tail_call_from_while_loop(self):
+        interpreter = create_interpreter("int count(int n) { while (n > 0) { return count(n - 1); } return n; }"
+                                         "int main() { return count(500); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 0)
+
+    def test_locals_are_reset_between_iterations(self):
+        interpreter = create_interpreter("int f(int n) { int doubled = n * 2; if (n > 0) { return f(n - 1); }"
+                                         " return doubled; } int main() { return f(300); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 0)
+
+    def test_tail_call_argument_type_error(self):
+        interpreter = create_interpreter("int f(int n) { if (n > 0) { return f(\"a\"); } return n; } int main() { return f(1); }")
+        with pytest.raises(ExpressionTypeError):
+            interpreter.interpret()
+
+    def test_non_tail_recursion_is_not_rewritten(self):
+        from src.interpreter.tail_call_analysis import find_tail_calls
+        program = Parser(Filter(Lexer(Scanner(StringIO(
+            "int f(int n) { if (n < 1) { return 0; } return f(n - 1) + 1; } int main() { return f(3); }"))))).parse_program()
+        assert find_tail_calls(program) == {}
+
+
+class TestValueSemantics:
+    def test_scalar_argument_is_passed_by_value(self):
+        interpreter = create_interpreter("void addOne(int number) { number = number + 1; }"
+                                         "int main() { int number = 3; addOne(number); return number; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 3)
+
+    def test_scalar_initialization_copies(self):
+        interpreter = create_interpreter("int main() { int a = 1; int b = a; b = 10; return a; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 1)
+
+    def test_list_argument_is_passed_by_value(self):
+        interpreter = create_interpreter("void fill(List<int> l) { l.push(5); l[0] = 9; }"
+                                         "List<int> main() { List<int> a = new List<int>(1, 2); fill(a); return a; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [1, 2])
+        assert interpreter.copy_count == 1
+
+    def test_list_assignment_is_copy_on_write(self):
+        interpreter = create_interpreter("List<int> main() { List<int> a = new List<int>(1, 2); List<int> b = a;"
+                                         " b.push(3); b.push(4); a.push(5); return a; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [1, 2, 5])
+        assert interpreter.copy_count == 1
+
+    def test_read_only_sharing_does_not_copy(self):
+        interpreter = create_interpreter("int size(List<int> l) { return l.length(); }"
+                                         "int main() { List<int> a = new List<int>(1, 2); List<int> b = a;"
+                                         " int n = size(a) + size(b); a.push(n); return a.length(); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 3)
+        assert interpreter.copy_count == 1
+
+    def test_callee_release_avoids_copy(self):
+        interpreter = create_interpreter("int size(List<int> l) { return l.length(); }"
+                                         "int main() { List<int> a = new List<int>(1); size(a); a.push(2);"
+                                         " return a.length(); }", memoize=False)
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 2)
+        assert interpreter.copy_count == 0
+
+    def test_dict_is_copy_on_write(self):
+        interpreter = create_interpreter("Dict<string,int> main() { Dict<string,int> a = new Dict<string,int>("
+                                         "new Pair<string,int>(\"a\", 1)); Dict<string,int> b = a; b[\"a\"] = 2;"
+                                         " b.add(new Pair<string,int>(\"b\", 3)); b.remove(\"a\"); return a; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(KeyValueType(Type.DICT, Type.STRING, Type.INT), {"a": 1})
+        assert interpreter.copy_count == 1
+
+    def test_returned_parameter_is_shared(self):
+        interpreter = create_interpreter("List<int> same(List<int> l) { return l; }"
+                                         "List<int> main() { List<int> a = new List<int>(1); List<int> b = same(a);"
+                                         " b.pop(); return a; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [1])
+        assert interpreter.copy_count == 1
+
+    def test_nested_list_element_is_copied(self):
+        interpreter = create_interpreter("void grow(List<int> t) { t.push(9); }"
+                                         "int main() { List<List<int>> l = new List<List<int>>(new List<int>(1));"
+                                         " List<int> t = l[0]; t.push(9); grow(l[0]); l.forEach(grow());"
+                                         " return l[0].length(); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 1)
+
+    def test_nested_list_changed_in_place(self):
+        interpreter = create_interpreter("int main() { List<List<int>> l = new List<List<int>>(new List<int>(1));"
+                                         " l[0].push(9); return l[0].length(); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 2)
+
+    @pytest.mark.parametrize("body, expected", [
+        ("List<List<int>> mm = ll; ll[0].push(7); return mm[0].length() * 10 + ll[0].length();", 12),
+        ("grow(ll); return ll[0].length();", 1),
+        ("List<int> a = new List<int>(1); ll.push(a); ll[1].push(5); ll[1].push(6); a.push(2);"
+         " return a.length() * 10 + ll[1].length();", 23),
+        ("List<int> a = new List<int>(1); List<List<int>> c = new List<List<int>>(a); ll[0] = a; a.push(2);"
+         " c[0].push(3); ll[0].push(4); return a.length() * 100 + c[0].length() * 10 + ll[0].length();", 222),
+        ("List<int> f = ll.first(filled()); ll[0].push(2); return f.length() * 10 + ll[0].length();", 12),
+        ("List<int> t = ll[0]; ll[0].push(2); t.push(3); t.push(4); return t.length() * 10 + ll[0].length();", 32),
+    ])
+    def test_nested_list_is_copy_on_write(self, body, expected):
+        interpreter = create_interpreter("void grow(List<List<int>> x) { x[0].push(1); }"
+                                         "bool filled(List<int> l) { return l.length() > 0; }"
+                                         "int main() { List<List<int>> ll = new List<List<int>>(new List<int>(1));"
+                                         + body + " }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), expected)
+
+    @pytest.mark.parametrize("body, expected", [
+        ("Dict<string, List<int>> e = d; d[\"x\"].push(9); return e[\"x\"].length() * 10 + d[\"x\"].length();", 12),
+        ("List<List<int>> v = d.values(); d[\"x\"].push(9); return v[0].length() * 10 + d[\"x\"].length();", 12),
+        ("List<int> a = new List<int>(); d[\"y\"] = a; d[\"y\"].push(1); return a.length() * 10 + d[\"y\"].length();", 1),
+    ])
+    def test_nested_dict_value_is_copy_on_write(self, body, expected):
+        interpreter = create_interpreter("int main() { Dict<string, List<int>> d = new Dict<string, List<int>>("
+                                         "new Pair<string, List<int>>(\"x\", new List<int>(1)));" + body + " }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), expected)
+
+    def test_nested_element_is_copied_once(self):
+        interpreter = create_interpreter("int main() { List<List<int>> ll = new List<List<int>>(new List<int>(1));"
+                                         " List<List<int>> mm = ll; int i = 0;"
+                                         " while (i < 5) { ll[0].push(i); i = i + 1; } return ll[0].length(); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 6)
+        assert interpreter.copy_count == 2
+
+    def test_index_assignment(self):
+        interpreter = create_interpreter("List<int> main() { List<int> a = new List<int>(1, 2); a[1] = 7; return a; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [1, 7])
+
+    def test_index_assignment_type_error(self):
+        interpreter = create_interpreter("List<int> main() { List<int> a = new List<int>(1, 2); a[1] = \"x\"; return a; }")
+        with pytest.raises(AssignmentError):
+            interpreter.interpret()
+
+
+class TestEscapeAnalysisBinding:
+    def test_read_only_argument_is_not_shared(self):
+        interpreter = create_interpreter("int size(List<int> l) { return l.length(); }"
+                                         "int main() { List<int> a = new List<int>(1, 2); int n = size(a);"
+                                         " a.push(n); return a.length(); }", memoize=False)
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 3)
+        assert interpreter.read_only_parameters["size"] == {"l"}
+        assert interpreter.copy_count == 0
+
+    def test_read_only_argument_keeps_single_owner(self):
+        interpreter = create_interpreter("int size(List<int> l) { return l.length(); }"
+                                         "int main() { List<int> a = new List<int>(1); return size(a); }",
+                                         memoize=False)
+        owners = []
+        visit_length_function = interpreter.visit_length_function
+
+        def record_owners(element):
+            variable = interpreter.execution_stack.function_contexts[-2].find_variable("l")
+            owners.append((variable.borrowed, variable.value.shared))
+            visit_length_function(element)
+
+        interpreter.visit_length_function = record_owners
+        interpreter.interpret()
+        assert owners == [(True, False)]
+
+    def test_mutated_argument_is_copied(self):
+        interpreter = create_interpreter("void fill(List<int> l) { l.push(5); }"
+                                         "List<int> main() { List<int> a = new List<int>(1); fill(a); return a; }",
+                                         memoize=False)
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [1])
+        assert interpreter.copy_count == 1
+
+    def test_alias_of_read_only_argument_is_copied(self):
+        interpreter = create_interpreter("int grow(List<int> l) { List<int> b = l; b.push(1); return b.length(); }"
+                                         "List<int> main() { List<int> a = new List<int>(1); grow(a); return a; }",
+                                         memoize=False)
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [1])
+        assert interpreter.read_only_parameters["grow"] == {"l"}
+
+    def test_disabled_escape_analysis_shares_argument(self):
+        interpreter = create_interpreter("int size(List<int> l) { return l.length(); }"
+                                         "int main() { return size(new List<int>(1)); }", escape_analysis=False)
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 1)
+        assert interpreter.read_only_parameters == {}
+
+    def test_dump_analysis(self):
+        interpreter = create_interpreter("int size(List<int> l) { return l.length(); }"
+                                         "void fill(List<int> l) { l.push(1); }"
+                                         "int main() { return 0; }")
+        dump = interpreter.dump_analysis().split("\n")
+        assert dump[0] == "size: memoized: yes, tail calls: 0, read-only parameters: l"
+        assert dump[1] == "fill: memoized: no, tail calls: 0, read-only parameters: -"
+
+
+class TestFramePooling:
+    def test_recursive_calls_reuse_frames(self):
+        interpreter = create_interpreter("int down(int n) { if (n > 0) { return down(n - 1); } return n; }"
+                                         "int main() { int a = down(5); int b = down(5); return a + b; }",
+                                         memoize=False, tail_call_elimination=False)
+        interpreter.interpret()
+        statistics = interpreter.frame_statistics()
+        assert statistics["calls"] == 13
+        assert statistics["allocated_contexts"] == 7
+        assert statistics["allocated_blocks"] == 7
+
+    def test_block_without_declarations_has_no_scope(self):
+        interpreter = create_interpreter("int main() { int i = 0; while (i < 50) { i = i + 1; } return i; }")
+        interpreter.interpret()
+        statistics = interpreter.frame_statistics()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 50)
+        assert statistics["loop_iterations"] == 50
+        assert statistics["scopes"] == 1
+
+    def test_loop_scope_is_recycled(self):
+        interpreter = create_interpreter("int main() { int i = 0; while (i < 50) { int j = i; i = j + 1; } return i; }")
+        interpreter.interpret()
+        statistics = interpreter.frame_statistics()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 50)
+        assert statistics["scopes"] == 51
+        assert statistics["allocated_blocks"] == 2
+
+    def test_loop_variables_do_not_leak_between_iterations(self):
+        interpreter = create_interpreter("int main() { int i = 0; while (i < 3) { int j = 1; i = i + j; }"
+                                         " return i; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 3)
+
+    def test_long_loop(self):
+        interpreter = create_interpreter("int main() { int i = 0; while (i < 5000) { i = i + 1; } return i; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 5000)
+
+    def test_loop_iteration_limit(self):
+        interpreter = create_interpreter("int main() { while (true) { } return 0; }", max_loop_iterations=10)
+        with pytest.raises(InterpreterError):
+            interpreter.interpret()
+
+    def test_memoized_call_releases_arguments(self):
+        interpreter = create_interpreter("int size(List<int> l) { return l.length(); }"
+                                         "int main() { List<int> a = new List<int>(1); size(a); size(a); a.push(2);"
+                                         " return a.length(); }", escape_analysis=False)
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 2)
+        assert interpreter.copy_count == 0
+
+
+LINQ_FUNCTIONS = ("int twice(int n) { return n * 2; }"
+                  "bool big(int n) { return n > 4; }"
+                  "int descending(int n) { return -n; }")
+
+
+class TestLinqCallbacks:
+    def test_chained_operators(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(1, 2, 3, 4);"
+                                         " return l.select(twice()).where(big()).orderBy(descending()); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [8, 6])
+
+    def test_callback_call_is_not_mutated(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(1, 2, 3);"
+                                         " return l.select(twice()); }")
+        callbacks = []
+
+        class CallbackCollector(AstWalker):
+            def visit_function_call_expression(self, element):
+                if element.id == "twice":
+                    callbacks.append(element)
+
+        interpreter.interpret()
+        interpreter._program.accept(CallbackCollector())
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [2, 4, 6])
+        assert [callback.arguments for callback in callbacks] == [[]]
+
+    def test_callback_frames_are_reused(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(1, 2, 3, 4);"
+                                         " return l.where(big()); }")
+        interpreter.interpret()
+        assert interpreter.frame_statistics()["allocated_contexts"] <= 3
+
+    def test_callback_using_linq(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "int count(int n) { List<int> l = new List<int>(n, 5);"
+                                         " return l.where(big()).length(); }"
+                                         "List<int> main() { List<int> l = new List<int>(1, 7); return l.select(count()); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [1, 2])
+
+    def test_dict_where(self):
+        interpreter = create_interpreter("bool positive(Pair<string, int> p) { return p.value() > 0; }"
+                                         "Dict<string, int> main() { Pair<string, int> a = new Pair<string, int>(\"a\", 1);"
+                                         " Pair<string, int> b = new Pair<string, int>(\"b\", -1);"
+                                         " Dict<string, int> d = new Dict<string, int>(a, b); return d.where(positive()); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(KeyValueType(Type.DICT, Type.STRING, Type.INT), {"a": 1})
+
+    def test_dict_order_by(self):
+        interpreter = create_interpreter("int byValue(Pair<string, int> p) { return p.value(); }"
+                                         "Dict<string, int> main() { Pair<string, int> a = new Pair<string, int>(\"a\", 2);"
+                                         " Pair<string, int> b = new Pair<string, int>(\"b\", 1);"
+                                         " Dict<string, int> d = new Dict<string, int>(a, b); return d.orderBy(byValue()); }")
+        interpreter.interpret()
+        assert list(interpreter.last_result.value.items()) == [("b", 1), ("a", 2)]
+
+    def test_system_function_callback(self, capsys):
+        interpreter = create_interpreter("int main() { List<string> l = new List<string>(\"x\", \"y\");"
+                                         " l.forEach(print()); return 0; }")
+        interpreter.interpret()
+        assert capsys.readouterr().out.startswith("x\ny\n")
+
+    def test_callback_with_wrong_parameter_type(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "int main() { List<string> l = new List<string>(\"x\");"
+                                         " l.select(twice()); return 0; }")
+        with pytest.raises(ExpressionTypeError):
+            interpreter.interpret()
+
+    def test_callback_with_too_many_parameters(self):
+        interpreter = create_interpreter("int add(int a, int b) { return a + b; }"
+                                         "int main() { List<int> l = new List<int>(1); l.select(add()); return 0; }")
+        with pytest.raises(InterpreterError):
+            interpreter.interpret()
+
+    @pytest.mark.parametrize("call", ["l.select(average());", "l.average();"])
+    def test_missing_function_error_message(self, call):
+        interpreter = create_interpreter("int main() { List<int> l = new List<int>(1); " + call + " return 0; }")
+        with pytest.raises(InterpreterError) as error:
+            interpreter.interpret()
+        assert str(error.value) == "There is no function with id: average"
+
+
+NOISY_FUNCTIONS = ("int noisy(int n) { print(\"s\" + (string) n); return n; }"
+                   "bool loud(int n) { print(\"w\" + (string) n); return n > 1; }")
+
+
+class TestLazyLinq:
+    def test_stages_are_fused(self, capsys):
+        interpreter = create_interpreter(NOISY_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(1, 2);"
+                                         " return l.select(noisy()).where(loud()); }")
+        interpreter.interpret()
+        assert capsys.readouterr().out.split("\n")[:4] == ["s1", "w1", "s2", "w2"]
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [2])
+
+    def test_eager_stages(self, capsys):
+        interpreter = create_interpreter(NOISY_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(1, 2);"
+                                         " return l.select(noisy()).where(loud()); }", lazy_linq=False)
+        interpreter.interpret()
+        assert capsys.readouterr().out.split("\n")[:4] == ["s1", "s2", "w1", "w2"]
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [2])
+
+    def test_query_is_materialized_by_method_call(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "int main() { List<int> l = new List<int>(1, 2, 3);"
+                                         " return l.select(twice()).where(big()).length(); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 1)
+
+    def test_query_statement_runs_callbacks(self, capsys):
+        interpreter = create_interpreter(NOISY_FUNCTIONS + "int main() { List<int> l = new List<int>(1);"
+                                         " l.where(loud()); return 0; }")
+        interpreter.interpret()
+        assert capsys.readouterr().out.startswith("w1\n")
+
+    def test_query_passed_as_argument(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "int size(List<int> l) { return l.length(); }"
+                                         "int main() { List<int> l = new List<int>(1, 2, 3);"
+                                         " return size(l.where(big())) + size(l.select(twice())); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 3)
+
+    def test_source_is_not_copied(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "int main() { List<int> l = new List<int>(1, 2, 3);"
+                                         " List<int> r = l.select(twice()); l.push(4); return r.length(); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 3)
+        assert interpreter.copy_count == 0
+
+    def test_select_pairs_into_dict(self):
+        interpreter = create_interpreter("Pair<int, int> square(int n) { return new Pair<int, int>(n, n * n); }"
+                                         "Dict<int, int> main() { List<int> l = new List<int>(1, 2);"
+                                         " return l.select(square()); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(KeyValueType(Type.DICT, Type.INT, Type.INT), {1: 1, 2: 4})
+
+    def test_dict_query_streams_entries(self, capsys):
+        interpreter = create_interpreter("bool odd(Pair<int, string> p) { print(p.value()); return p.key() != 2; }"
+                                         "int byKey(Pair<int, string> p) { return -p.key(); }"
+                                         "Dict<int, string> main() { Dict<int, string> d = new Dict<int, string>("
+                                         " new Pair<int, string>(1, \"a\"), new Pair<int, string>(2, \"b\"),"
+                                         " new Pair<int, string>(3, \"c\")); d.any(odd());"
+                                         " return d.where(odd()).orderBy(byKey()); }")
+        interpreter.interpret()
+        assert capsys.readouterr().out.split("\n")[:4] == ["a", "a", "b", "c"]
+        assert interpreter.last_result == Value(KeyValueType(Type.DICT, Type.INT, Type.STRING), {3: "c", 1: "a"})
+        assert list(interpreter.last_result.value) == [3, 1]
+
+
+PLANNER_FUNCTIONS = LINQ_FUNCTIONS + ("bool small(int n) { return n < 8; }"
+                                      "int byValue(Pair<string, int> p) { return p.value(); }"
+                                      "bool positive(Pair<string, int> p) { return p.value() > 0; }")
+PLANNER_QUERIES = [
+    "l.orderBy(descending()).where(big())",
+    "l.where(big()).where(small())",
+    "l.select(twice()).orderBy(descending()).where(big()).take(3)",
+    "l.orderBy(descending()).take(4)",
+    "l.take(5).take(2).orderBy(descending())",
+    "l.orderBy(twice()).take(0)",
+    "l.where(small()).orderBy(descending()).where(big()).take(100)",
+]
+
+
+class TestQueryPlanning:
+    @pytest.mark.parametrize("query", PLANNER_QUERIES)
+    def test_optimized_plan_gives_same_result(self, query):
+        program = (PLANNER_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(5, 3, 9, 1, 7, 2, 8, 2);"
+                   f" return {query}; }}")
+        optimized = create_interpreter(program)
+        optimized.interpret()
+        unoptimized = create_interpreter(program, optimize_queries=False)
+        unoptimized.interpret()
+        assert optimized.last_result == unoptimized.last_result
+
+    def test_dict_plan_gives_same_result(self):
+        program = (PLANNER_FUNCTIONS + "Dict<string, int> main() { Pair<string, int> a = new Pair<string, int>(\"a\", 2);"
+                   " Pair<string, int> b = new Pair<string, int>(\"b\", -1);"
+                   " Pair<string, int> c = new Pair<string, int>(\"c\", 1);"
+                   " Dict<string, int> d = new Dict<string, int>(a, b, c);"
+                   " return d.orderBy(byValue()).where(positive()).take(1); }")
+        optimized = create_interpreter(program)
+        optimized.interpret()
+        unoptimized = create_interpreter(program, optimize_queries=False)
+        unoptimized.interpret()
+        assert optimized.last_result == Value(KeyValueType(Type.DICT, Type.STRING, Type.INT), {"c": 1})
+        assert unoptimized.last_result == optimized.last_result
+
+    def test_top_k(self):
+        interpreter = create_interpreter(PLANNER_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(5, 3, 9, 1, 7);"
+                                         " return l.orderBy(descending()).take(2); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [9, 7])
+
+    def test_order_by_is_stable(self):
+        interpreter = create_interpreter("bool low(int n) { return n < 3; }"
+                                         "List<int> main() { List<int> l = new List<int>(4, 1, 3, 2);"
+                                         " return l.orderBy(low()); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [4, 3, 1, 2])
+
+    def test_sort_key_is_computed_once_per_element(self, capsys):
+        interpreter = create_interpreter("int loudKey(int n) { print(\"k\"); return -n; }"
+                                         "List<int> main() { List<int> l = new List<int>(1, 2, 3, 4, 5);"
+                                         " return l.orderBy(loudKey()); }")
+        interpreter.interpret()
+        assert capsys.readouterr().out.count("k\n") == 5
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [5, 4, 3, 2, 1])
+
+    def test_pushed_down_where_sorts_fewer_elements(self):
+        program = (PLANNER_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(1, 2, 3, 4, 5, 6);"
+                   " return l.orderBy(descending()).where(big()); }")
+        optimized = create_interpreter(program, memoize=False)
+        optimized.interpret()
+        unoptimized = create_interpreter(program, memoize=False, optimize_queries=False)
+        unoptimized.interpret()
+        assert optimized.frame_statistics()["calls"] == unoptimized.frame_statistics()["calls"] - 4
+
+    def test_negative_take(self):
+        interpreter = create_interpreter("int main() { List<int> l = new List<int>(1); l.take(-1); return 0; }")
+        with pytest.raises(InterpreterError):
+            interpreter.interpret()
+
+
+class TestExplain:
+    def test_explain_shows_optimized_plan(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(1, 2, 3);"
+                                         " return l.orderBy(descending()).where(big()).take(1); }", explain_queries=True)
+        interpreter.interpret()
+        assert interpreter.explain().split("\n") == [
+            "Query at line 1, column 170:",
+            "  plan: where(big) -> topK(descending, 1)",
+            "  written: orderBy(descending) -> where(big) -> take(1)"]
+
+    def test_explain_is_off_by_default(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(1, 2, 3);"
+                                         " return l.where(big()); }")
+        interpreter.interpret()
+        assert interpreter.query_profiles == []
+        assert interpreter.explain() == ""
+
+    def test_analyze_counts_rows_and_calls(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(1, 2, 3, 4);"
+                                         " return l.select(twice()).where(big()).orderBy(descending()); }",
+                                         analyze_queries=True)
+        interpreter.interpret()
+        profile, = interpreter.query_profiles
+        assert [(statistics.input_rows, statistics.output_rows, statistics.calls)
+                for statistics in profile.statistics] == [(4, 4, 4), (4, 2, 4), (2, 2, 2)]
+        assert profile.source_rows == 4
+        assert profile.peak_size == 2
+        assert all(statistics.time >= 0 for statistics in profile.statistics)
+
+    def test_analyze_take_reads_only_needed_rows(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(1, 2, 3, 4);"
+                                         " return l.select(twice()).take(2); }", analyze_queries=True)
+        interpreter.interpret()
+        profile, = interpreter.query_profiles
+        assert [(statistics.input_rows, statistics.output_rows, statistics.calls)
+                for statistics in profile.statistics] == [(2, 2, 2), (2, 2, 0)]
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [2, 4])
+
+    def test_analyze_sums_executions(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "int count(List<int> l) { return l.where(big()).length(); }"
+                                         "int main() { List<int> l = new List<int>(4, 5, 6);"
+                                         " return count(l) + count(l); }", analyze_queries=True, memoize=False)
+        interpreter.interpret()
+        profile, = interpreter.query_profiles
+        assert profile.executions == 2
+        assert (profile.statistics[0].input_rows, profile.statistics[0].output_rows) == (6, 4)
+        assert "executions: 2, source rows: 6, peak intermediate size: 2" in interpreter.explain()
+
+    def test_analyze_for_each(self, capsys):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "int main() { List<string> l = new List<string>(\"a\", \"b\");"
+                                         " l.forEach(print()); return 0; }", analyze_queries=True)
+        interpreter.interpret()
+        profile, = interpreter.query_profiles
+        assert [str(stage) for stage in profile.plan] == ["forEach(print)"]
+        assert profile.statistics[0].calls == 2
+        assert profile.peak_size == 0
+
+
+PARALLEL_PROGRAM = LINQ_FUNCTIONS + ("int noisy(int n) { print(\"n\"); return n; }"
+                                     "List<int> query(List<int> l) { return l.select(twice()).where(big()).orderBy(descending()); }"
+                                     "List<int> top(List<int> l) { return l.orderBy(descending()).take(3); }"
+                                     "List<int> loud(List<int> l) { return l.select(noisy()); }"
+                                     "int main() { return 0; }")
+
+
+class TestParallelLinq:
+    def run(self, function, values, **options):
+        interpreter = create_interpreter(PARALLEL_PROGRAM, memoize=False, **options)
+        try:
+            return interpreter, interpreter.call_function(function, [Value(ElementType(Type.LIST, Type.INT), values)])
+        finally:
+            interpreter.close()
+
+    def test_parallel_result_matches_sequential(self):
+        values = [(index * 7) % 50 for index in range(200)]
+        parallel, parallel_result = self.run("query", values, parallel_workers=2, parallel_threshold=10)
+        sequential, sequential_result = self.run("query", values)
+        assert parallel_result == sequential_result
+        assert parallel.parallel_runs == 2
+
+    def test_parallel_top_k(self):
+        values = [(index * 7) % 50 for index in range(200)]
+        parallel, parallel_result = self.run("top", values, parallel_workers=2, parallel_threshold=10)
+        assert parallel_result == Value(ElementType(Type.LIST, Type.INT), [49, 49, 49])
+
+    def test_call_function_errors(self):
+        interpreter = create_interpreter(PARALLEL_PROGRAM)
+        with pytest.raises(InterpreterError) as error:
+            interpreter.call_function("missing", [])
+        assert str(error.value) == "There is no function with id: missing"
+        with pytest.raises(InterpreterError) as error:
+            interpreter.call_function("query", [])
+        assert str(error.value) == "Number of arguments and parameters doesn't match"
+
+    def test_failing_chunk_keeps_shared_list_until_workers_finish(self, capfd):
+        interpreter = create_interpreter(PARALLEL_PROGRAM + "int inverse(int n) { return (int) (100000 / n); }"
+                                         "List<int> divided(List<int> l) { return l.select(inverse()); }",
+                                         memoize=False, parallel_workers=2, parallel_threshold=10)
+        try:
+            for _ in range(2):
+                values = typed_list(Type.INT, [0, *range(1, 100000)])
+                with pytest.raises(DivisionError):
+                    interpreter.call_function("divided", [Value(ElementType(Type.LIST, Type.INT), values)])
+            values = typed_list(Type.INT, range(1, 1001))
+            result = interpreter.call_function("divided", [Value(ElementType(Type.LIST, Type.INT), values)])
+        finally:
+            interpreter.close()
+        assert list(result.value) == [100000 // n for n in range(1, 1001)]
+        assert "no longer exists" not in capfd.readouterr().err
+
+    def test_small_input_runs_sequentially(self):
+        parallel, result = self.run("query", [1, 2, 3], parallel_workers=2, parallel_threshold=10)
+        assert result == Value(ElementType(Type.LIST, Type.INT), [6])
+        assert parallel.parallel_runs == 0
+
+    def test_impure_callback_runs_sequentially(self, capsys):
+        parallel, result = self.run("loud", list(range(20)), parallel_workers=2, parallel_threshold=10)
+        assert capsys.readouterr().out.count("n\n") == 20
+        assert parallel.parallel_runs == 0
+
+    @pytest.mark.parametrize("threshold, runs, reads", [(1000, 0, 3), (10, 1, 100)])
+    def test_dict_source_is_copied_only_for_parallel_runs(self, threshold, runs, reads):
+        entries = CountingMapping({index: index for index in range(100)})
+        interpreter = create_interpreter("bool big(Pair<int, int> p) { return p.value() > 1; }"
+                                         "bool query(Dict<int, int> d) { return d.where(big()).any(big()); }"
+                                         "int main() { return 0; }", parallel_workers=2, parallel_threshold=threshold)
+        try:
+            result = interpreter.call_function("query", [Value(KeyValueType(Type.DICT, Type.INT, Type.INT), entries)])
+        finally:
+            interpreter.close()
+        assert result == Value(BaseType(Type.BOOL), True)
+        assert interpreter.parallel_runs == runs and entries.reads == reads
+
+
+class CountingMapping(Mapping):
+    def __init__(self, entries: dict):
+        self._entries = entries
+        self.reads = 0
+
+    def __getitem__(self, key):
+        self.reads += 1
+        return self._entries[key]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+GROUPING_FUNCTIONS = LINQ_FUNCTIONS + ("int self(int n) { return n; }"
+                                       "int owner(Pair<int, string> p) { return p.key(); }"
+                                       "string label(int n, Pair<int, string> p) { return p.value() + (string) n; }"
+                                       "Pair<int, string> entry(int n, Pair<int, string> p) {"
+                                       " return new Pair<int, string>(n, p.value()); }"
+                                       "List<int> wrap(int n) { return new List<int>(n); }"
+                                       "string name(int n) { return (string) n; }")
+NAMES = ("Dict<int, string> names = new Dict<int, string>(new Pair<int, string>(1, \"a\"),"
+         " new Pair<int, string>(3, \"c\"), new Pair<int, string>(5, \"e\"));")
+
+
+class TestGroupByAndJoin:
+    def test_group_by(self):
+        interpreter = create_interpreter(GROUPING_FUNCTIONS + "Dict<bool, List<int>> main() {"
+                                         " List<int> l = new List<int>(5, 1, 7, 2); return l.groupBy(big()); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(KeyValueType(Type.DICT, Type.BOOL, ElementType(Type.LIST, Type.INT)),
+                                                {True: [5, 7], False: [1, 2]})
+
+    def test_group_is_copied_on_assignment(self):
+        interpreter = create_interpreter(GROUPING_FUNCTIONS + "int main() { List<int> l = new List<int>(5, 1, 7, 2);"
+                                         " Dict<bool, List<int>> g = l.groupBy(big()); List<int> t = g[true];"
+                                         " t.push(9); t.push(9); Pair<bool, List<int>> p = new Pair<bool, List<int>>(true, g[true]);"
+                                         " List<int> u = p.value(); u.pop(); return g[true].length() * 10 + t.length(); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 24)
+
+    def test_group_by_after_where(self):
+        interpreter = create_interpreter(GROUPING_FUNCTIONS + "int main() { List<int> l = new List<int>(1, 2, 3, 4, 5, 6);"
+                                         " Dict<bool, List<int>> groups = l.select(twice()).groupBy(big());"
+                                         " return groups[true].length() + groups[false].length() * 10; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 24)
+
+    def test_group_by_dict(self):
+        interpreter = create_interpreter(GROUPING_FUNCTIONS + "string main() {" + NAMES +
+                                         " Dict<int, List<Pair<int, string>>> groups = names.groupBy(owner());"
+                                         " List<Pair<int, string>> group = groups[3]; Pair<int, string> pair = group[0];"
+                                         " return pair.value(); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.STRING), "c")
+
+    def test_group_by_key_must_be_simple_type(self):
+        interpreter = create_interpreter(GROUPING_FUNCTIONS + "void main() { List<int> l = new List<int>(1, 2);"
+                                         " l.groupBy(wrap()); }")
+        with pytest.raises(InterpreterError):
+            interpreter.interpret()
+
+    def test_join(self):
+        interpreter = create_interpreter(GROUPING_FUNCTIONS + "List<string> main() {" + NAMES +
+                                         " List<int> l = new List<int>(5, 1, 2, 1); return l.join(names, self(), owner(), label()); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.STRING), ["e5", "a1", "a1"])
+
+    def test_join_to_dict(self):
+        interpreter = create_interpreter(GROUPING_FUNCTIONS + "Dict<int, string> main() {" + NAMES +
+                                         " List<int> l = new List<int>(1, 2, 3); return l.select(twice()).join(names, self(), owner(), entry()); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(KeyValueType(Type.DICT, Type.INT, Type.STRING), {})
+
+    def test_join_sees_other_as_of_call(self):
+        interpreter = create_interpreter(GROUPING_FUNCTIONS + "List<string> main() {" + NAMES +
+                                         " List<int> l = new List<int>(1, 3); List<string> r = l.join(names, self(), owner(), label());"
+                                         " names.remove(3); return r; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.STRING), ["a1", "c3"])
+
+    def test_join_key_types_must_match(self):
+        interpreter = create_interpreter(GROUPING_FUNCTIONS + "void main() {" + NAMES +
+                                         " List<int> l = new List<int>(1); l.join(names, name(), owner(), label()); }")
+        with pytest.raises(ExpressionTypeError):
+            interpreter.interpret()
+
+    def test_join_result_takes_both_elements(self):
+        interpreter = create_interpreter(GROUPING_FUNCTIONS + "void main() {" + NAMES +
+                                         " List<int> l = new List<int>(1); l.join(names, self(), owner(), twice()); }")
+        with pytest.raises(InterpreterError, match="exactly 2 parameters"):
+            interpreter.interpret()
+
+    def test_explain_join(self):
+        interpreter = create_interpreter(GROUPING_FUNCTIONS + "void main() {" + NAMES +
+                                         " List<int> l = new List<int>(1, 3); l.join(names, self(), owner(), label()).take(1); }",
+                                         explain_queries=True)
+        interpreter.interpret()
+        assert "plan: join(self, owner, label) -> take(1)" in interpreter.explain()
+
+
+class TestAggregates:
+    def run(self, body: str, **options):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + NOISY_FUNCTIONS + body, **options)
+        interpreter.interpret()
+        return interpreter.last_result
+
+    def test_sum(self):
+        result = self.run("int main() { List<int> l = new List<int>(1, 2, 3); return l.select(twice()).sum(); }")
+        assert result == Value(BaseType(Type.INT), 12)
+
+    def test_sum_of_empty_float_list(self):
+        result = self.run("float main() { List<float> l = new List<float>(); return l.sum(); }")
+        assert result == Value(BaseType(Type.FLOAT), 0.0)
+
+    def test_sum_of_strings_error(self):
+        with pytest.raises(InterpreterError):
+            self.run("string main() { List<string> l = new List<string>(\"a\"); return l.sum(); }")
+
+    def test_min_and_max(self):
+        result = self.run("int main() { List<int> l = new List<int>(4, 1, 7, 3); return l.max() * 10 + l.min(); }")
+        assert result == Value(BaseType(Type.INT), 71)
+
+    def test_max_of_strings(self):
+        result = self.run("string main() { List<string> l = new List<string>(\"b\", \"c\", \"a\"); return l.max(); }")
+        assert result == Value(BaseType(Type.STRING), "c")
+
+    def test_min_of_empty_list_error(self):
+        with pytest.raises(InterpreterError):
+            self.run("int main() { List<int> l = new List<int>(1, 2); return l.where(big()).min(); }")
+
+    @pytest.mark.parametrize("body, expected", [
+        ("return l.sum(twice());", 30),
+        ("return l.where(big()).sum(twice());", 14),
+        ("return l.min(descending()) * 100 + l.max(descending());", -701),
+        ("return l.select(twice()).max(descending());", -2),
+        ("Dict<int, int> d = new Dict<int, int>(new Pair<int, int>(1, 5), new Pair<int, int>(2, 9));"
+         " return d.sum(product()) + d.max(product());", 41),
+    ])
+    def test_aggregate_with_selector(self, body, expected):
+        result = self.run("int product(Pair<int, int> p) { return p.key() * p.value(); }"
+                          "int main() { List<int> l = new List<int>(4, 1, 7, 3); " + body + " }")
+        assert result == Value(BaseType(Type.INT), expected)
+
+    def test_selector_runs_in_one_pass(self, capsys):
+        result = self.run("int main() { List<int> l = new List<int>(1, 2, 3); return l.where(loud()).sum(noisy()); }")
+        assert result == Value(BaseType(Type.INT), 5)
+        assert capsys.readouterr().out.split("\n")[:5] == ["w1", "w2", "s2", "w3", "s3"]
+
+    def test_selector_of_wrong_type_error(self):
+        with pytest.raises(InterpreterError):
+            self.run("int main() { List<int> l = new List<int>(1, 2); return l.sum(big()); }")
+
+    def test_count(self):
+        result = self.run("int main() { List<int> l = new List<int>(1, 2, 3, 4); return l.select(twice()).count(big()); }")
+        assert result == Value(BaseType(Type.INT), 2)
+
+    def test_any_stops_at_first_match(self, capsys):
+        result = self.run("bool main() { List<int> l = new List<int>(1, 2, 3, 4); return l.select(noisy()).any(loud()); }")
+        assert result == Value(BaseType(Type.BOOL), True)
+        assert capsys.readouterr().out.split("\n")[:4] == ["s1", "w1", "s2", "w2"]
+
+    def test_all_stops_at_first_failure(self, capsys):
+        result = self.run("bool main() { List<int> l = new List<int>(1, 2, 3); return l.all(loud()); }")
+        assert result == Value(BaseType(Type.BOOL), False)
+        assert capsys.readouterr().out.startswith("w1\nProgram")
+
+    def test_first(self):
+        result = self.run("int main() { List<int> l = new List<int>(1, 5, 7); return l.orderBy(descending()).first(big()); }")
+        assert result == Value(BaseType(Type.INT), 7)
+
+    def test_first_without_match_error(self):
+        with pytest.raises(InterpreterError):
+            self.run("int main() { List<int> l = new List<int>(1, 2); return l.first(big()); }")
+
+    def test_predicate_must_return_bool(self):
+        with pytest.raises(InterpreterError, match="must return bool"):
+            self.run("int main() { List<int> l = new List<int>(1, 2); return l.count(twice()); }")
+
+    def test_where_callback_must_return_bool(self):
+        with pytest.raises(InterpreterError, match="must return bool"):
+            self.run("int main() { List<int> l = new List<int>(1, 2); List<int> w = l.where(twice()); return w.length(); }")
+
+    def test_count_dict_pairs(self):
+        result = self.run("bool even(Pair<string, int> p) { return p.value() == 2; }"
+                          "int main() { Dict<string, int> d = new Dict<string, int>(new Pair<string, int>(\"a\", 2),"
+                          " new Pair<string, int>(\"b\", 3)); return d.count(even()); }")
+        assert result == Value(BaseType(Type.INT), 1)
+
+    def test_program_function_shadows_method_name(self):
+        result = self.run("int sum(int a, int b) { return a + b; }"
+                          "int main() { List<int> l = new List<int>(1, 2, 3); return sum(l.sum(), 10); }")
+        assert result == Value(BaseType(Type.INT), 16)
+
+    def test_short_circuit_finishes_query_profile(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "bool main() { List<int> l = new List<int>(1, 5, 2, 3);"
+                                         " return l.select(twice()).any(big()); }", analyze_queries=True)
+        interpreter.interpret()
+        profile, = interpreter.query_profiles
+        assert profile.executions == 1
+        assert profile.source_rows == 2
+
+
+DICT_VIEW_PROGRAM = ("Dict<int, int> squares(int n) { Dict<int, int> d = new Dict<int, int>(); int i = 0;"
+                     " while (i < n) { d.add(new Pair<int, int>(i, i * i)); i = i + 1; } return d; }")
+
+
+class TestDictViews:
+    def test_indexing_values_in_loop(self):
+        interpreter = create_interpreter(DICT_VIEW_PROGRAM + "int main() { Dict<int, int> d = squares(50); int total = 0;"
+                                         " int i = 0; while (i < d.keys().length()) { total = total + d.values()[i];"
+                                         " i = i + 1; } return total; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), sum(i * i for i in range(50)))
+        assert interpreter.copy_count == 0
+
+    def test_view_follows_dict_changes(self):
+        interpreter = create_interpreter(DICT_VIEW_PROGRAM + "int main() { Dict<int, int> d = squares(2);"
+                                         " int before = d.keys().length(); d.add(new Pair<int, int>(5, 25));"
+                                         " return before * 10 + d.values()[2]; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 45)
+
+    def test_stored_view_is_a_snapshot(self):
+        interpreter = create_interpreter(DICT_VIEW_PROGRAM + "int main() { Dict<int, int> d = squares(2);"
+                                         " List<int> keys = d.keys(); d.remove(0); keys.push(7);"
+                                         " return keys.length() * 10 + d.keys().length(); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 31)
+
+    def test_mutating_temporary_view_leaves_dict(self):
+        interpreter = create_interpreter(DICT_VIEW_PROGRAM + "int main() { Dict<int, int> d = squares(3);"
+                                         " d.values().pop(); return d.values().length(); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 3)
+
+    def test_linq_over_view(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + DICT_VIEW_PROGRAM + "List<int> main() {"
+                                         " Dict<int, int> d = squares(4); return d.values().where(big()); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [9])
+
+
+
+class TestTypedLists:
+    def test_numeric_list_is_array_backed(self):
+        interpreter = create_interpreter("List<int> main() { List<int> l = new List<int>(1, 2); l.push(3); l.pop();"
+                                         " l.push(4); l[0] = 5; return l; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [5, 2, 4])
+        assert isinstance(interpreter.last_result.value, TypedList)
+
+    def test_push_beyond_buffer_range_falls_back(self):
+        interpreter = create_interpreter("int main() { List<int> l = new List<int>(1); int big = 3000000000;"
+                                         " l.push(big * big * big); l[0] = big * big * big; return l.pop() - l[0]; }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 0)
+
+    def test_bool_list_reads_bools(self, capsys):
+        interpreter = create_interpreter("bool main() { List<bool> l = new List<bool>(true); l.push(false);"
+                                         " print((string) l.pop()); return l[0]; }")
+        interpreter.interpret()
+        assert capsys.readouterr().out.startswith("False\n")
+        assert interpreter.last_result.value is True
+
+    def test_query_result_is_array_backed(self):
+        interpreter = create_interpreter(LINQ_FUNCTIONS + "List<int> main() { List<int> l = new List<int>(1, 20, 30);"
+                                         " return l.where(big()); }")
+        interpreter.interpret()
+        assert interpreter.last_result == Value(ElementType(Type.LIST, Type.INT), [20, 30])
+        assert isinstance(interpreter.last_result.value, TypedList)
+
+
+VECTOR_FUNCTIONS = ("int quadruple(int n) { return n * 4; }"
+                    "bool above(int n) { return n > 12 && n != 40; }"
+                    "float half(int n) { return n / 2; }"
+                    "int negative(int n) { return -n; }"
+                    "int counted(int n) { print(\"x\"); return n; }"
+                    "List<int> quadrupled(List<int> l) { return l.select(quadruple()).where(above()).orderBy(negative()); }"
+                    "List<float> halved(List<int> l) { return l.select(half()).take(3); }"
+                    "List<int> printed(List<int> l) { return l.where(above()).select(counted()); }"
+                    "int main() { return 0; }")
+
+
+def int_list(values) -> Value:
+    return Value(ElementType(Type.LIST, Type.INT), typed_list(Type.INT, values))
+
+
+class TestVectorizedQueries:
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip("numpy")
+
+    def run(self, function: str, values: list, **options) -> tuple[Interpreter, Value]:
+        interpreter = create_interpreter(VECTOR_FUNCTIONS, **options)
+        return interpreter, interpreter.call_function(function, [int_list(values)])
+
+    def test_simple_callbacks_run_on_whole_buffer(self):
+        interpreter, result = self.run("quadrupled", list(range(100)))
+        assert result == Value(ElementType(Type.LIST, Type.INT), sorted((n * 4 for n in range(4, 100) if n != 10), reverse=True))
+        assert interpreter.vectorized_stages == 3
+
+    def test_matches_per_element_evaluation(self):
+        values = [7, -3, 0, 2 ** 40, 5] * 20
+        for function in ("quadrupled", "halved"):
+            vectorized, expected = self.run(function, values), self.run(function, values, vectorize=False)
+            assert vectorized[1] == expected[1] and vectorized[0].vectorized_stages > 0
+            assert [type(value) for value in vectorized[1].value] == [type(value) for value in expected[1].value]
+
+    def test_stops_at_callback_with_side_effects(self, capsys):
+        interpreter, result = self.run("printed", list(range(40)))
+        assert result.value == [n for n in range(13, 40) if n != 40]
+        assert capsys.readouterr().out == "x\n" * 27
+        assert interpreter.vectorized_stages == 1
+
+    def test_falls_back_when_int64_could_overflow(self):
+        interpreter, result = self.run("quadrupled", [2 ** 60] + list(range(40)))
+        assert result.value[0] == 2 ** 62
+        assert interpreter.vectorized_stages == 0
+
+    def test_small_lists_run_element_by_element(self):
+        interpreter, result = self.run("halved", [1, 2, 3])
+        assert result.value == [0.5, 1.0, 1.5]
+        assert interpreter.vectorized_stages == 0
+
+
+class TestVectorizeDisabled:
+    def test_runs_without_vectorizer(self):
+        interpreter = create_interpreter(VECTOR_FUNCTIONS, vectorize=False)
+        result = interpreter.call_function("halved", [int_list(range(40))])
+        assert result.value == [0.0, 0.5, 1.0]
+        assert interpreter.vectorized_stages == 0
+
+
+VALUE_INDEX_PROGRAM = ("bool isTwo(Pair<int, int> entry) { return entry.value() == 2; }"
+                       "bool between(Pair<int, int> entry) { return entry.value() >= 2 && 5 > entry.value(); }"
+                       "bool odd(Pair<int, int> entry) { int half = (int) (entry.value() / 2); return half * 2 != entry.value(); }"
+                       "Dict<int, int> numbers() { Dict<int, int> d = new Dict<int, int>(); int i = 0;"
+                       " while (i < 8) { int fours = (int) (i / 4); d.add(new Pair<int, int>(i, i - fours * 4)); i = i + 1; }"
+                       " return d; }")
+
+
+class TestValueIndex:
+    def run(self, body: str, **options) -> Interpreter:
+        interpreter = create_interpreter(VALUE_INDEX_PROGRAM + "Dict<int, int> main() { Dict<int, int> d = numbers();"
+                                         + body + " }", **options)
+        interpreter.interpret()
+        return interpreter
+
+    def test_equality_and_range_use_index(self):
+        body = "Dict<int, int> twos = d.where(isTwo()); return d.where(between());"
+        interpreter = self.run(body, index_dict_values=True)
+        assert interpreter.last_result.value == self.run(body).last_result.value
+        assert interpreter.value_index_statistics() == (2, 0)
+
+    def test_index_follows_changes(self):
+        body = ("Dict<int, int> before = d.where(isTwo()); d[2] = 7; d.remove(6); d.add(new Pair<int, int>(9, 2));"
+                " d[1] = 2; return d.where(isTwo());")
+        interpreter = self.run(body, index_dict_values=True)
+        assert interpreter.last_result.value == {1: 2, 9: 2}
+        assert list(interpreter.last_result.value) == [1, 9]
+        assert interpreter.value_index_statistics() == (2, 0)
+
+    def test_copy_keeps_own_index(self):
+        body = ("Dict<int, int> copy = d; copy[2] = 0; Dict<int, int> before = d.where(isTwo());"
+                " Dict<int, int> after = copy.where(isTwo()); return after;")
+        interpreter = self.run(body, index_dict_values=True)
+        assert interpreter.last_result.value == {6: 2}
+
+    def test_other_callbacks_scan(self):
+        interpreter = self.run("return d.where(odd()).where(isTwo());", index_dict_values=True)
+        assert interpreter.last_result.value == {}
+        assert interpreter.value_index_statistics() == (0, 1)
+
+    def test_disabled_by_default(self):
+        interpreter = self.run("return d.where(isTwo());")
+        assert interpreter.last_result.value == {2: 2, 6: 2}
+        assert interpreter.value_index_statistics() == (0, 0)
+
+
+SORTED_DICT_PROGRAM = ("int byKey(Pair<int, string> p) { return p.key(); }"
+                       "bool small(Pair<int, string> p) { return p.key() < 40; }"
+                       "SortedDict<int, string> letters() { SortedDict<int, string> d = new SortedDict<int, string>("
+                       "new Pair<int, string>(30, \"c\"), new Pair<int, string>(10, \"a\"));"
+                       " d.add(new Pair<int, string>(20, \"b\")); d[50] = \"e\"; d[5] = \"z\"; d.remove(5); return d; }")
+
+
+class TestSortedDict:
+    def run(self, result_type: str, body: str, **options) -> Interpreter:
+        interpreter = create_interpreter(SORTED_DICT_PROGRAM + result_type + " main() {"
+                                         " SortedDict<int, string> d = letters(); " + body + " }", **options)
+        interpreter.interpret()
+        return interpreter
+
+    def test_entries_are_kept_in_key_order(self):
+        interpreter = self.run("List<int>", "return d.keys();")
+        assert interpreter.last_result.value == [10, 20, 30, 50]
+
+    def test_is_key_and_index(self):
+        interpreter = self.run("string", "string found = (string) d.isKey(20); return found + d[30];")
+        assert interpreter.last_result.value == "Truec"
+
+    def test_range_is_half_open(self):
+        interpreter = self.run("SortedDict<int, string>", "return d.range(15, 50);")
+        assert interpreter.last_result.type == KeyValueType(Type.SORTED_DICT, Type.INT, Type.STRING)
+        assert list(interpreter.last_result.value.items()) == [(20, "b"), (30, "c")]
+
+    def test_range_bounds_must_match_key_type(self):
+        with pytest.raises(InterpreterError):
+            self.run("SortedDict<int, string>", "return d.range(\"a\", 50);")
+
+    def test_min_and_max_return_keys(self):
+        interpreter = self.run("int", "return d.max() - d.min();")
+        assert interpreter.last_result.value == 40
+
+    def test_min_of_empty_raises(self):
+        with pytest.raises(InterpreterError):
+            self.run("int", "SortedDict<int, string> e = new SortedDict<int, string>(); return e.min();")
+
+    def test_where_keeps_sorted_dict(self):
+        interpreter = self.run("SortedDict<int, string>", "d[1] = \"x\"; return d.where(small());")
+        assert list(interpreter.last_result.value) == [1, 10, 20, 30]
+
+    def test_order_by_key_is_dropped(self):
+        body = "return d.where(small()).orderBy(byKey()).take(2);"
+        interpreter = self.run("Dict<int, string>", body, explain_queries=True)
+        assert interpreter.explain().split("\n")[1] == "  plan: where(small) -> take(2)"
+        unoptimized = self.run("Dict<int, string>", body, optimize_queries=False)
+        assert list(interpreter.last_result.value.items()) == list(unoptimized.last_result.value.items())
+        assert interpreter.last_result.value == {10: "a", 20: "b"}
+
+
+SET_FUNCTIONS = ("bool even(int n) { int half = (int) (n / 2); return half * 2 == n; }"
+                 "int negative(int n) { return -n; }"
+                 "List<int> wrap(int n) { return new List<int>(n); }")
+
+
+class TestSets:
+    def run(self, result_type: str, body: str, **options) -> Interpreter:
+        interpreter = create_interpreter(SET_FUNCTIONS + result_type + " main() { " + body + " }", **options)
+        interpreter.interpret()
+        return interpreter
+
+    def test_initialization_drops_duplicates(self):
+        interpreter = self.run("Set<int>", "return new Set<int>(3, 1, 3, 2, 1);")
+        assert interpreter.last_result.type == ElementType(Type.SET, Type.INT)
+        assert list(interpreter.last_result.value) == [3, 1, 2]
+
+    def test_add_remove_contains_length(self):
+        body = ("Set<string> s = new Set<string>(\"a\"); s.add(\"b\"); s.add(\"a\"); s.remove(\"a\");"
+                " bool found = s.contains(\"b\"); bool missing = s.contains(\"a\");"
+                " return (string) found + (string) missing + (string) s.length();")
+        assert self.run("string", body).last_result.value == "TrueFalse1"
+
+    def test_algebra(self):
+        body = ("Set<int> a = new Set<int>(4, 1, 3, 2); Set<int> b = new Set<int>(2, 5, 4);"
+                " List<int> result = a.union(b).select(negative()); List<int> common = a.intersect(b).select(negative());"
+                " List<int> rest = a.except(b).select(negative()); return result.length() * 100 + common.length() * 10 + rest.length();")
+        assert self.run("int", body).last_result.value == 522
+
+    def test_algebra_keeps_operands(self):
+        body = "Set<int> a = new Set<int>(1, 2); Set<int> b = new Set<int>(2, 3); Set<int> c = a.except(b); return a;"
+        assert list(self.run("Set<int>", body).last_result.value) == [1, 2]
+
+    def test_assignment_copies(self):
+        body = "Set<int> a = new Set<int>(1); Set<int> b = a; b.add(2); return a;"
+        assert list(self.run("Set<int>", body).last_result.value) == [1]
+
+    def test_where_returns_set(self):
+        interpreter = self.run("Set<int>", "Set<int> s = new Set<int>(1, 2, 3, 4); return s.where(even());")
+        assert interpreter.last_result.type == ElementType(Type.SET, Type.INT)
+        assert list(interpreter.last_result.value) == [2, 4]
+
+    def test_distinct(self):
+        interpreter = self.run("List<int>", "List<int> l = new List<int>(5, 1, 5, 2, 1); return l.distinct();")
+        assert interpreter.last_result.value == [5, 1, 2]
+
+    def test_distinct_after_select(self):
+        interpreter = self.run("List<int>", "List<int> l = new List<int>(1, 2, 1); return l.select(negative()).distinct().take(1);")
+        assert interpreter.last_result.value == [-1]
+
+    @pytest.mark.parametrize("body", [
+        "Set<int> a = new Set<int>(1); a.add(\"x\"); return 0;",
+        "Set<int> a = new Set<int>(1); a.remove(2); return 0;",
+        "Set<int> a = new Set<int>(1); Set<string> b = new Set<string>(); Set<int> c = a.union(b); return 0;",
+        "Set<int> a = new Set<int>(1); List<int> b = new List<int>(1); Set<int> c = a.union(b); return 0;",
+        "Set<int> a = new Set<int>(1); a.push(2); return 0;",
+        "Set<int> a = new Set<int>(1); return a[0];",
+        "Set<List<int>> a = new Set<List<int>>(); return 0;",
+        "List<List<int>> l = new List<List<int>>(new List<int>(1), new List<int>(1)); List<List<int>> d = l.distinct(); return 0;",
+        "List<int> l = new List<int>(1, 1); List<List<int>> d = l.select(wrap()).distinct(); return 0;",
+        "List<Pair<int, List<int>>> l = new List<Pair<int, List<int>>>(); List<Pair<int, List<int>>> d = l.distinct(); return 0;",
+    ])
+    def test_type_errors(self, body):
+        with pytest.raises(InterpreterError):
+            self.run("int", body)
+
+
+DISK_DICT_PROGRAM = ("bool big(Pair<string, int> p) { return p.value() > 1; }"
+                     "int byValue(Pair<string, int> p) { return -p.value(); }"
+                     "Dict<string, int> main() { Dict<string, int> d = new Dict<string, int>("
+                     "new Pair<string, int>(\"a\", 1), new Pair<string, int>(\"b\", 2));"
+                     " d.add(new Pair<string, int>(\"c\", 3)); d[\"a\"] = 10; d.remove(\"b\"); d[\"b\"] = 20;"
+                     " Dict<string, int> copy = d; copy.remove(\"c\"); bool missing = d.isKey(\"zz\");"
+                     " return d.where(big()).orderBy(byValue()); }")
+
+
+class TestDiskDicts:
+    def test_same_result_as_memory(self):
+        on_disk = create_interpreter(DISK_DICT_PROGRAM, disk_dicts=True, dict_cache_size=1)
+        on_disk.interpret()
+        in_memory = create_interpreter(DISK_DICT_PROGRAM)
+        in_memory.interpret()
+        assert isinstance(on_disk.last_result.value, DiskMap)
+        assert list(on_disk.last_result.value.items()) == list(in_memory.last_result.value.items()) == [
+            ("b", 20), ("a", 10), ("c", 3)]
+
+    def test_sorted_dict_stays_in_memory(self):
+        interpreter = create_interpreter("SortedDict<int, int> main() { return new SortedDict<int, int>("
+                                         "new Pair<int, int>(2, 1), new Pair<int, int>(1, 2)); }", disk_dicts=True)
+        interpreter.interpret()
+        assert list(interpreter.last_result.value) == [1, 2]
+
+    def test_value_changed_in_place_survives_eviction(self):
+        string = ("int main() { Dict<int, List<int>> d = new Dict<int, List<int>>(); int i = 0;"
+                  " while (i < 10005) { d[i] = new List<int>(i); i = i + 1; }"
+                  " d[0].push(5); d[0].push(6); int other = d[1].length() + d[2].length() + d[3].length();"
+                  " d[0].pop(); d[0].push(7); d[0].push(8); List<int> first = d[0];"
+                  " return first.length() * 1000 + first[3] * 10 + other; }")
+        on_disk = create_interpreter(string, disk_dicts=True, dict_cache_size=2)
+        on_disk.interpret()
+        in_memory = create_interpreter(string)
+        in_memory.interpret()
+        assert on_disk.last_result.value == in_memory.last_result.value == 4083
+
+
+PARTITIONED_DICT_PROGRAM = ("bool big(Pair<int, int> p) { return p.value() > 20; }"
+                            "int square(Pair<int, int> p) { return p.value() * p.value(); }"
+                            "bool large(int n) { return n > 1000; }"
+                            "bool loud(Pair<int, int> p) { print((string) p.key()); return p.key() > 270; }"
+                            "Dict<int, int> numbers() { Dict<int, int> d = new Dict<int, int>(); int i = 0;"
+                            " while (i < 40) { d[280 - i * 7] = i; i = i + 1; } d.remove(14); return d; }")
+
+
+def run_partitioned(body: str, result_type: str = "int", **options) -> Interpreter:
+    string = PARTITIONED_DICT_PROGRAM + result_type + " main() { Dict<int, int> d = numbers(); " + body + " }"
+    options.setdefault("dict_transport", LocalTransport(3, create_interpreter(string).program))
+    interpreter = create_interpreter(string, **options)
+    interpreter.interpret()
+    return interpreter
+
+
+class TestPartitionedDicts:
+    @pytest.mark.parametrize("body", ["return d.where(big()).select(square()).sum();",
+                                      "return d.where(big()).select(square()).count(large());",
+                                      "return d.count(big()) * 1000 + d.select(square()).max() + d.select(square()).min();",
+                                      "return d.select(square()).orderBy(large()).where(large()).count(large());",
+                                      "return d.where(big()).sum(square()) + d.max(square()) - d.min(square());"])
+    def test_same_result_as_memory(self, body):
+        partitioned = run_partitioned(body)
+        assert partitioned.map_tasks > 0
+        assert partitioned.last_result == run_partitioned(body, dict_transport=None).last_result
+
+    def test_entries_keep_insertion_order(self):
+        interpreter = run_partitioned("return d;", "Dict<int, int>")
+        entries = interpreter.last_result.value
+        assert isinstance(entries, PartitionedMap)
+        expected = {280 - index * 7: index for index in range(40)}
+        del expected[14]
+        assert list(entries.items()) == list(expected.items())
+
+    def test_copies_are_independent(self):
+        interpreter = run_partitioned("Dict<int, int> e = d; e[280] = -1; e.remove(273); return d[280] * 100 + d[273];")
+        assert interpreter.last_result == Value(BaseType(Type.INT), 1)
+
+    @pytest.mark.parametrize("options", [{}, {"dict_transport": None, "dict_partitions": 2}])
+    def test_value_changed_in_place(self, options):
+        body = ("Dict<int, List<int>> l = new Dict<int, List<int>>(); l[1] = new List<int>(1); l[2] = new List<int>(2);"
+                " l[1].push(3); l[1].push(4); l[2].pop(); List<int> first = l[1];"
+                " return first.length() * 100 + first[2] * 10 + l[2].length();")
+        partitioned = run_partitioned(body, **options)
+        assert partitioned.last_result == run_partitioned(body, dict_transport=None).last_result == Value(
+            BaseType(Type.INT), 340)
+
+    def test_impure_callback_runs_in_coordinator(self, capsys):
+        interpreter = run_partitioned("return d.count(loud());")
+        assert interpreter.last_result == Value(BaseType(Type.INT), 2)
+        assert interpreter.map_tasks == 0
+        assert capsys.readouterr().out.split("\n")[:3] == ["280", "273", "266"]
+
+    def test_empty_min_error(self):
+        with pytest.raises(InterpreterError):
+            run_partitioned("Dict<int, int> e = new Dict<int, int>(); return e.select(square()).min();")
+
+    def test_worker_processes(self):
+        interpreter = run_partitioned("return d.where(big()).select(square()).sum();", dict_transport=None,
+                                      dict_partitions=2)
+        assert interpreter.map_tasks > 0
+        assert interpreter.last_result == Value(BaseType(Type.INT), sum(index * index for index in range(21, 40) if index != 38))
+
+    def test_disk_dicts_conflict(self):
+        with pytest.raises(InterpreterError):
+            create_interpreter("int main() { return 0; }", disk_dicts=True, dict_partitions=2)
+
+
+class TestMapFile:
+    def run(self, path: str, result_type: str, body: str) -> Interpreter:
+        interpreter = create_interpreter("bool big(int n) { return n > 8; }" + result_type + " main() { "
+                                         "List<int> xs = mapFile(\"" + path + "\"); " + body + " }")
+        interpreter.interpret()
+        return interpreter
+
+    @pytest.fixture
+    def path(self, tmp_path) -> str:
+        path = tmp_path / "data.i32"
+        path.write_bytes(array('i', [7, 12, 9, -1]).tobytes())
+        return str(path)
+
+    def test_streaming_queries(self, path):
+        interpreter = self.run(path, "int", "return xs.where(big()).sum() + xs.length() * 100 + xs[3];")
+        assert interpreter.last_result.value == 420
+
+    def test_mutation_copies(self, path):
+        interpreter = self.run(path, "List<int>", "List<int> ys = xs; ys.push(1); ys[0] = 0; return xs;")
+        assert isinstance(interpreter.last_result.value, MappedList)
+        assert list(interpreter.last_result.value) == [7, 12, 9, -1]
+
+    def test_pushed_list_is_in_memory(self, path):
+        interpreter = self.run(path, "List<int>", "xs.pop(); return xs;")
+        assert isinstance(interpreter.last_result.value, TypedList)
+        assert interpreter.last_result.value == [7, 12, 9]
+
+    def test_element_type_must_match(self, tmp_path):
+        path = tmp_path / "data.f64"
+        path.write_bytes(array('d', [1.0]).tobytes())
+        with pytest.raises(InterpreterError):
+            self.run(str(path), "int", "return 0;")
+
+
+SHARED_PROGRAM = ("int total(List<int> l, Dict<string, int> d, string k) { return l.sum() + d[k]; }"
+                  "bool big(int n) { return n > 5; }"
+                  "List<int> query(List<int> l) { return l.where(big()); }"
+                  "List<int> grow(List<int> l) { l.push(1); return l; }"
+                  "int main() { return 0; }")
+
+
+class TestSharedMemory:
+    @pytest.fixture
+    def interpreter(self):
+        interpreter = create_interpreter(SHARED_PROGRAM, memoize=False, parallel_workers=2, parallel_threshold=4)
+        yield interpreter
+        interpreter.close()
+
+    def share_list(self, interpreter, values) -> Value:
+        return interpreter.share(Value(ElementType(Type.LIST, Type.INT), values))
+
+    def test_workers_read_shared_arguments(self, interpreter):
+        numbers = self.share_list(interpreter, list(range(10)))
+        table = interpreter.share(Value(KeyValueType(Type.DICT, Type.STRING, Type.INT), {"a": 100, "b": 200}))
+        assert isinstance(numbers.value, SharedList) and isinstance(table.value, SharedDict)
+        results = interpreter.call_function_parallel("total", [[numbers, table, Value(BaseType(Type.STRING), key)]
+                                                               for key in ("a", "b")])
+        assert [result.value for result in results] == [145, 245]
+
+    def test_parallel_query_over_shared_list(self, interpreter):
+        numbers = self.share_list(interpreter, list(range(10)))
+        assert interpreter.call_function("query", [numbers]).value == [6, 7, 8, 9]
+        assert interpreter.parallel_runs == 1
+
+    def test_mutation_copies(self, interpreter):
+        numbers = self.share_list(interpreter, [1, 2])
+        assert interpreter.call_function("grow", [numbers]).value == [1, 2, 1]
+        assert isinstance(numbers.value, TypedList)
+
+    def test_sequential_without_workers(self):
+        interpreter = create_interpreter(SHARED_PROGRAM, memoize=False)
+        numbers = self.share_list(interpreter, [4, 5, 6, 7])
+        assert interpreter.call_function_parallel("query", [[numbers]])[0].value == [6, 7]
+        interpreter.close()
+        assert numbers.value.segment.released
+
+    def test_only_numeric_lists_and_dicts(self, interpreter):
+        with pytest.raises(InterpreterError):
+            interpreter.share(Value(ElementType(Type.LIST, Type.STRING), ["a"]))
+        with pytest.raises(InterpreterError):
+            interpreter.share(Value(BaseType(Type.INT), 1))
+
+    def test_crashed_worker(self, interpreter):
+        numbers = self.share_list(interpreter, list(range(10)))
+        interpreter.call_function("query", [numbers])
+        for process in list(interpreter._parallel._executor._processes.values()):
+            # the pool stops its other workers once one of them dies, so some may be gone already
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(process.pid, signal.SIGKILL)
+            process.join()
+        with pytest.raises(InterpreterError):
+            interpreter.call_function("query", [numbers])
+        assert not numbers.value.segment.released
+        assert interpreter.call_function("query", [numbers]).value == [6, 7, 8, 9]
+
+
+class TestStringBuilding:
+    def run(self, result_type: str, body: str, functions: str = "") -> Interpreter:
+        interpreter = create_interpreter(functions + result_type + " main() { " + body + " }")
+        interpreter.interpret()
+        return interpreter
+
+    def test_concatenation_chain(self):
+        body = "string k = \"a\"; int v = 3; return \"Klucz: \" + k + \", wartość: \" + (string) v;"
+        assert self.run("string", body).last_result == Value(BaseType(Type.STRING), "Klucz: a, wartość: 3")
+
+    def test_numeric_chains_keep_their_result(self):
+        assert self.run("float", "return 1 + 2 + 0.5;").last_result == Value(BaseType(Type.FLOAT), 3.5)
+        assert self.run("int", "return 1 + 2 * 3 + 4;").last_result == Value(BaseType(Type.INT), 11)
+
+    def test_chain_operands_are_evaluated_in_order(self, capsys):
+        functions = "string loud(string s) { print(s); return s; }"
+        result = self.run("string", "return loud(\"a\") + loud(\"b\") + loud(\"c\");", functions).last_result
+        assert result == Value(BaseType(Type.STRING), "abc")
+        assert capsys.readouterr().out.startswith("a\nb\nc\n")
+
+    def test_mixed_chain_error(self):
+        with pytest.raises(ExpressionTypeError):
+            self.run("string", "return \"a\" + \"b\" + 1;")
+
+    def test_builder(self):
+        body = ("StringBuilder sb = new StringBuilder(\"<\"); int i = 0;"
+                " while (i < 5) { sb.append((string) i); i = i + 1; } sb.append(\">\");"
+                " return sb.toString() + (string) sb.length();")
+        assert self.run("string", body).last_result == Value(BaseType(Type.STRING), "<01234>7")
+
+    def test_builder_copies(self):
+        functions = "void fill(StringBuilder sb) { sb.append(\"x\"); }"
+        body = "StringBuilder a = new StringBuilder(\"a\"); StringBuilder b = a; b.append(\"b\"); fill(a); return a;"
+        result = self.run("StringBuilder", body, functions).last_result
+        assert result.type == BaseType(Type.STRING_BUILDER) and str(result.value) == "a"
+
+    def test_append_takes_strings(self):
+        with pytest.raises(ExpressionTypeError):
+            self.run("int", "StringBuilder sb = new StringBuilder(); sb.append(1); return 0;")
+        with pytest.raises(InterpreterError):
+            self.run("int", "StringBuilder sb = new StringBuilder(1); return 0;")
@@ -0,0 +1,57 @@
+import copy
+import struct
+
+import pytest
+
+from src.parser.classes.type import Type
+from src.interpreter.interpreter_error import InterpreterError
+from src.interpreter.mapped_list import MappedList, map_file
+from src.interpreter.typed_list import TypedList
+import src.interpreter.mapped_list as mapped_list
+
+
+def write(path, format, values) -> str:
+    path.write_bytes(struct.pack(f"<{len(values)}{format}", *values))
+    return str(path)
+
+
+class TestMappedList:
+    def test_int32_file(self, tmp_path):
+        element_type, values = map_file(write(tmp_path / "data.i32", "i", [7, -8, 2 ** 31 - 1]))
+        assert element_type == Type.INT
+        assert len(values) == 3 and values[1] == -8 and values[-1] == 2 ** 31 - 1
+        assert list(values) == [7, -8, 2 ** 31 - 1]
+
+    def test_float64_file(self, tmp_path):
+        element_type, values = map_file(write(tmp_path / "data.f64", "d", [1.5, -0.25]))
+        assert element_type == Type.FLOAT
+        assert values == [1.5, -0.25]
+
+    def test_big_endian_host_decodes_little_endian(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(mapped_list.sys, "byteorder", "big")
+        _, values = map_file(write(tmp_path / "data.i64", "q", [1, -2, 3]))
+        assert list(values) == [1, -2, 3] and values[-2] == -2
+        with pytest.raises(IndexError):
+            values[3]
+
+    def test_empty_file(self, tmp_path):
+        _, values = map_file(write(tmp_path / "data.f32", "f", []))
+        assert len(values) == 0 and list(values) == []
+
+    def test_copy_is_in_memory(self, tmp_path):
+        _, values = map_file(write(tmp_path / "data.i32", "i", [1, 2, 3]))
+        copied = copy.copy(values)
+        assert isinstance(copied, TypedList) and copied.typecode == 'q' and copied == [1, 2, 3]
+        assert isinstance(values[1:], TypedList) and values[1:] == [2, 3]
+
+    @pytest.mark.parametrize("name, content", [("data.txt", b""), ("data.i32", b"\x00\x00\x00"), ("missing.f64", None)])
+    def test_invalid_files(self, tmp_path, name, content):
+        path = tmp_path / name
+        if content is not None:
+            path.write_bytes(content)
+        with pytest.raises(InterpreterError):
+            map_file(str(path))
+
+    def test_is_read_only(self, tmp_path):
+        _, values = map_file(write(tmp_path / "data.i32", "i", [1]))
+        assert isinstance(values, MappedList) and not hasattr(values, "append")
@@ -0,0 +1,95 @@
+import pytest
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, BaseType, ElementType
+
+from src.interpreter.value import Value
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.interpreter_error import InterpreterError
+from src.interpreter.memo_cache import MemoCache
+
+
+FIBONACCI = ("int fibonacci(int n) { if (n < 3) { return 1; } return fibonacci(n - 1) + fibonacci(n - 2); }"
+             "int main() { return fibonacci(%d); }")
+
+
+def create_interpreter(string, **options) -> Interpreter:
+    program = Parser(Filter(Lexer(Scanner(StringIO(string))))).parse_program()
+    return Interpreter(program, **options)
+
+
+class TestMemoCache:
+    def test_miss_then_hit(self):
+        cache = MemoCache()
+        key = cache.make_key([Value(BaseType(Type.INT), 1)])
+        assert cache.get(key) is None
+        cache.put(key, Value(BaseType(Type.INT), 2))
+        assert cache.get(key) == Value(BaseType(Type.INT), 2)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_lru_eviction(self):
+        cache = MemoCache(max_size=2)
+        first, second, third = ((i,) for i in range(3))
+        cache.put(first, Value(BaseType(Type.INT), 0))
+        cache.put(second, Value(BaseType(Type.INT), 1))
+        cache.get(first)
+        cache.put(third, Value(BaseType(Type.INT), 2))
+        assert len(cache) == 2
+        assert cache.get(second) is None
+        assert cache.get(first) is not None
+
+    def test_container_arguments_are_frozen(self):
+        cache = MemoCache()
+        key = cache.make_key([Value(ElementType(Type.LIST, Type.INT), [1, 2])])
+        assert key == ((1, 2),)
+
+    def test_cached_container_is_not_shared(self):
+        cache = MemoCache()
+        cache.put((1,), Value(ElementType(Type.LIST, Type.INT), [1]))
+        result = cache.get((1,))
+        assert result.detach()
+        result.value.append(2)
+        assert cache.get((1,)).value == [1]
+
+    def test_invalid_size(self):
+        with pytest.raises(InterpreterError):
+            MemoCache(max_size=0)
+
+
+class TestMemoizedCalls:
+    def test_fibonacci_is_memoized(self):
+        interpreter = create_interpreter(FIBONACCI % 60)
+        interpreter.interpret()
+        assert interpreter.last_result == Value(BaseType(Type.INT), 1548008755920)
+        hits, misses = interpreter.memo_statistics()["fibonacci"]
+        assert misses == 60
+        assert hits == 57
+
+    def test_results_match_without_memoization(self):
+        memoized = create_interpreter(FIBONACCI % 15)
+        memoized.interpret()
+        plain = create_interpreter(FIBONACCI % 15, memoize=False)
+        plain.interpret()
+        assert memoized.last_result == plain.last_result
+        assert plain.memo_caches == {}
+
+    def test_function_opt_out(self):
+        interpreter = create_interpreter(FIBONACCI % 10, memo_exclude=("fibonacci",))
+        interpreter.interpret()
+        assert "fibonacci" not in interpreter.memo_caches
+
+    def test_memo_size_limit(self):
+        interpreter = create_interpreter(FIBONACCI % 20, memo_size=4)
+        interpreter.interpret()
+        assert len(interpreter.memo_caches["fibonacci"]) == 4
+
+    def test_impure_function_is_not_memoized(self, capsys):
+        interpreter = create_interpreter("int loud(int n) { print((string) n); return n; }"
+                                         "int main() { loud(1); return loud(1); }")
+        interpreter.interpret()
+        assert "loud" not in interpreter.memo_caches
+        assert capsys.readouterr().out.startswith("1\n1\n")
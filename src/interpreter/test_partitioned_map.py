@@ -0,0 +1,128 @@
+import copy
+import gc
+import os
+import signal
+
+import pytest
+
+from src.interpreter.interpreter_error import InterpreterError
+from src.interpreter.partitioned_map import PartitionedStorage, LocalTransport, ProcessTransport, Shard
+
+
+@pytest.fixture
+def storage():
+    storage = PartitionedStorage(LocalTransport(3))
+    yield storage
+    storage.close()
+
+
+class TestPartitionedMap:
+    def test_mapping_interface(self, storage):
+        entries = storage.create()
+        entries["a"] = 1
+        entries[2] = [3]
+        assert len(entries) == 2
+        assert entries["a"] == 1 and entries[2] == [3]
+        assert "a" in entries and "b" not in entries
+        with pytest.raises(KeyError):
+            entries["b"]
+        del entries["a"]
+        assert len(entries) == 1 and "a" not in entries
+        with pytest.raises(KeyError):
+            del entries["a"]
+
+    def test_entries_are_spread_across_shards(self, storage):
+        entries = storage.create()
+        entries.update((index, index) for index in range(30))
+        sizes = [len(list(storage.scan(entries.map_id, shard))) for shard in range(3)]
+        assert sum(sizes) == 30 and all(sizes)
+
+    def test_insertion_order(self, storage):
+        entries = storage.create()
+        entries.update((f"key{index}", index) for index in range(50))
+        entries["key10"] = -1
+        del entries["key20"]
+        entries["key20"] = 20
+        keys = [f"key{index}" for index in range(50) if index != 20] + ["key20"]
+        assert list(entries) == keys
+        assert entries["key10"] == -1
+        assert list(entries.values())[:11] == list(range(10)) + [-1]
+
+    def test_update_counts_new_keys(self, storage):
+        entries = storage.create()
+        entries.update({"a": 1, "b": 2})
+        entries.update([("b", 3), ("c", 4)], d=5)
+        assert len(entries) == 4
+        assert dict(entries.items()) == {"a": 1, "b": 3, "c": 4, "d": 5}
+
+    def test_values_are_copies(self, storage):
+        entries = storage.create()
+        values = [1]
+        entries["a"] = values
+        values.append(2)
+        assert entries["a"] == [1]
+
+    def test_copy_is_independent(self, storage):
+        entries = storage.create()
+        entries.update({"a": 1, "b": 2})
+        copied = copy.copy(entries)
+        copied["c"] = 3
+        del copied["a"]
+        assert dict(entries.items()) == {"a": 1, "b": 2}
+        assert dict(copied.items()) == {"b": 2, "c": 3}
+
+    def test_dropped_maps_are_removed_from_shards(self, storage):
+        entries = storage.create()
+        map_id = entries.map_id
+        entries["a"] = 1
+        del entries
+        gc.collect()
+        storage.create()
+        with pytest.raises(InterpreterError):
+            storage.broadcast(('contains', map_id, "a"))
+
+    def test_abandoned_iteration(self, storage):
+        entries = storage.create()
+        entries.update((index, index) for index in range(10000))
+        iterator = iter(entries)
+        assert next(iterator) == 0
+        del iterator
+        assert sum(entries.values()) == sum(range(10000))
+
+    def test_closed_storage(self, storage):
+        entries = storage.create()
+        storage.close()
+        with pytest.raises(InterpreterError):
+            entries["a"] = 1
+
+
+class TestShard:
+    def test_errors_are_replies(self):
+        assert Shard().handle(('get', 0, "a")) == (False, "0")
+        assert Shard().handle(('run', 0, [], None))[0] is False
+
+    def test_queries_need_program(self):
+        shard = Shard()
+        shard.handle(('create', 0))
+        assert shard.handle(('run', 0, [], None)) == (False, "Shard has no program to run queries with")
+
+
+class TestProcessTransport:
+    def test_shards_in_processes(self):
+        storage = PartitionedStorage(ProcessTransport(2))
+        entries = storage.create()
+        entries.update((index, str(index)) for index in range(100))
+        assert len(entries) == 100 and entries[42] == "42"
+        assert list(entries) == list(range(100))
+        storage.close()
+
+    def test_crashed_shard(self):
+        transport = ProcessTransport(2)
+        storage = PartitionedStorage(transport)
+        entries = storage.create()
+        entries.update((index, index) for index in range(10))
+        os.kill(transport.processes[1].pid, signal.SIGKILL)
+        transport.processes[1].join()
+        with pytest.raises(InterpreterError):
+            list(entries)
+        storage.close()
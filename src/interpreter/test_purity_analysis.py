@@ -0,0 +1,70 @@
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.purity_analysis import PurityAnalyzer, memoizable_functions
+
+
+def analyze(string) -> set[str]:
+    program = Parser(Filter(Lexer(Scanner(StringIO(string))))).parse_program()
+    return PurityAnalyzer(program, Interpreter.system_methods.keys()).pure_functions()
+
+
+class TestPurityAnalysis:
+    def test_arithmetic_function_is_pure(self):
+        assert analyze("int twice(int n) { return n * 2; } int main() { return twice(2); }") == {"twice", "main"}
+
+    def test_recursive_function_is_pure(self):
+        pure = analyze("int fib(int n) { if (n < 3) { return 1; } return fib(n - 1) + fib(n - 2); }"
+                       "int main() { return fib(5); }")
+        assert pure == {"fib", "main"}
+
+    def test_print_is_impure(self):
+        pure = analyze("int loud(int n) { print((string) n); return n; } int main() { return loud(1); }")
+        assert pure == set()
+
+    def test_calling_impure_function_is_impure(self):
+        pure = analyze("void log(string s) { print(s); } int f(int n) { log(\"x\"); return n; }"
+                       "int g(int n) { return f(n) + 1; } int main() { return 0; }")
+        assert pure == {"main"}
+
+    def test_impure_function_shadowing_system_method(self):
+        pure = analyze("int count(int n) { print((string) n); return n; } int f(int n) { return count(n); }"
+                       "int main() { return 0; }")
+        assert pure == {"main"}
+
+    def test_mutating_parameter_is_impure(self):
+        pure = analyze("int f(List<int> l) { l.push(1); return 0; } int main() { return 0; }")
+        assert "f" not in pure
+
+    def test_index_assignment_of_parameter_is_impure(self):
+        pure = analyze("int f(List<int> l) { l[0] = 1; return 0; } int main() { return 0; }")
+        assert "f" not in pure
+
+    def test_assigning_parameter_is_impure(self):
+        pure = analyze("int f(int n) { n = n + 1; return n; } int main() { return 0; }")
+        assert "f" not in pure
+
+    def test_mutating_own_container_is_pure(self):
+        pure = analyze("int f(int n) { List<int> l = new List<int>(); l.push(n); return l.length(); }"
+                       "int main() { return 0; }")
+        assert "f" in pure
+
+    def test_mutating_alias_of_parameter_is_impure(self):
+        pure = analyze("int f(List<int> p) { List<int> l = p; l.push(1); return 0; } int main() { return 0; }")
+        assert "f" not in pure
+
+    def test_linq_callback_purity_is_propagated(self):
+        pure = analyze("bool big(int n) { return n > 1; } void show(int n) { print((string) n); }"
+                       "int f(List<int> l) { return l.where(big()).length(); }"
+                       "int g(List<int> l) { l.forEach(show()); return 0; } int main() { return 0; }")
+        assert "f" in pure
+        assert "g" not in pure
+
+    def test_void_functions_are_not_memoized(self):
+        program = Parser(Filter(Lexer(Scanner(StringIO("void f(int n) { } int main() { return 0; }"))))).parse_program()
+        assert memoizable_functions(program, Interpreter.system_methods.keys()) == {"main"}
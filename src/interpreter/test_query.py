@@ -0,0 +1,70 @@
+from src.parser.classes.type import Type, BaseType, ElementType
+
+from src.interpreter.value import Value
+from src.interpreter.query import QueryValue, QueryStage, WHERE, SELECT, JOIN
+
+
+LIST_TYPE = ElementType(Type.LIST, Type.INT)
+
+
+def create_query(runs: list):
+    def run(query):
+        runs.append([str(stage) for stage in query.stages])
+        return [element * 2 for element in query.source.value]
+    source = Value(LIST_TYPE, [1, 2]).own()
+    stage = QueryStage(SELECT, BaseType(Type.INT), [('twice', None)])
+    return source, QueryValue(LIST_TYPE, source.copy(), [stage], run)
+
+
+class TestQueryValue:
+    def test_query_is_deferred(self):
+        runs = []
+        create_query(runs)
+        assert runs == []
+
+    def test_query_runs_once(self):
+        runs = []
+        source, query = create_query(runs)
+        assert query.value == [2, 4]
+        assert query.value == [2, 4]
+        assert runs == [['select(twice)']]
+
+    def test_materialization_releases_source(self):
+        runs = []
+        source, query = create_query(runs)
+        assert source.shared
+        query.materialize()
+        assert not source.shared
+
+    def test_extend_fuses_stages(self):
+        runs = []
+        source, query = create_query(runs)
+        extended = query.extend(LIST_TYPE, QueryStage(WHERE, BaseType(Type.INT), [('big', None)]))
+        assert extended.value == [2, 4]
+        assert runs == [['select(twice)', 'where(big)']]
+
+    def test_materialization_releases_joined_collection(self):
+        runs = []
+        source, query = create_query(runs)
+        other = Value(LIST_TYPE, [2]).own()
+        stage = QueryStage(JOIN, BaseType(Type.INT), [('left', None), ('right', None), ('both', None)], other=other.copy())
+        extended = query.extend(LIST_TYPE, stage)
+        assert other.shared
+        extended.materialize()
+        assert not other.shared
+        assert runs == [['select(twice)', 'join(left, right, both)']]
+
+    def test_extend_materialized_query(self):
+        runs = []
+        source, query = create_query(runs)
+        query.materialize()
+        extended = query.extend(LIST_TYPE, QueryStage(WHERE, BaseType(Type.INT), [('big', None)]))
+        assert extended.source.value == [2, 4]
+        assert [str(stage) for stage in extended.stages] == ['where(big)']
+
+    def test_owning_query_materializes(self):
+        runs = []
+        source, query = create_query(runs)
+        owned = query.own()
+        assert not isinstance(owned, QueryValue)
+        assert owned.value == [2, 4]
@@ -0,0 +1,99 @@
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, BaseType, KeyValueType
+
+from src.interpreter.query import QueryStage, WHERE, SELECT, ORDER_BY, TAKE
+from src.interpreter.query_planner import QueryPlanner
+
+
+INT = BaseType(Type.INT)
+
+
+def stage(kind, *names, count=None):
+    return QueryStage(kind, INT, [(name, None) for name in names], count)
+
+
+def plan(stages, pure=("twice", "big", "small", "key")):
+    return [str(stage) for stage in QueryPlanner(set(pure)).optimize(stages)]
+
+
+PAIR = KeyValueType(Type.PAIR, Type.INT, Type.INT)
+
+PAIR_FUNCTIONS = ("int byKey(Pair<int, int> p) { return p.key(); }"
+                  "int byValue(Pair<int, int> p) { return p.value(); }"
+                  "bool big(Pair<int, int> p) { return p.value() > 4; }"
+                  "Pair<int, int> same(Pair<int, int> p) { return p; }"
+                  "int main() { return 0; }")
+
+
+def pair_stage(kind, name=None, count=None):
+    functions = Parser(Filter(Lexer(Scanner(StringIO(PAIR_FUNCTIONS))))).parse_program().get_functions()
+    return QueryStage(kind, PAIR, [(name, functions[name])] if name else [], count)
+
+
+def key_ordered_plan(stages):
+    pure = {"byKey", "byValue", "big", "same"}
+    return [str(stage) for stage in QueryPlanner(pure).optimize(stages, key_ordered=True)]
+
+
+class TestQueryPlanner:
+    def test_push_where_before_order_by(self):
+        assert plan([stage(ORDER_BY, "key"), stage(WHERE, "big")]) == ["where(big)", "orderBy(key)"]
+
+    def test_impure_where_stays_after_order_by(self):
+        stages = [stage(ORDER_BY, "key"), stage(WHERE, "loud")]
+        assert plan(stages) == ["orderBy(key)", "where(loud)"]
+
+    def test_impure_order_by_keeps_where(self):
+        stages = [stage(ORDER_BY, "loud"), stage(WHERE, "big")]
+        assert plan(stages) == ["orderBy(loud)", "where(big)"]
+
+    def test_merge_adjacent_where(self):
+        stages = [stage(SELECT, "twice"), stage(WHERE, "big"), stage(WHERE, "small")]
+        assert plan(stages) == ["select(twice)", "where(big && small)"]
+
+    def test_pushed_where_is_merged(self):
+        stages = [stage(WHERE, "big"), stage(ORDER_BY, "key"), stage(WHERE, "small")]
+        assert plan(stages) == ["where(big && small)", "orderBy(key)"]
+
+    def test_order_by_and_take_become_top_k(self):
+        stages = [stage(ORDER_BY, "key"), stage(TAKE, count=3)]
+        assert plan(stages) == ["topK(key, 3)"]
+
+    def test_where_is_not_pushed_before_take(self):
+        stages = [stage(TAKE, count=3), stage(WHERE, "big")]
+        assert plan(stages) == ["take(3)", "where(big)"]
+
+    def test_adjacent_take_keeps_smaller_count(self):
+        stages = [stage(TAKE, count=5), stage(TAKE, count=2)]
+        assert plan(stages) == ["take(2)"]
+
+    def test_select_is_not_reordered(self):
+        stages = [stage(SELECT, "twice"), stage(ORDER_BY, "key"), stage(WHERE, "big"), stage(TAKE, count=1)]
+        assert plan(stages) == ["select(twice)", "where(big)", "topK(key, 1)"]
+
+
+class TestKeyOrderedQueries:
+    def test_order_by_key_is_dropped(self):
+        stages = [pair_stage(WHERE, "big"), pair_stage(ORDER_BY, "byKey")]
+        assert key_ordered_plan(stages) == ["where(big)"]
+
+    def test_top_k_by_key_becomes_take(self):
+        stages = [pair_stage(ORDER_BY, "byKey"), pair_stage(TAKE, count=2)]
+        assert key_ordered_plan(stages) == ["take(2)"]
+
+    def test_order_by_value_is_kept(self):
+        stages = [pair_stage(ORDER_BY, "byValue")]
+        assert key_ordered_plan(stages) == ["orderBy(byValue)"]
+
+    def test_order_by_key_after_select_is_kept(self):
+        stages = [pair_stage(SELECT, "same"), pair_stage(ORDER_BY, "byKey")]
+        assert key_ordered_plan(stages) == ["select(same)", "orderBy(byKey)"]
+
+    def test_unordered_source_keeps_order_by_key(self):
+        stages = [pair_stage(ORDER_BY, "byKey")]
+        assert [str(stage) for stage in QueryPlanner({"byKey"}).optimize(stages)] == ["orderBy(byKey)"]
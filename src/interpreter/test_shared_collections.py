@@ -0,0 +1,116 @@
+import copy
+import multiprocessing
+import os
+import pickle
+
+import pytest
+
+from src.interpreter.interpreter_error import InterpreterError
+from src.interpreter.shared_collections import SharedList, SharedDict, SharedSegment
+from src.interpreter.typed_list import TypedList
+
+
+def read_and_crash(values: SharedList, connection) -> None:
+    connection.send(sum(values))
+    os._exit(1)
+
+
+class TestSharedList:
+    def test_elements(self):
+        values = SharedList.create(TypedList('q', [3, -1, 4]))
+        assert len(values) == 3 and values[0] == 3 and values[-1] == 4
+        assert values == [3, -1, 4]
+        assert values[1:] == TypedList('q', [-1, 4])
+
+    def test_window_shares_segment(self):
+        values = SharedList.create(TypedList('d', [0.5, 1.5, 2.5, 3.5]))
+        window = values.window(1, 3)
+        assert window == [1.5, 2.5] and window.segment is values.segment
+        assert values.window(3, 10) == [3.5]
+
+    def test_pickle_sends_handle(self):
+        values = SharedList.create(TypedList('q', list(range(1000))))
+        data = pickle.dumps(values.window(10, 20))
+        assert len(data) < 200
+        attached = pickle.loads(data)
+        assert attached == list(range(10, 20))
+        assert not attached.segment.owner and attached.segment.name == values.segment.name
+
+    def test_copy_is_in_memory(self):
+        values = SharedList.create(TypedList('q', [1, 2]))
+        copied = copy.copy(values)
+        assert isinstance(copied, TypedList) and copied == [1, 2]
+
+    def test_bool_list_is_rejected(self):
+        with pytest.raises(InterpreterError):
+            SharedList.create(TypedList('b', [1, 0]))
+
+    def test_empty_list(self):
+        assert list(SharedList.create(TypedList('d'))) == []
+
+
+class TestSharedDict:
+    def test_lookup(self):
+        entries = SharedDict.create({"a": [1, 2], "b": 3, 2.5: "x"})
+        assert len(entries) == 3
+        assert entries["a"] == [1, 2] and entries[2.5] == "x"
+        assert "b" in entries and "c" not in entries
+        with pytest.raises(KeyError):
+            entries["c"]
+
+    def test_insertion_order(self):
+        entries = SharedDict.create({index: str(index) for index in range(100, 0, -1)})
+        assert list(entries) == list(range(100, 0, -1))
+        assert list(entries.items())[0] == (100, "100")
+        assert list(entries.values())[-1] == "1"
+
+    def test_negative_zero_key(self):
+        entries = SharedDict.create({-0.0: "zero"})
+        assert entries[0.0] == "zero"
+
+    def test_unsupported_key(self):
+        with pytest.raises(InterpreterError):
+            SharedDict.create({(1, 2): 3})
+        assert (1, 2) not in SharedDict.create({1: 2})
+
+    def test_pickle_and_compare(self):
+        entries = SharedDict.create({"a": 1, "b": 2})
+        attached = pickle.loads(pickle.dumps(entries))
+        assert attached == {"b": 2, "a": 1} and attached == entries
+        assert copy.copy(attached) == {"a": 1, "b": 2}
+
+    def test_empty_dict(self):
+        entries = SharedDict.create({})
+        assert len(entries) == 0 and "a" not in entries and dict(entries) == {}
+
+
+class TestSharedSegment:
+    def test_release_removes_segment(self):
+        values = SharedList.create(TypedList('q', [1]))
+        name = values.segment.name
+        values.segment.release()
+        assert values.segment.released
+        with pytest.raises(InterpreterError):
+            SharedSegment.attach(name)
+
+    def test_garbage_collection_removes_segment(self):
+        values = SharedList.create(TypedList('q', [1]))
+        name = values.segment.name
+        del values
+        with pytest.raises(InterpreterError):
+            SharedSegment.attach(name)
+
+    def test_crashed_reader_leaves_segment_to_owner(self):
+        values = SharedList.create(TypedList('q', list(range(10))))
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=read_and_crash, args=(values, sender))
+        process.start()
+        assert receiver.poll(60) and receiver.recv() == 45
+        process.join()
+        assert process.exitcode == 1
+        assert values == list(range(10))
+        name = values.segment.name
+        values.segment.release()
+        with pytest.raises(InterpreterError):
+            SharedSegment.attach(name)
@@ -0,0 +1,35 @@
+import copy
+
+import src.interpreter.sorted_map as sorted_map
+from src.interpreter.sorted_map import SortedMap
+
+
+class TestSortedMap:
+    def test_iterates_in_key_order(self):
+        entries = SortedMap([(3, "c"), (1, "a"), (2, "b")])
+        assert list(entries) == [1, 2, 3]
+        assert list(entries.items()) == [(1, "a"), (2, "b"), (3, "c")]
+        assert entries == {3: "c", 1: "a", 2: "b"}
+
+    def test_insert_and_remove_across_chunks(self, monkeypatch):
+        monkeypatch.setattr(sorted_map, "CHUNK_SIZE", 4)
+        entries = SortedMap()
+        for key in range(50, 0, -3):
+            entries[key] = -key
+        for key in range(2, 50, 6):
+            del entries[key]
+        expected = sorted(set(range(50, 0, -3)) - set(range(2, 50, 6)))
+        assert list(entries) == expected and all(entries[key] == -key for key in expected)
+        assert entries.min_key() == expected[0] and entries.max_key() == expected[-1]
+        assert list(entries.range(10, 30)) == [key for key in expected if 10 <= key < 30]
+
+    def test_range_outside_keys_is_empty(self):
+        entries = SortedMap([(1, "a"), (2, "b")])
+        assert len(entries.range(3, 10)) == 0
+        assert len(entries.range(2, 2)) == 0
+
+    def test_copy_is_independent(self):
+        entries = SortedMap([(1, "a")])
+        copied = copy.copy(entries)
+        copied[0] = "z"
+        assert list(entries) == [1] and list(copied) == [0, 1]
@@ -0,0 +1,30 @@
+import copy
+
+from src.interpreter.string_builder import StringBuilder
+
+
+class TestStringBuilder:
+    def test_append_and_length(self):
+        builder = StringBuilder(["ab", ""])
+        builder.append("cd")
+        builder.append("")
+        builder.append("é")
+        assert len(builder) == 5
+        assert str(builder) == "abcdé"
+
+    def test_text_is_joined_once(self):
+        builder = StringBuilder(["a", "b", "c"])
+        assert str(builder) == "abc"
+        assert str(builder) is str(builder)
+        builder.append("d")
+        assert str(builder) == "abcd"
+
+    def test_empty(self):
+        assert str(StringBuilder()) == "" and len(StringBuilder()) == 0
+
+    def test_copy_is_independent(self):
+        builder = StringBuilder(["a"])
+        copied = copy.copy(builder)
+        copied.append("b")
+        assert str(builder) == "a" and str(copied) == "ab"
+        assert builder == StringBuilder(["a"]) and builder != copied
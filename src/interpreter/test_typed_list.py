@@ -0,0 +1,47 @@
+import copy
+import pickle
+
+from src.parser.classes.type import Type, BaseType, ElementType
+
+from src.interpreter.value import Value
+from src.interpreter.dict_view import DictView
+from src.interpreter.typed_list import TypedList, BoolList, typed_list
+
+
+class TestTypedList:
+    def test_numeric_lists_use_array_buffer(self):
+        assert typed_list(Type.INT, [1, 2]).typecode == 'q'
+        assert typed_list(BaseType(Type.FLOAT), [1.5]).typecode == 'd'
+        assert isinstance(typed_list(Type.BOOL, [True]), BoolList)
+
+    def test_other_lists_stay_plain(self):
+        assert type(typed_list(Type.STRING, ["a"])) is list
+        assert type(typed_list(ElementType(Type.LIST, Type.INT), [[1]])) is list
+
+    def test_falls_back_on_values_outside_buffer(self):
+        values = typed_list(Type.INT, iter([1] * 5000 + [2 ** 70, 3]))
+        assert type(values) is list
+        assert values == [1] * 5000 + [2 ** 70, 3]
+
+    def test_equals_and_prints_like_list(self):
+        values = typed_list(Type.INT, [1, 2])
+        assert values == [1, 2] and [1, 2] == values
+        assert values != [1] and values == DictView({1: 1, 2: 2}, keys=True)
+        assert f"{values}" == "[1, 2]"
+
+    def test_bool_list_reads_bools(self):
+        values = typed_list(Type.BOOL, [True, False])
+        assert values[0] is True and list(values) == [True, False]
+        assert values.pop() is False
+        assert f"{values}" == "[True]"
+
+    def test_copy_and_pickle_keep_buffer(self):
+        for values in (typed_list(Type.INT, [1, 2]), typed_list(Type.BOOL, [True])):
+            for copied in (copy.copy(values), pickle.loads(pickle.dumps(values))):
+                assert type(copied) is type(values) and copied == values and copied is not values
+
+    def test_value_copy_on_write_keeps_buffer(self):
+        value = Value(ElementType(Type.LIST, Type.INT), typed_list(Type.INT, [1]))
+        copied = value.copy()
+        assert copied.detach()
+        assert isinstance(copied.value, TypedList) and copied.value is not value.value
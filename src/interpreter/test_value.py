@@ -0,0 +1,67 @@
+from src.parser.classes.type import Type, BaseType, ElementType, KeyValueType
+
+from src.interpreter.value import Value
+from src.interpreter.variable import Variable
+
+
+class TestCopyOnWrite:
+    def test_copy_shares_container(self):
+        original = Value(ElementType(Type.LIST, Type.INT), [1, 2])
+        copy = original.copy()
+        assert copy.value is original.value
+        assert original.shared and copy.shared
+
+    def test_detach_copies_shared_container_once(self):
+        original = Value(ElementType(Type.LIST, Type.INT), [1, 2])
+        copy = original.copy()
+        assert copy.detach()
+        copy.value.append(3)
+        assert original.value == [1, 2]
+        assert not original.detach()
+
+    def test_detach_of_unshared_container_does_not_copy(self):
+        value = Value(KeyValueType(Type.DICT, Type.STRING, Type.INT), {"a": 1})
+        data = value.value
+        assert not value.detach()
+        assert value.value is data
+
+    def test_release_unshares_container(self):
+        original = Value(ElementType(Type.LIST, Type.INT), [1])
+        original.copy().release()
+        assert not original.shared
+
+    def test_pair_copy_is_not_tracked(self):
+        original = Value(KeyValueType(Type.PAIR, Type.STRING, Type.INT), ("a", 1))
+        copy = original.copy()
+        assert copy.value is original.value
+        assert not original.shared and not copy.shared
+
+    def test_scalar_copy_is_independent(self):
+        original = Value(BaseType(Type.INT), 1)
+        copy = original.copy()
+        copy.change_value(Value(BaseType(Type.INT), 2))
+        assert original.value == 1
+        assert not copy.shared
+
+    def test_variable_adopts_temporary_value(self):
+        value = Value(ElementType(Type.LIST, Type.INT), [1])
+        variable = Variable(value.type, "a", value)
+        assert variable.value is value
+        assert not value.shared
+
+    def test_variable_copies_owned_value(self):
+        first = Variable(ElementType(Type.LIST, Type.INT), "a", Value(ElementType(Type.LIST, Type.INT), [1]))
+        second = Variable(first.type, "b", first.value)
+        assert second.value is not first.value
+        assert second.value.value is first.value.value
+        second.release()
+        assert not first.value.shared
+
+    def test_borrowed_variable_is_not_released(self):
+        owner = Variable(ElementType(Type.LIST, Type.INT), "a", Value(ElementType(Type.LIST, Type.INT), [1]))
+        copy = owner.value.copy()
+        borrowed = Variable(owner.type, "this", owner.value, borrowed=True)
+        borrowed.release()
+        assert borrowed.value is owner.value
+        assert owner.value.shared
+        copy.release()
@@ -0,0 +1,66 @@
+from io import StringIO
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, KeyValueType
+
+from src.interpreter.value_index import ValueIndex, ValuePredicate, value_predicate
+
+
+PAIR = KeyValueType(Type.PAIR, Type.STRING, Type.INT)
+
+FUNCTIONS = ("bool equal(Pair<string, int> p) { return 3 == p.value(); }"
+             "bool above(Pair<string, int> p) { return p.value() > -2; }"
+             "bool between(Pair<string, int> p) { return p.value() < 5 && p.value() >= 1; }"
+             "bool keyed(Pair<string, int> p) { return p.key() == \"a\"; }"
+             "bool both(Pair<string, int> p) { return p.value() > 1 && p.value() > 2; }"
+             "int main() { return 0; }")
+
+
+def predicate(name: str):
+    functions = Parser(Filter(Lexer(Scanner(StringIO(FUNCTIONS))))).parse_program().get_functions()
+    return value_predicate(functions[name], PAIR)
+
+
+class TestValuePredicate:
+    def test_recognised_predicates(self):
+        assert str(predicate("equal")) == "value == 3"
+        assert str(predicate("above")) == "value > -2"
+        assert str(predicate("between")) == "value >= 1 && value < 5"
+
+    def test_other_predicates(self):
+        assert predicate("keyed") is None
+        assert predicate("both") is None
+
+
+class TestValueIndex:
+    def test_lookup_keeps_dict_order(self):
+        entries = {"a": 3, "b": 1, "c": 3, "d": 4}
+        index = ValueIndex()
+        assert index.lookup(entries, ValuePredicate(equal=3)) == ["a", "c"]
+        assert index.lookup(entries, ValuePredicate(lower=(1, False), upper=(4, True))) == ["a", "c", "d"]
+
+    def test_update_follows_changes(self):
+        entries = {"a": 3, "b": 1}
+        index = ValueIndex()
+        index.lookup(entries, ValuePredicate(lower=(0, True)))
+        entries["a"] = 1
+        index.update(entries, "a")
+        del entries["b"]
+        index.update(entries, "b")
+        entries["b"] = 1
+        index.update(entries, "b")
+        assert index.lookup(entries, ValuePredicate(equal=1)) == ["a", "b"]
+        assert index.lookup(entries, ValuePredicate(upper=(1, True))) == ["a", "b"]
+
+    def test_other_dict_rebuilds(self):
+        index = ValueIndex()
+        index.lookup({"a": 1}, ValuePredicate(equal=1))
+        assert index.lookup({"b": 1}, ValuePredicate(equal=1)) == ["b"]
+
+    def test_nan_values_disable_ranges(self):
+        entries = {"a": float("nan"), "b": 1.0}
+        assert ValueIndex().lookup(entries, ValuePredicate(lower=(0, True))) is None
+        assert ValueIndex().lookup(entries, ValuePredicate(equal=1)) == ["b"]
@@ -0,0 +1,68 @@
+from io import StringIO
+
+import pytest
+
+from src.scanner.scanner import Scanner
+from src.lexer.lexer import Lexer
+from src.filter.filter import Filter
+from src.parser.parser import Parser
+from src.parser.classes.type import Type, BaseType
+
+from src.interpreter.query import QueryStage, WHERE, SELECT, ORDER_BY
+from src.interpreter.typed_list import typed_list
+from src.interpreter.vectorize import Vectorizer, vectorizable_callback
+
+
+INT = BaseType(Type.INT)
+
+FUNCTIONS = ("int twice(int n) { return n * 2; }"
+             "bool big(int n) { return n > 4; }"
+             "int key(int n) { return -n; }"
+             "float ratio(int n) { return n / 0; }"
+             "int local(int n) { int m = n; return m; }"
+             "int outside(int n) { return n + m; }"
+             "int called(int n) { return twice(n); }"
+             "int main() { return 0; }")
+
+
+def functions() -> dict:
+    return Parser(Filter(Lexer(Scanner(StringIO(FUNCTIONS))))).parse_program().get_functions()
+
+
+def stage(kind, name):
+    return QueryStage(kind, INT, [(name, functions()[name])])
+
+
+class TestVectorizableCallback:
+    def test_single_return_is_vectorizable(self):
+        parameter, expression = vectorizable_callback(functions()["twice"], INT)
+        assert parameter.id == "n"
+
+    def test_other_callbacks_are_not(self):
+        definitions = functions()
+        assert vectorizable_callback(definitions["local"], INT) is None
+        assert vectorizable_callback(definitions["twice"], BaseType(Type.FLOAT)) is None
+
+
+class TestVectorizer:
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip("numpy")
+
+    def test_runs_leading_stages(self):
+        values, stages = Vectorizer(threshold=1).run(typed_list(Type.INT, range(8)),
+                                                     [stage(WHERE, "big"), stage(ORDER_BY, "key"), stage(SELECT, "called")])
+        assert values == [7, 6, 5] and [str(stage) for stage in stages] == ["select(called)"]
+
+    def test_unsupported_expressions_stay_element_wise(self):
+        vectorizer = Vectorizer(threshold=1)
+        values = typed_list(Type.INT, range(8))
+        for name in ("outside", "called", "ratio"):
+            stages = [stage(SELECT, name)]
+            result, remaining = vectorizer.run(values, stages)
+            assert result is values and remaining is stages
+        assert vectorizer.vectorized_stages == 0
+
+    def test_plain_lists_are_not_vectorized(self):
+        values = [1, 2 ** 70]
+        assert Vectorizer(threshold=1).run(values, [stage(SELECT, "twice")])[0] is values
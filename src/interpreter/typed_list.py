@@ -0,0 +1,74 @@
+import itertools
+from array import array
+from collections.abc import Sequence
+from typing import Iterable, Iterator, Union
+
+from src.parser.classes.type import BaseType, Type
+
+
+# values are appended in chunks, so a value that does not fit the buffer can still fall back to a plain list
+CHUNK_SIZE = 4096
+
+
+# List<int> and List<float> stored in a flat array buffer instead of a list of boxed objects.
+# Compares equal to a list with the same elements and prints like one.
+class TypedList(array):
+    __slots__ = ()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence) and not isinstance(other, array):
+            return self.tolist() == list(other)
+        return super().__eq__(other)
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    __hash__ = None
+
+    def __copy__(self) -> 'TypedList':
+        return type(self)(self.typecode, self)
+
+    def __repr__(self) -> str:
+        return repr(self.tolist())
+
+
+# List<bool> stored one byte per element, read back as bool.
+class BoolList(TypedList):
+    __slots__ = ()
+
+    def __new__(cls, typecode: str = 'b', values: Iterable = ()):
+        return super().__new__(cls, typecode, values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return BoolList('b', super().__getitem__(index))
+        return bool(super().__getitem__(index))
+
+    def __iter__(self) -> Iterator[bool]:
+        return map(bool, super().__iter__())
+
+    def pop(self, index: int = -1) -> bool:
+        return bool(super().pop(index))
+
+    def tolist(self) -> list[bool]:
+        return [bool(value) for value in super().tolist()]
+
+
+TYPECODES = {Type.INT: 'q', Type.FLOAT: 'd', Type.BOOL: 'b'}
+
+
+def typed_list(element_type: Union[Type, BaseType], values: Iterable = ()) -> Union[TypedList, list]:
+    if isinstance(element_type, BaseType) and type(element_type) is BaseType:
+        element_type = element_type.type
+    typecode = TYPECODES.get(element_type) if isinstance(element_type, Type) else None
+    if typecode is None:
+        return list(values)
+    result = BoolList() if typecode == 'b' else TypedList(typecode)
+    values = iter(values)
+    while chunk := list(itertools.islice(values, CHUNK_SIZE)):
+        size = len(result)
+        try:
+            result.extend(chunk)
+        except (OverflowError, TypeError):
+            return [*result[:size], *chunk, *values]
+    return result
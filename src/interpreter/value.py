@@ -1,17 +1,44 @@
+import copy
 from src.parser.classes.type import BaseType, ElementType, KeyValueType, Type
 from src.interpreter.interpreter_error import InterpreterError
-from typing import Union
+from src.interpreter.dict_view import DictView
+from src.interpreter.typed_list import typed_list
+from src.interpreter.value_index import ValueIndex
+from src.interpreter.mapped_list import MappedList
+from src.interpreter.shared_collections import SharedList, SharedDict
+from src.interpreter.sorted_map import SortedMap
+from typing import Union, Optional
 from abc import ABC, abstractmethod
 
 
 class Value(ABC):
+    # keys() and values() views of a Dict value, kept until the dict changes
+    _views: Optional[dict[bool, DictView]] = None
+    # secondary index over the values of a Dict, shared by copies until the dict itself is copied
+    _value_index: Optional[ValueIndex] = None
+    # List or Dict value and index or key this value was read from, the path an in-place change goes through
+    _source: Optional[tuple['Value', object]] = None
+    # nested Lists and Dicts that this List or Dict holds its own copy of, by index or key; only they can change in
+    # place, any other element may still be shared with a copy of this container
+    _elements: Optional[dict[object, 'Value']] = None
+
     def __init__(self, type: Union[BaseType, KeyValueType, ElementType], value):
         self._type = type
         self._value = value
+        # number of values sharing the same container (copy-on-write), None if not shared
+        self._owners: Optional[list[int]] = None
+        self._owned = False
 
     def __eq__(self, other):
         return self._value == other.value and self._type == other.type
 
+    # a value sent to a worker process goes without the container it was read from
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop('_source', None)
+        state.pop('_elements', None)
+        return state
+
     @property
     def value(self):
         return self._value
@@ -20,9 +47,143 @@ class Value(ABC):
     def type(self):
         return self._type
 
+    @property
+    def owned(self) -> bool:
+        return self._owned
+
+    @property
+    def shared(self) -> bool:
+        return self._owners is not None and self._owners[0] > 1
+
+    def is_container(self) -> bool:
+        if isinstance(self._type, KeyValueType) and self._type.type == Type.PAIR:
+            return False
+        if self._type == BaseType(Type.STRING_BUILDER):
+            return self._value is not None
+        return isinstance(self._type, (ElementType, KeyValueType)) and self._value is not None
+
+    def copy(self) -> 'Value':
+        value = type(self)(self._type, self._value)
+        if self.is_container():
+            self._share()
+            value._owners = self._owners
+            value._value_index = self._value_index
+        return value
+
+    # container object to store in another container, which shares it copy-on-write with this value
+    def stored(self):
+        if self.is_container():
+            self._share()
+        return self._value
+
+    def _share(self) -> None:
+        if self._owners is None:
+            self._owners = [1]
+        self._owners[0] += 1
+        self._elements = None
+
+    def own(self) -> 'Value':
+        if isinstance(self._value, DictView):
+            value = Value(self._type, typed_list(self._type.element_type, self._value))
+            value._owned = True
+            return value
+        value = self.copy() if self._owned else self
+        value._owned = True
+        return value
+
+    # marks a value that is still stored in a container (an element, a Dict value or a part of a Pair): a variable
+    # or parameter bound to it shares it copy-on-write instead of changing the container's own object
+    def contained(self) -> 'Value':
+        if self.is_container():
+            self._owned = True
+        return self
+
+    # an element remembers where it was read from; copies don't
+    def read_from(self, container: 'Value', key) -> 'Value':
+        self._source = (container, key)
+        return self
+
+    @property
+    def source(self) -> Optional[tuple['Value', object]]:
+        return self._source
+
+    def element(self, type: Union[BaseType, KeyValueType, ElementType], key) -> 'Value':
+        if self._elements is not None and (element := self._elements.get(key)) is not None:
+            return element
+        return Value(type, self._value[key]).contained().read_from(self, key)
+
+    def holds(self, key, element: 'Value') -> bool:
+        return self._elements is not None and self._elements.get(key) is element
+
+    # stores an element made writable under its key; Dicts on disk or in shard processes hand out copies, so there
+    # the element is copied again on its next change instead of being kept here
+    def keep(self, key, element: 'Value') -> None:
+        self._value[key] = element.value
+        if isinstance(self._value, (list, dict, SortedMap)):
+            if self._elements is None:
+                self._elements = {}
+            self._elements[key] = element
+
+    def forget(self, key) -> None:
+        if self._elements is not None:
+            self._elements.pop(key, None)
+
+    # elements handed out as they are (not through copy-on-write) are no longer this container's own copies
+    def share_elements(self) -> None:
+        self._elements = None
+
+    def detach(self, force: bool = False) -> bool:
+        self._views = None
+        if isinstance(self._value, DictView):
+            self.release()
+            self._value = typed_list(self._type.element_type, self._value)
+            return True
+        if isinstance(self._value, (MappedList, SharedList, SharedDict)):
+            self.release()
+            self._value = copy.copy(self._value)
+            return True
+        if not self.shared and not force:
+            self._owners = None
+            return False
+        self.release()
+        self._value = copy.copy(self._value)
+        self._value_index = None
+        self._elements = None
+        return True
+
+    def release(self) -> None:
+        if self._owners is not None:
+            self._owners[0] -= 1
+            self._owners = None
+
+    def dict_view(self, keys: bool) -> DictView:
+        if self._views is None:
+            self._views = {}
+        view = self._views.get(keys)
+        if view is None or view.entries is not self._value:
+            view = self._views[keys] = DictView(self._value, keys)
+        return view
+
+    def value_index(self) -> ValueIndex:
+        if self._value_index is None:
+            self._value_index = ValueIndex()
+        return self._value_index
+
+    def entry_changed(self, key) -> None:
+        if self._value_index is not None:
+            self._value_index.update(self._value, key)
+
     def change_value(self, value: 'Value'):
+        if value is self:
+            return
         if value.type == self.type:
+            self.release()
+            if value.owned:
+                value = value.copy()
             self._value = value.value
+            self._owners = value._owners
+            self._value_index = value._value_index
+            self._elements = None
         else:
             raise InterpreterError(message=f"Can't assign value: {value.value} to object type {self._type}")
 
@@ -0,0 +1,189 @@
+import bisect
+import operator
+from typing import Any, Optional
+
+from src.parser.classes.type import Type, BaseType, KeyValueType
+from src.parser.classes.parameter import Parameter
+from src.parser.classes.function_definition import FunctionDefinition
+from src.parser.classes.statement import ReturnStatement
+from src.parser.classes.expression import (Expression, LiteralExpression, IdExpression, IdOrCallExpression,
+                                           MethodCallExpression, UnarySubtractionExpression, AndExpression,
+                                           GreaterExpression, LessExpression, GreaterEqualExpression,
+                                           LessEqualExpression, EqualExpression)
+
+
+INDEXED_TYPES = {Type.INT, Type.FLOAT, Type.STRING, Type.BOOL}
+NUMERIC_TYPES = {Type.INT, Type.FLOAT}
+
+# relation -> (lower bound?, inclusive?) when the literal is on the right of pair.value()
+BOUNDS = {GreaterExpression: (True, False), GreaterEqualExpression: (True, True),
+          LessExpression: (False, False), LessEqualExpression: (False, True)}
+MIRRORED = {GreaterExpression: LessExpression, LessExpression: GreaterExpression,
+            GreaterEqualExpression: LessEqualExpression, LessEqualExpression: GreaterEqualExpression,
+            EqualExpression: EqualExpression}
+
+
+# Values selected by a where callback: equal to a literal, or within optional lower and upper bounds.
+class ValuePredicate:
+    def __init__(self, equal: Any = None, lower: Optional[tuple[Any, bool]] = None,
+                 upper: Optional[tuple[Any, bool]] = None):
+        self.equal = equal
+        self.lower = lower
+        self.upper = upper
+
+    @property
+    def is_equality(self) -> bool:
+        return self.equal is not None
+
+    def __str__(self) -> str:
+        if self.is_equality:
+            return f"value == {self.equal!r}"
+        parts = []
+        if self.lower is not None:
+            parts.append(f"value {'>=' if self.lower[1] else '>'} {self.lower[0]!r}")
+        if self.upper is not None:
+            parts.append(f"value {'<=' if self.upper[1] else '<'} {self.upper[0]!r}")
+        return " && ".join(parts)
+
+
+def value_predicate(function: Any, argument_type: KeyValueType) -> Optional[ValuePredicate]:
+    if not isinstance(function, FunctionDefinition) or function.type != BaseType(Type.BOOL):
+        return None
+    if len(function.parameters) != 1 or argument_type.value_type not in INDEXED_TYPES:
+        return None
+    parameter, = function.parameters
+    statements = function.block.statements
+    if type(parameter) is not Parameter or parameter.type != argument_type or len(statements) != 1:
+        return None
+    statement, = statements
+    if not isinstance(statement, ReturnStatement):
+        return None
+    return _predicate(statement.expression, parameter.id, argument_type.value_type)
+
+
+def _predicate(expression: Expression, id: str, value_type: Type) -> Optional[ValuePredicate]:
+    if isinstance(expression, AndExpression):
+        left, right = _predicate(expression.left, id, value_type), _predicate(expression.right, id, value_type)
+        if left is None or right is None or left.is_equality or right.is_equality:
+            return None
+        if left.lower is not None and right.lower is None and left.upper is None and right.upper is not None:
+            return ValuePredicate(lower=left.lower, upper=right.upper)
+        if right.lower is not None and left.lower is None and right.upper is None and left.upper is not None:
+            return ValuePredicate(lower=right.lower, upper=left.upper)
+        return None
+    relation = type(expression)
+    if relation not in MIRRORED:
+        return None
+    if _is_value_call(expression.left, id):
+        literal = _literal(expression.right)
+    elif _is_value_call(expression.right, id):
+        literal, relation = _literal(expression.left), MIRRORED[relation]
+    else:
+        return None
+    if literal is None:
+        return None
+    literal_type, constant = literal
+    if relation == EqualExpression:
+        if literal_type != value_type and {literal_type, value_type} != NUMERIC_TYPES:
+            return None
+        return ValuePredicate(equal=constant)
+    if not {literal_type, value_type} <= NUMERIC_TYPES:
+        return None
+    lower, inclusive = BOUNDS[relation]
+    return ValuePredicate(lower=(constant, inclusive)) if lower else ValuePredicate(upper=(constant, inclusive))
+
+
+def _is_value_call(expression: Expression, id: str) -> bool:
+    return (isinstance(expression, IdOrCallExpression) and isinstance(expression.left, IdExpression)
+            and expression.left.id == id and isinstance(expression.right, MethodCallExpression)
+            and expression.right.id == 'value' and not expression.right.arguments)
+
+
+def _literal(expression: Expression) -> Optional[tuple[Type, Any]]:
+    if isinstance(expression, UnarySubtractionExpression):
+        literal = _literal(expression.expression)
+        if literal is None or literal[0] not in NUMERIC_TYPES:
+            return None
+        return literal[0], -literal[1]
+    if not isinstance(expression, LiteralExpression):
+        return None
+    literal_type = expression.type.type if isinstance(expression.type, BaseType) else expression.type
+    return literal_type, expression.value
+
+
+# Secondary index over the values of one Dict, built on the first lookup and updated on every change.
+# Keys found through it are returned in the dict's own order, so a where answered by the index
+# gives exactly the entries a full scan would.
+class ValueIndex:
+    def __init__(self):
+        self._entries: Optional[dict] = None
+        self._next_position = 0
+        # key -> (value, position of the key in the dict)
+        self._keys: dict = {}
+        self._by_value: dict = {}
+        self._sorted: Optional[list[tuple]] = None
+        self._unordered = 0
+
+    def indexes(self, entries: dict) -> bool:
+        return self._entries is entries
+
+    def lookup(self, entries: dict, predicate: ValuePredicate) -> Optional[list]:
+        if not self.indexes(entries):
+            self._build(entries)
+        if predicate.is_equality:
+            found = self._by_value.get(predicate.equal, {})
+            return sorted(found, key=lambda key: self._keys[key][1])
+        if self._unordered:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted((value, position, key) for key, (value, position) in self._keys.items()
+                                  if value == value)
+        start, end = 0, len(self._sorted)
+        if predicate.lower is not None:
+            bound, inclusive = predicate.lower
+            start = (bisect.bisect_left if inclusive else bisect.bisect_right)(self._sorted, bound, key=_value)
+        if predicate.upper is not None:
+            bound, inclusive = predicate.upper
+            end = (bisect.bisect_right if inclusive else bisect.bisect_left)(self._sorted, bound, key=_value)
+        return [key for _, _, key in sorted(self._sorted[start:end], key=operator.itemgetter(1))]
+
+    def update(self, entries: dict, key) -> None:
+        if not self.indexes(entries):
+            return
+        position = self._next_position
+        if key in self._keys:
+            old, position = self._keys.pop(key)
+            self._remove(key, old, position)
+        if key in entries:
+            if position == self._next_position:
+                self._next_position += 1
+            self._insert(key, entries[key], position)
+
+    def _build(self, entries: dict) -> None:
+        self.__init__()
+        self._entries = entries
+        for key, value in entries.items():
+            self._insert(key, value, self._next_position)
+            self._next_position += 1
+
+    def _insert(self, key, value, position: int) -> None:
+        self._keys[key] = value, position
+        self._by_value.setdefault(value, {})[key] = None
+        if value != value:
+            self._unordered += 1
+        elif self._sorted is not None:
+            bisect.insort(self._sorted, (value, position, key))
+
+    def _remove(self, key, value, position: int) -> None:
+        group = self._by_value[value]
+        del group[key]
+        if not group:
+            del self._by_value[value]
+        if value != value:
+            self._unordered -= 1
+        elif self._sorted is not None:
+            del self._sorted[bisect.bisect_left(self._sorted, (value, position))]
+
+
+def _value(entry: tuple):
+    return entry[0]
@@ -6,12 +6,13 @@ from src.parser.classes.type import BaseType
 
 
 class Variable:
-    def __init__(self, type: BaseType, id: str, value: Value | None):
+    def __init__(self, type: BaseType, id: str, value: Value | None, borrowed: bool = False):
         self._type = type
         self._id = id
         if value is not None and value.type != self._type:
             raise InterpreterError(message=f"Can't assign value type: {value.type} to variable type: {self._type}")
-        self._value = value
+        self._borrowed = borrowed
+        self._value = value.own() if value is not None and not borrowed else value
 
     @property
     def type(self) -> BaseType:
@@ -32,3 +33,11 @@ class Variable:
         if self._value is None:
             self._value = value
         self._value.change_value(value)
+
+    @property
+    def borrowed(self) -> bool:
+        return self._borrowed
+
+    def release(self) -> None:
+        if not self._borrowed and self._value is not None:
+            self._value.release()
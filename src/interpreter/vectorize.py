@@ -0,0 +1,191 @@
+import operator
+from typing import Any, Optional
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from src.parser.classes.type import Type, BaseType
+from src.parser.classes.parameter import Parameter
+from src.parser.classes.function_definition import FunctionDefinition
+from src.parser.classes.statement import ReturnStatement
+from src.parser.classes.expression import (Expression, LiteralExpression, IdExpression, TermExpression,
+                                           UnarySubtractionExpression, NegationExpression, CastingExpression,
+                                           AndExpression, OrExpression, AdditionExpression, SubtractionExpression,
+                                           MultiplicationExpression, DivisionExpression, GreaterExpression,
+                                           LessExpression, GreaterEqualExpression, LessEqualExpression,
+                                           EqualExpression, NotEqualExpression)
+
+from src.interpreter.query import QueryStage, WHERE, SELECT, ORDER_BY, TAKE, TOP_K
+from src.interpreter.typed_list import TypedList, BoolList
+
+
+VECTOR_STAGES = {WHERE, SELECT, ORDER_BY, TAKE, TOP_K}
+NUMERIC_TYPES = {Type.INT, Type.FLOAT}
+# ints up to this magnitude behave the same in int64 and float64 as in Python
+EXACT_INT = 2 ** 53
+
+TYPECODES = {Type.INT: 'q', Type.FLOAT: 'd', Type.BOOL: 'b'}
+DTYPES = {Type.INT: 'int64', Type.FLOAT: 'float64', Type.BOOL: 'bool'}
+
+ARITHMETIC = {AdditionExpression: operator.add, SubtractionExpression: operator.sub,
+              MultiplicationExpression: operator.mul}
+RELATIONS = {GreaterExpression: operator.gt, LessExpression: operator.lt, GreaterEqualExpression: operator.ge,
+             LessEqualExpression: operator.le, EqualExpression: operator.eq, NotEqualExpression: operator.ne}
+BINARY = {AndExpression, OrExpression, DivisionExpression, *ARITHMETIC, *RELATIONS}
+
+
+class NotVectorizable(Exception):
+    pass
+
+
+# Values of one subexpression for the whole buffer: an array, or a scalar if it doesn't use the element.
+# bound is the largest possible magnitude of an int result.
+class Vector:
+    def __init__(self, type: Type, data: Any, bound: int = 0):
+        if type == Type.INT and bound > EXACT_INT:
+            raise NotVectorizable()
+        self.type = type
+        self.data = data
+        self.bound = bound
+
+
+def vectorizable_callback(function: Any, argument_type: BaseType) -> Optional[tuple[Parameter, Expression]]:
+    if not isinstance(function, FunctionDefinition) or len(function.parameters) != 1:
+        return None
+    parameter, = function.parameters
+    statements = function.block.statements
+    if type(parameter) is not Parameter or parameter.type != argument_type or len(statements) != 1:
+        return None
+    statement, = statements
+    return (parameter, statement.expression) if isinstance(statement, ReturnStatement) else None
+
+
+# Runs leading where/select/orderBy/take stages of a query over a numeric List buffer with NumPy.
+# Applies only to callbacks made of a single return of arithmetic and relations over the element and literals,
+# and only when the result is exactly what the per-element interpreter would produce; otherwise the stage
+# and every stage after it run element by element.
+class Vectorizer:
+    def __init__(self, threshold: int = 32):
+        self._threshold = threshold
+        self._vectorized_stages = 0
+
+    @property
+    def vectorized_stages(self) -> int:
+        return self._vectorized_stages
+
+    def run(self, values, stages: list[QueryStage]) -> tuple[Any, list[QueryStage]]:
+        if not isinstance(values, TypedList) or len(values) < self._threshold:
+            return values, stages
+        element_type = next(type for type, typecode in TYPECODES.items() if typecode == values.typecode)
+        vector = Vector(element_type, numpy.frombuffer(values, DTYPES[element_type]))
+        done = 0
+        with numpy.errstate(all='ignore'):
+            for stage in stages:
+                if stage.kind not in VECTOR_STAGES or stage.argument_type != BaseType(vector.type):
+                    break
+                try:
+                    vector = self._run_stage(stage, vector)
+                except NotVectorizable:
+                    break
+                done += 1
+        if done == 0:
+            return values, stages
+        self._vectorized_stages += done
+        return self._to_list(vector), stages[done:]
+
+    def _run_stage(self, stage: QueryStage, vector: Vector) -> Vector:
+        if stage.kind == TAKE:
+            return Vector(vector.type, vector.data[:stage.count])
+        for name, function in stage.callbacks:
+            result = self._call(function, stage.argument_type, vector)
+            if stage.kind == WHERE:
+                if result.type != Type.BOOL:
+                    raise NotVectorizable()
+                vector = Vector(vector.type, vector.data[self._broadcast(result, vector)])
+            elif stage.kind == SELECT:
+                vector = Vector(result.type, self._broadcast(result, vector))
+            else:
+                keys = self._broadcast(result, vector)
+                if result.type == Type.FLOAT and numpy.isnan(keys).any():
+                    raise NotVectorizable()
+                order = numpy.argsort(keys, kind='stable')
+                vector = Vector(vector.type, vector.data[order if stage.kind == ORDER_BY else order[:stage.count]])
+        return vector
+
+    def _call(self, function: FunctionDefinition, argument_type: BaseType, vector: Vector) -> Vector:
+        if (callback := vectorizable_callback(function, argument_type)) is None:
+            raise NotVectorizable()
+        parameter, expression = callback
+        data = vector.data
+        bound = max(-int(data.min()), int(data.max()), 0) if vector.type == Type.INT and len(data) else 0
+        result = self._evaluate(expression, parameter.id, Vector(vector.type, data, bound))
+        if BaseType(result.type) != function.type:
+            raise NotVectorizable()
+        return result
+
+    def _evaluate(self, expression: Expression, id: str, element: Vector) -> Vector:
+        if isinstance(expression, LiteralExpression):
+            literal_type = expression.type.type if isinstance(expression.type, BaseType) else expression.type
+            self._require(literal_type in NUMERIC_TYPES | {Type.BOOL})
+            return Vector(literal_type, expression.value, abs(expression.value) if literal_type == Type.INT else 0)
+        if isinstance(expression, IdExpression):
+            if expression.id != id:
+                raise NotVectorizable()
+            return element
+        if isinstance(expression, TermExpression):
+            return self._evaluate(expression.expression, id, element)
+        if isinstance(expression, UnarySubtractionExpression):
+            value = self._evaluate(expression.expression, id, element)
+            self._require(value.type in NUMERIC_TYPES)
+            return Vector(value.type, -value.data, value.bound)
+        if isinstance(expression, NegationExpression):
+            value = self._evaluate(expression.expression, id, element)
+            self._require(value.type == Type.BOOL)
+            return Vector(Type.BOOL, numpy.logical_not(value.data))
+        if isinstance(expression, CastingExpression):
+            return self._cast(expression, self._evaluate(expression.expression, id, element))
+        self._require(type(expression) in BINARY)
+        left, right = self._evaluate(expression.left, id, element), self._evaluate(expression.right, id, element)
+        if isinstance(expression, (AndExpression, OrExpression)):
+            self._require(left.type == right.type == Type.BOOL)
+            function = numpy.logical_and if isinstance(expression, AndExpression) else numpy.logical_or
+            return Vector(Type.BOOL, function(left.data, right.data))
+        if type(expression) in RELATIONS:
+            equality = isinstance(expression, (EqualExpression, NotEqualExpression)) and left.type == right.type
+            self._require(equality or {left.type, right.type} <= NUMERIC_TYPES)
+            return Vector(Type.BOOL, RELATIONS[type(expression)](left.data, right.data))
+        self._require({left.type, right.type} <= NUMERIC_TYPES)
+        if isinstance(expression, DivisionExpression):
+            if numpy.any(numpy.equal(right.data, 0)):
+                raise NotVectorizable()
+            return Vector(Type.FLOAT, numpy.true_divide(left.data, right.data))
+        data = ARITHMETIC[type(expression)](left.data, right.data)
+        if left.type == right.type == Type.INT:
+            bound = left.bound * right.bound if isinstance(expression, MultiplicationExpression) else left.bound + right.bound
+            return Vector(Type.INT, data, bound)
+        return Vector(Type.FLOAT, data)
+
+    def _cast(self, expression: CastingExpression, value: Vector) -> Vector:
+        if expression.type == BaseType(value.type):
+            return value
+        self._require(expression.type == BaseType(Type.INT) and value.type in {Type.FLOAT, Type.BOOL})
+        data = numpy.asarray(value.data)
+        if value.type == Type.FLOAT and not (numpy.isfinite(data).all() and (numpy.abs(data) < EXACT_INT).all()):
+            raise NotVectorizable()
+        data = numpy.trunc(data).astype('int64')
+        return Vector(Type.INT, data, int(numpy.abs(data).max(initial=0)))
+
+    def _require(self, condition: bool) -> None:
+        if not condition:
+            raise NotVectorizable()
+
+    def _broadcast(self, result: Vector, vector: Vector):
+        return numpy.broadcast_to(numpy.asarray(result.data, DTYPES[result.type]), vector.data.shape)
+
+    def _to_list(self, vector: Vector) -> TypedList:
+        data = numpy.ascontiguousarray(vector.data, DTYPES[vector.type])
+        if vector.type == Type.BOOL:
+            return BoolList('b', data.astype('int8').tobytes())
+        return TypedList(TYPECODES[vector.type], data.tobytes())
@@ -22,7 +22,15 @@ if TYPE_CHECKING:
                                                     AddFunctionDefinition, IsKeyFunctionDefinition, LengthFunctionDefinition,
                                                     PushFunctionDefinition, PopFunctionDefinition, RemoveFunctionDefinition,
                                                     ForEachFunctionDefinition, WhereFunctionDefinition,
-                                                    SelectFunctionDefinition, OrderByFunctionDefinition)
+                                                    SelectFunctionDefinition, OrderByFunctionDefinition,
+                                                    TakeFunctionDefinition, GroupByFunctionDefinition,
+                                                    JoinFunctionDefinition, SumFunctionDefinition, MinFunctionDefinition,
+                                                    MaxFunctionDefinition, CountFunctionDefinition, AnyFunctionDefinition,
+                                                    AllFunctionDefinition, FirstFunctionDefinition, RangeFunctionDefinition,
+                                                    ContainsFunctionDefinition, UnionFunctionDefinition,
+                                                    IntersectFunctionDefinition, ExceptFunctionDefinition,
+                                                    DistinctFunctionDefinition, MapFileFunctionDefinition,
+                                                    AppendFunctionDefinition, ToStringFunctionDefinition)
 
 
 class Visitor(ABC):
@@ -237,3 +245,79 @@ class Visitor(ABC):
     @abstractmethod
     def visit_orderby_function(self, element: 'OrderByFunctionDefinition'):
         pass
+
+    @abstractmethod
+    def visit_take_function(self, element: 'TakeFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_group_by_function(self, element: 'GroupByFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_join_function(self, element: 'JoinFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_sum_function(self, element: 'SumFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_min_function(self, element: 'MinFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_max_function(self, element: 'MaxFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_count_function(self, element: 'CountFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_any_function(self, element: 'AnyFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_all_function(self, element: 'AllFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_first_function(self, element: 'FirstFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_range_function(self, element: 'RangeFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_contains_function(self, element: 'ContainsFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_union_function(self, element: 'UnionFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_intersect_function(self, element: 'IntersectFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_except_function(self, element: 'ExceptFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_distinct_function(self, element: 'DistinctFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_map_file_function(self, element: 'MapFileFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_append_function(self, element: 'AppendFunctionDefinition'):
+        pass
+
+    @abstractmethod
+    def visit_to_string_function(self, element: 'ToStringFunctionDefinition'):
+        pass
@@ -64,7 +64,10 @@ class Lexer:
         "bool": TokenType.BOOL,
         "Pair": TokenType.PAIR,
         "List": TokenType.LIST,
+        "Set": TokenType.SET,
         "Dict": TokenType.DICT,
+        "SortedDict": TokenType.SORTED_DICT,
+        "StringBuilder": TokenType.STRING_BUILDER,
         "void": TokenType.VOID
     }
 
@@ -131,6 +131,24 @@ class TestKeywordsTokens:
         lexer = Lexer(scanner)
         assert lexer.try_build_token().type == TokenType.DICT
 
+    def test_token_sorted_dict(self):
+        text = StringIO("SortedDict")
+        scanner = Scanner(text)
+        lexer = Lexer(scanner)
+        assert lexer.try_build_token().type == TokenType.SORTED_DICT
+
+    def test_token_set(self):
+        text = StringIO("Set")
+        scanner = Scanner(text)
+        lexer = Lexer(scanner)
+        assert lexer.try_build_token().type == TokenType.SET
+
+    def test_token_string_builder(self):
+        text = StringIO("StringBuilder")
+        scanner = Scanner(text)
+        lexer = Lexer(scanner)
+        assert lexer.try_build_token().type == TokenType.STRING_BUILDER
+
     def test_token_id(self):
         text = StringIO("identifier")
         scanner = Scanner(text)
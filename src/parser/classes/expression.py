@@ -259,7 +259,7 @@ class OrExpression(BinaryExpression, Component):
 
 class AndExpression(BinaryExpression, Component):
     def accept(self, visitor: Visitor) -> None:
-        visitor.visit_and_expression()
+        visitor.visit_and_expression(self)
 
 
 class RelationExpression(BinaryExpression):
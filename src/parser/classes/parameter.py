@@ -18,3 +18,7 @@ class ThisParameter(Parameter):
 
 class FunctionParameter(Parameter):
     pass
+
+
+class OptionalFunctionParameter(FunctionParameter):
+    pass
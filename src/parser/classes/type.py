@@ -7,7 +7,7 @@ class BaseType:
         self._type: Type = type
 
     def __eq__(self, other):
-        return self.type == other.type
+        return isinstance(other, BaseType) and self.type == other.type
 
     def __str__(self):
         return f"{self.type}"
@@ -36,7 +36,8 @@ class KeyValueType(BaseType):
         self._value_type: Type = value_type
 
     def __eq__(self, other):
-        return self.type == other.type and self.key_type == other.key_type and self.value_type == other.value_type
+        return (isinstance(other, KeyValueType) and self.type == other.type and self.key_type == other.key_type
+                and self.value_type == other.value_type)
 
     def __str__(self):
         return f"{self._type} [ {self._key_type} : {self._value_type} ]"
@@ -69,7 +70,7 @@ class ElementType(BaseType):
         self._element_type: Type = element_type
 
     def __eq__(self, other):
-        return self.type == other.type and self.element_type == other.element_type
+        return isinstance(other, ElementType) and self.type == other.type and self.element_type == other.element_type
 
     def __str__(self):
         return f"{self._type} [{self._element_type}]"
@@ -95,7 +96,10 @@ class Type(Enum):
     STRING = auto()
     PAIR = auto()
     LIST = auto()
+    SET = auto()
     DICT = auto()
+    SORTED_DICT = auto()
+    STRING_BUILDER = auto()
     UNKNOWN = auto()
 
 
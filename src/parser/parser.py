@@ -43,14 +43,21 @@ class Parser(ParserInterface):
 
     key_value_type_set = {
         TokenType.DICT,
+        TokenType.SORTED_DICT,
         TokenType.PAIR
     }
 
     element_type_set = {
-        TokenType.LIST
+        TokenType.LIST,
+        TokenType.SET
     }
 
-    class_type_set = key_value_type_set | element_type_set
+    # class types without type arguments
+    plain_class_type_set = {
+        TokenType.STRING_BUILDER
+    }
+
+    class_type_set = key_value_type_set | element_type_set | plain_class_type_set
     function_type_set = {TokenType.VOID} | base_type_set | class_type_set
 
     token_type_to_type = {
@@ -60,8 +67,11 @@ class Parser(ParserInterface):
         TokenType.STRING: Type.STRING,
         TokenType.VOID: Type.VOID,
         TokenType.DICT: Type.DICT,
+        TokenType.SORTED_DICT: Type.SORTED_DICT,
         TokenType.PAIR: Type.PAIR,
         TokenType.LIST: Type.LIST,
+        TokenType.SET: Type.SET,
+        TokenType.STRING_BUILDER: Type.STRING_BUILDER,
         TokenType.INT_VALUE: Type.INT,
         TokenType.STRING_VALUE: Type.STRING,
         TokenType.BOOL_VALUE: Type.BOOL,
@@ -453,6 +463,8 @@ class Parser(ParserInterface):
         parameters = list()
         while parameter := self._parse_parameter():
             parameters.append(parameter)
+            if not self._can_be({TokenType.COMMA}):
+                break
         return parameters
 
     # declaration = type, id
@@ -481,21 +493,28 @@ class Parser(ParserInterface):
             return None
         return BaseType(self.token_type_to_type[token.type])
 
-    # classType = className, "<" type, [ ",", type ], ">"
-    # className = "Dict" | "List" | "Pair"
+    # classType = className, "<" type, [ ",", type ], ">" | "StringBuilder"
+    # className = "Dict" | "SortedDict" | "List" | "Set" | "Pair"
     def parse_class_type(self) -> BaseType | None:
         if not (token := self._can_be(self.class_type_set)):
             return None
+        if token.type in self.plain_class_type_set:
+            return BaseType(self.token_type_to_type[token.type])
         class_type = None
         self._must_be({TokenType.LESS}, ClassDeclarationError())
-        first_type = self.parse_type().type
+        first_type = self._type_argument(self.parse_type())
         if token.type in self.key_value_type_set:
             self._must_be({TokenType.COMMA},
                           ClassDeclarationError(message="Key-Value type needs two types in declaration",
                                                 position=self._get_position()))
-            second_type = self.parse_type().type
+            second_type = self._type_argument(self.parse_type())
             class_type = KeyValueType(self.token_type_to_type[token.type], first_type, second_type)
         self._must_be({TokenType.GREATER}, ClassDeclarationError())
         if not class_type:
             class_type = ElementType(self.token_type_to_type[token.type], first_type)
         return class_type
+
+    def _type_argument(self, type: BaseType) -> Type | BaseType:
+        if isinstance(type, (ElementType, KeyValueType)):
+            return type
+        return type.type
@@ -59,6 +59,11 @@ class TestFunctionDefinition:
     def test_function_position(self):
         assert self.program.get_functions()["main"].position == Position(1, 1)
 
+    def test_function_multiple_parameters(self):
+        parameters = create_parser("int sum(int n, int acc) {}").parse_function_definition().parameters
+        assert [(parameter.type, parameter.id) for parameter in parameters] == [(BaseType(Type.INT), "n"),
+                                                                               (BaseType(Type.INT), "acc")]
+
 
 class TestStatement:
     def test_return_statement(self):
@@ -167,6 +172,26 @@ class TestClassType:
         parser = create_parser("List<string>")
         assert parser.parse_type() == ElementType(Type.LIST, Type.STRING)
 
+    def test_nested_list_type(self):
+        parser = create_parser("List<List<int>>")
+        assert parser.parse_type() == ElementType(Type.LIST, ElementType(Type.LIST, Type.INT))
+
+    def test_dict_of_lists_type(self):
+        parser = create_parser("Dict<string, List<int>>")
+        assert parser.parse_type() == KeyValueType(Type.DICT, Type.STRING, ElementType(Type.LIST, Type.INT))
+
+    def test_sorted_dict_type(self):
+        parser = create_parser("SortedDict<int, string>")
+        assert parser.parse_type() == KeyValueType(Type.SORTED_DICT, Type.INT, Type.STRING)
+
+    def test_set_type(self):
+        parser = create_parser("Set<string>")
+        assert parser.parse_type() == ElementType(Type.SET, Type.STRING)
+
+    def test_string_builder_type(self):
+        parser = create_parser("StringBuilder sb")
+        assert parser.parse_type() == BaseType(Type.STRING_BUILDER)
+
     def test_list_too_many_arguments_error(self):
         parser = create_parser("List<string,int>")
         with pytest.raises(ClassDeclarationError):
@@ -17,7 +17,10 @@ class TokenType(Enum):
     STRING = auto()
     PAIR = auto()
     LIST = auto()
+    SET = auto()
     DICT = auto()
+    SORTED_DICT = auto()
+    STRING_BUILDER = auto()
 
     # VALUES
     ID = auto()